@@ -26,6 +26,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'documents.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -75,9 +76,32 @@ DATABASES = {
     }
 }
 
+# 3b. CACHE
+# Sa production, gumamit ng shared cache (Redis/Memcached) para iisa ang
+# counters ng lahat ng workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'deped-dms',
+    }
+}
+
+# Sessions: cache muna, database lang kapag may nagbago (tingnan ang
+# documents/sessions.py). Kailangan ng shared cache kapag maraming worker.
+# Patakbuhin ang ``cleanup_sessions --loop`` para mabura ang expired sessions.
+SESSION_ENGINE = 'documents.sessions'
+
+# Ilang segundo bago i-check ulit sa database ang naka-cache na pending count
+PENDING_COUNT_CACHE_TIMEOUT = 300
+
 # 4. CUSTOM USER & AUTHENTICATION
 AUTH_USER_MODEL = 'documents.User'
 
+# Email login sa iisang indexed lookup (LOWER(email) functional index)
+AUTHENTICATION_BACKENDS = [
+    'documents.backends.EmailBackend',
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',},
@@ -112,6 +136,30 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Full-text search index ng memos (SQLite FTS5, hiwalay sa main database)
+SEARCH_INDEX_PATH = os.path.join(BASE_DIR, 'search_index.sqlite3')
+
+# Chunked (resumable) uploads: laki ng bawat chunk at maximum na file size
+CHUNKED_UPLOAD_CHUNK_SIZE = 2 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_SIZE = 200 * 1024 * 1024
+# Segundo bago burahin ng expire_uploads ang upload na hindi natapos
+CHUNKED_UPLOAD_EXPIRE_AFTER = 24 * 60 * 60
+
+# Protected memo downloads. Kapag naka-set, ang web server na ang magpapadala
+# ng file: 'X-Accel-Redirect' (nginx, gamit ang internal location na
+# DOCUMENT_SENDFILE_PREFIX -> MEDIA_ROOT) o 'X-Sendfile' (Apache/lighttpd).
+DOCUMENT_SENDFILE_HEADER = None
+DOCUMENT_SENDFILE_PREFIX = '/protected-media/'
+
+# Ilang segundo naka-buffer sa memory ang memo views bago i-save sa database
+VIEW_COUNT_FLUSH_INTERVAL = 10
+
+# Per-view metrics (/metrics, Prometheus format). Ang sample rate ay bahagi ng
+# requests na sinusukat (1.0 = lahat); ang /metrics ay para lang sa mga IP
+# dito o sa naka-login na superuser.
+METRICS_SAMPLE_RATE = 1.0
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
 # 7. EMAIL CONFIGURATION (Gmail SMTP)
 # Mahalaga ito para sa Forgot Password/Reset Password logic
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -124,6 +172,11 @@ EMAIL_HOST_PASSWORD = 'ykqxzuhkdijgzedi'
 DEFAULT_FROM_EMAIL = 'DepEd DMS <marvinmedrana6@gmail.com>'
 EMAIL_TIMEOUT = 30 
 
+# Email outbox: ilang beses susubukan bago i-mark na failed, at ang base
+# delay (segundo) ng exponential backoff. Patakbuhin: manage.py send_outbox --loop
+OUTBOX_MAX_ATTEMPTS = 6
+OUTBOX_RETRY_BASE_SECONDS = 60
+
 # 8. MISC
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
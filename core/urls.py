@@ -1,9 +1,7 @@
 from django.contrib import admin
 from django.urls import path, include # Import include
-from django.conf import settings
-from django.conf.urls.static import static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('documents.urls')), # Dito natin "kinokonekta" ang documents urls
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+]
\ No newline at end of file
@@ -1,14 +1,83 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin
-from .models import User, School, Document
+from django.shortcuts import redirect, render
+from django.urls import path
+from .forms import RosterImportForm
+from .importers import RosterImportError, import_roster, iter_roster_rows
+from .models import User, OrgUnit, School, SchoolGroup, Document, OutboxEmail
 
 class CustomUserAdmin(UserAdmin):
-    list_display = ('username', 'get_role', 'school', 'is_staff')
+    list_display = ('username', 'get_role', 'school', 'org_unit', 'is_staff')
+    list_select_related = ('school', 'org_unit')
+    change_list_template = 'admin/documents/user/change_list.html'
     fieldsets = UserAdmin.fieldsets + (
-        ('Roles', {'fields': ('is_deped_admin', 'is_deped_secretary', 'is_school_head', 'is_employee', 'school')}),
+        ('Roles', {'fields': ('is_deped_admin', 'is_deped_secretary', 'is_school_head', 'is_employee', 'school', 'org_unit')}),
         ('Personal Info', {'fields': ('contact_number', 'address', 'position')}),
     )
 
+    def get_urls(self):
+        return [
+            path('import-roster/', self.admin_site.admin_view(self.import_roster_view), name='documents_user_import_roster'),
+        ] + super().get_urls()
+
+    def import_roster_view(self, request):
+        """Upload ng CSV/XLSX roster para sa bulk import (tingnan ang importers.py)."""
+        if not self.has_add_permission(request):
+            return redirect('admin:documents_user_changelist')
+
+        form = RosterImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            roster = form.cleaned_data['roster']
+            try:
+                result = import_roster(
+                    iter_roster_rows(roster, roster.name),
+                    active=form.cleaned_data['activate'],
+                )
+            except RosterImportError as e:
+                messages.error(request, str(e))
+            else:
+                messages.success(request, f"Imported {result.created} user(s); skipped {len(result.errors)} row(s).")
+                for line, message in result.errors[:50]:
+                    messages.warning(request, f"Line {line}: {message}")
+                return redirect('admin:documents_user_changelist')
+
+        return render(request, 'admin/documents/user/import_roster.html', {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'form': form,
+            'title': "Import employee roster",
+        })
+
 admin.site.register(User, CustomUserAdmin)
-admin.site.register(School)
-admin.site.register(Document)
\ No newline at end of file
+admin.site.register(Document)
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject',)
+
+
+@admin.register(OrgUnit)
+class OrgUnitAdmin(admin.ModelAdmin):
+    list_display = ('name', 'code', 'kind', 'parent', 'path')
+    list_filter = ('kind',)
+    list_select_related = ('parent',)
+    search_fields = ('name', 'code')
+    readonly_fields = ('path',)
+
+
+@admin.register(School)
+class SchoolAdmin(admin.ModelAdmin):
+    list_display = ('name', 'school_id', 'org_unit', 'is_active')
+    list_filter = ('org_unit', 'is_active')
+    list_select_related = ('org_unit',)
+    search_fields = ('name', 'school_id')
+
+
+@admin.register(SchoolGroup)
+class SchoolGroupAdmin(admin.ModelAdmin):
+    list_display = ('name', 'created_at')
+    search_fields = ('name',)
+    filter_horizontal = ('schools',)
@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+class EmailBackend(ModelBackend):
+    """
+    Login gamit ang email, case-insensitive, sa isang indexed query lang
+    (LOWER(email) functional index, tingnan ang UserManager.by_email).
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        user = UserModel._default_manager.by_email(username).first()
+        if user is None:
+            # Patakbuhin pa rin ang hasher para pareho ang timing (iwas user enumeration)
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,125 @@
+"""
+Mga cached na value na ginagamit sa bawat page render.
+
+Ang pending registration counter ay binabasa ng context processor sa bawat
+template render ng superuser, kaya naka-cache ito at ina-update ng signals
+(tingnan ang signals.py). May timeout pa rin para paminsan-minsan ay
+ma-check ulit laban sa database kung sakaling may nakalusot na pagbabago
+(hal. QuerySet.update() na hindi nagpapadala ng signals).
+
+Ang listahan ng schools (at ang ``<option>`` markup ng school select) ay
+naka-cache sa ilalim ng version number; tuwing may School na na-save o
+nabura, itinataas ng signals ang version kaya hindi na binabasa ang lumang
+entries at kusa na lang silang mag-e-expire. Ganito rin ang navbar/sidebar
+fragments ng base.html (tingnan ang templatetags/nav_cache.py), na may
+sariling version para sa pagbabago ng role o school ng users.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+PENDING_COUNT_KEY = 'documents:pending_count'
+PENDING_COUNT_TIMEOUT = getattr(settings, 'PENDING_COUNT_CACHE_TIMEOUT', 300)
+
+SCHOOL_LIST_VERSION_KEY = 'documents:schools:version'
+SCHOOL_LIST_TIMEOUT = getattr(settings, 'SCHOOL_LIST_CACHE_TIMEOUT', 60 * 60 * 24)
+
+NAV_VERSION_KEY = 'documents:nav:version'
+NAV_CACHE_TIMEOUT = getattr(settings, 'NAV_CACHE_TIMEOUT', 60 * 60)
+
+
+def get_pending_count():
+    """Bilang ng users na naghihintay ng approval (is_active=False)."""
+    count = cache.get(PENDING_COUNT_KEY)
+    if count is None:
+        from .models import User
+        count = User.objects.filter(is_active=False).count()
+        cache.add(PENDING_COUNT_KEY, count, PENDING_COUNT_TIMEOUT)
+    return count
+
+
+def adjust_pending_count(delta):
+    """Dagdagan/bawasan ang naka-cache na counter nang hindi nagku-query."""
+    if not delta:
+        return
+    try:
+        cache.incr(PENDING_COUNT_KEY, delta)
+    except ValueError:
+        # Wala pa sa cache; bibilangin ulit sa susunod na basa
+        pass
+
+
+def invalidate_pending_count():
+    cache.delete(PENDING_COUNT_KEY)
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # Hindi nagsisimula sa 1: kapag na-evict ang version key, hindi dapat
+        # tumama ulit sa lumang naka-cache na entries
+        version = time.time_ns()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def _bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def school_list_version():
+    return _get_version(SCHOOL_LIST_VERSION_KEY)
+
+
+def bump_school_list_version():
+    _bump_version(SCHOOL_LIST_VERSION_KEY)
+
+
+def nav_version():
+    return _get_version(NAV_VERSION_KEY)
+
+
+def bump_nav_version():
+    _bump_version(NAV_VERSION_KEY)
+
+
+def _school_list_key(part):
+    return f'documents:schools:{school_list_version()}:{part}'
+
+
+def get_school_list():
+    """Lahat ng School (naka-order sa name); walang query kapag naka-cache."""
+    key = _school_list_key('list')
+    schools = cache.get(key)
+    if schools is None:
+        from .models import School
+        schools = list(School.objects.order_by('name'))
+        cache.set(key, schools, SCHOOL_LIST_TIMEOUT)
+    return schools
+
+
+def school_options(selected=None, label='name'):
+    """
+    ``<option>`` markup ng lahat ng school. ``label``: 'name' o 'full'
+    (``str(school)``, may school ID). ``selected`` ay pk ng naka-select.
+    """
+    key = _school_list_key(f'options:{label}')
+    markup = cache.get(key)
+    if markup is None:
+        markup = format_html_join(
+            '', '<option value="{}">{}</option>',
+            ((school.pk, school.name if label == 'name' else str(school)) for school in get_school_list()),
+        )
+        cache.set(key, str(markup), SCHOOL_LIST_TIMEOUT)
+    if selected not in (None, ''):
+        option = format_html('<option value="{}">', selected)
+        markup = markup.replace(option, option[:-1] + ' selected>', 1)
+    return mark_safe(markup)
+
@@ -54,4 +54,13 @@ SCHOOL_CHOICES = [
 GENDER_CHOICES = [
     ('Male', 'Male'),
     ('Female', 'Female'),
-]
\ No newline at end of file
+]
+
+# Uri ng file ng Document (auto-detected sa upload, tingnan ang filetypes.py)
+DOCUMENT_CATEGORY_CHOICES = [
+    ('word', 'Word Document'),
+    ('excel', 'Excel Spreadsheet'),
+    ('ppt', 'PowerPoint Presentation'),
+    ('pdf', 'PDF File'),
+    ('other', 'Other'),
+]
@@ -0,0 +1,196 @@
+"""
+Compliance ng schools sa mga memo: nabuksan (InboxEntry.is_read) at
+na-acknowledge (InboxEntry.acknowledged_at).
+
+Ang summary kada school ay galing sa ComplianceRollup (isang row bawat
+school bawat buwan) kaya mabilis kahit lumaki ang history; ang matrix
+(memo x school) ay isang query lang sa InboxEntry para sa mga memo na
+nasa page.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, Exists, F, OuterRef, Q, Sum
+from django.db.models.functions import Greatest, TruncMonth
+from django.utils import timezone
+
+from .models import ComplianceRollup, Document, InboxEntry, School
+
+# Laman ng bawat cell ng matrix
+NOT_SENT = ''
+UNREAD = 'unread'
+OPENED = 'opened'
+ACKNOWLEDGED = 'acknowledged'
+
+
+def day_start(day):
+    """Simula ng araw (local time) bilang aware datetime, para gumamit ng index ang filter."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def month_of(moment):
+    return timezone.localtime(moment).date().replace(day=1)
+
+
+def bump_rollup(school_ids, moment, field, delta=1):
+    """Dagdagan ang ``field`` ng rollup ng mga school para sa buwan ng ``moment`` (2 queries)."""
+    school_ids = list(school_ids)
+    if not school_ids or not delta:
+        return
+    month = month_of(moment)
+    ComplianceRollup.objects.bulk_create(
+        [ComplianceRollup(school_id=school_id, month=month) for school_id in school_ids],
+        ignore_conflicts=True,
+    )
+    ComplianceRollup.objects.filter(school_id__in=school_ids, month=month).update(**{field: F(field) + delta})
+
+
+def month_window(date_from, date_to):
+    """
+    Window ng report: buong buwan (ang granularity ng ComplianceRollup), mula
+    sa unang araw ng buwan ng ``date_from`` hanggang sa huling araw ng buwan ng
+    ``date_to``. Ito ang gamit ng summary at ng matrix para pareho ang bilang.
+    """
+    start = date_from.replace(day=1)
+    end = (date_to.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return start, end
+
+
+def _inbox_totals(entries):
+    """Bilang ng received/opened/acknowledged kada (school, buwan ng date_sent)."""
+    return (
+        entries.annotate(month=TruncMonth('date_sent'))
+        .values('school_id', 'month')
+        .annotate(
+            received=Count('id'),
+            opened=Count('id', filter=Q(is_read=True)),
+            acknowledged=Count('id', filter=Q(acknowledged_at__isnull=False)),
+        )
+        .order_by()
+    )
+
+
+def _as_date(month):
+    return month.date() if hasattr(month, 'date') else month
+
+
+def remove_from_rollup(document_ids):
+    """
+    Bawasan ang rollup para sa InboxEntry ng mga memo na buburahin (tawagin
+    bago ang delete). Isang grouped query, at isang UPDATE bawat magkaparehong
+    (buwan, bawas) sa halip na bawat school.
+    """
+    groups = defaultdict(list)
+    for row in _inbox_totals(InboxEntry.objects.filter(document_id__in=document_ids)):
+        key = (_as_date(row['month']), row['received'], row['opened'], row['acknowledged'])
+        groups[key].append(row['school_id'])
+    for (month, received, opened, acknowledged), school_ids in groups.items():
+        ComplianceRollup.objects.filter(school_id__in=school_ids, month=month).update(
+            received=Greatest(F('received') - received, 0),
+            opened=Greatest(F('opened') - opened, 0),
+            acknowledged=Greatest(F('acknowledged') - acknowledged, 0),
+        )
+
+
+def rebuild_rollup():
+    """Buuin ulit ang buong ComplianceRollup mula sa InboxEntry (isang grouped query)."""
+    rows = _inbox_totals(InboxEntry.objects.all())
+    rollups = [
+        ComplianceRollup(
+            school_id=row['school_id'],
+            month=_as_date(row['month']),
+            received=row['received'],
+            opened=row['opened'],
+            acknowledged=row['acknowledged'],
+        )
+        for row in rows
+    ]
+    ComplianceRollup.objects.all().delete()
+    ComplianceRollup.objects.bulk_create(rollups, batch_size=1000)
+    return len(rollups)
+
+
+def _scoped_entries(scope_path):
+    # Walang join sa School kapag buong division
+    if not scope_path:
+        return InboxEntry.objects.all()
+    return InboxEntry.objects.filter(school__org_path__startswith=scope_path)
+
+
+def school_summary(date_from=None, date_to=None, scope_path=''):
+    """
+    Kabuuan kada school para sa mga buwan sa pagitan ng ``date_from`` at
+    ``date_to`` (inclusive, buong buwan; tingnan ang ``month_window``). Returns listahan ng dict na
+    naka-sort ayon sa pangalan ng school, kasama ang mga school na wala pang
+    natanggap. ``scope_path``: mga school lang sa ilalim ng OrgUnit path na ito.
+    """
+    rollups = ComplianceRollup.objects.all()
+    schools = School.objects.filter(is_active=True)
+    if scope_path:
+        rollups = rollups.filter(school__org_path__startswith=scope_path)
+        schools = schools.filter(org_path__startswith=scope_path)
+    if date_from:
+        rollups = rollups.filter(month__gte=date_from.replace(day=1))
+    if date_to:
+        rollups = rollups.filter(month__lte=date_to)
+    totals = {
+        row['school_id']: row
+        for row in rollups.values('school_id').annotate(
+            received=Sum('received'), opened=Sum('opened'), acknowledged=Sum('acknowledged'),
+        ).order_by()
+    }
+
+    summary = []
+    for school in schools.only('id', 'name'):
+        row = totals.get(school.id, {})
+        received = row.get('received') or 0
+        acknowledged = row.get('acknowledged') or 0
+        summary.append({
+            'school': school,
+            'received': received,
+            'opened': row.get('opened') or 0,
+            'acknowledged': acknowledged,
+            'rate': round(acknowledged * 100 / received) if received else None,
+        })
+    return summary
+
+
+def report_memos(date_from=None, date_to=None, scope_path=''):
+    """
+    Mga memo na may recipients (sa ilalim ng ``scope_path``) sa loob ng date
+    range, pinakabago muna. Ipasa ang parehong ``month_window`` ng summary.
+    """
+    recipients = _scoped_entries(scope_path)
+    memos = Document.objects.filter(Exists(recipients.filter(document=OuterRef('pk'))))
+    if date_from:
+        memos = memos.filter(date_uploaded__gte=day_start(date_from))
+    if date_to:
+        memos = memos.filter(date_uploaded__lt=day_start(date_to + timedelta(days=1)))
+    return memos.only('id', 'title', 'date_uploaded').order_by('-date_uploaded', '-id')
+
+
+def matrix(memos, scope_path=''):
+    """
+    Returns ``{doc_id: {school_id: status}}`` at mga bilang kada memo para sa
+    ibinigay na memos, gamit ang isang query sa InboxEntry. Kapag may
+    ``scope_path``, ang mga school lang sa ilalim nito ang binibilang.
+    """
+    cells = defaultdict(dict)
+    totals = defaultdict(lambda: {'received': 0, 'opened': 0, 'acknowledged': 0})
+    entries = _scoped_entries(scope_path).filter(document_id__in=[memo.id for memo in memos])
+    for doc_id, school_id, is_read, acknowledged_at in entries.values_list(
+        'document_id', 'school_id', 'is_read', 'acknowledged_at'
+    ):
+        counts = totals[doc_id]
+        counts['received'] += 1
+        if acknowledged_at:
+            status = ACKNOWLEDGED
+            counts['acknowledged'] += 1
+            counts['opened'] += 1
+        elif is_read:
+            status = OPENED
+            counts['opened'] += 1
+        else:
+            status = UNREAD
+        cells[doc_id][school_id] = status
+    return cells, totals
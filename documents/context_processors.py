@@ -1,14 +1,13 @@
-from django.contrib.auth import get_user_model
-
-User = get_user_model()
+from .caching import get_pending_count
 
 def global_user_counts(request):
     """
     Ito ang magbibigay ng 'pending_count' sa lahat ng templates.
+    Galing sa cache ang bilang (tingnan ang caching.py), kaya walang query
+    sa karaniwang request.
     """
     if request.user.is_authenticated and request.user.is_superuser:
-        # Bilangin ang mga users na is_active=False
         return {
-            'pending_count': User.objects.filter(is_active=False).count()
+            'pending_count': get_pending_count()
         }
-    return {'pending_count': 0}
\ No newline at end of file
+    return {'pending_count': 0}
@@ -0,0 +1,152 @@
+"""
+Pagpapadala ng memo sa maraming schools.
+
+Ang recipients ay puwedeng isa-isang school (``school:<id>``), isang
+SchoolGroup (``group:<id>``) o ang buong division (``division``). Bawat
+recipient school ay nagkakaroon ng sariling InboxEntry row, kaya ang
+"Received Memos" at unread count ay hindi na kailangang mag-join o mag-OR
+sa Document.school.
+"""
+import logging
+import sqlite3
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import search
+from .compliance import bump_rollup, month_of
+from .models import InboxEntry, School
+
+logger = logging.getLogger(__name__)
+
+DIVISION = 'division'
+
+
+def parse_recipients(values):
+    """Returns ``(division, school_ids, group_ids)`` mula sa mga value ng form."""
+    division = False
+    school_ids, group_ids = set(), set()
+    for value in values:
+        kind, _, pk = (value or '').partition(':')
+        if kind == DIVISION:
+            division = True
+        elif kind == 'school' and pk.isdigit():
+            school_ids.add(int(pk))
+        elif kind == 'group' and pk.isdigit():
+            group_ids.add(int(pk))
+    return division, school_ids, group_ids
+
+
+def resolve_recipients(user, values):
+    """
+    Set ng school ids na padadalhan. Ang division office lang ang puwedeng
+    pumili; ang iba (at kapag walang napili) ay sa sariling school lang.
+    """
+    division, school_ids, group_ids = parse_recipients(values) if user.can_distribute_memos else (False, set(), set())
+    schools = School.objects.filter(is_active=True)
+    if division:
+        return set(schools.values_list('id', flat=True))
+
+    resolved = set()
+    if school_ids:
+        resolved.update(schools.filter(id__in=school_ids).values_list('id', flat=True))
+    if group_ids:
+        resolved.update(schools.filter(groups__in=group_ids).values_list('id', flat=True))
+    if not resolved and user.school_id:
+        resolved.add(user.school_id)
+    return resolved
+
+
+def distribute(doc, school_ids):
+    """Gumawa ng InboxEntry bawat school (idempotent). Returns ang bilang ng bagong recipients."""
+    existing = set(
+        InboxEntry.objects.filter(document=doc, school_id__in=school_ids).values_list('school_id', flat=True)
+    )
+    new_ids = sorted(set(school_ids) - existing)
+    InboxEntry.objects.bulk_create(
+        [InboxEntry(document=doc, school_id=school_id, date_sent=doc.date_uploaded) for school_id in new_ids],
+        ignore_conflicts=True,
+        batch_size=500,
+    )
+    bump_rollup(new_ids, doc.date_uploaded, 'received')
+    transaction.on_commit(lambda: _reindex(doc))
+    return len(new_ids)
+
+
+def _reindex(doc):
+    # Para ma-update ang recipient schools sa search index
+    try:
+        search.index_document(doc)
+    except sqlite3.Error:
+        logger.exception("Search index update failed")
+
+
+def mark_read(doc, school_id):
+    """Markahang nabasa ng school ang memo; walang sinusulat kapag nabasa na."""
+    if not school_id:
+        return False
+    updated = InboxEntry.objects.filter(document_id=doc.pk, school_id=school_id, is_read=False).update(
+        is_read=True, read_at=timezone.now()
+    )
+    bump_rollup([school_id] if updated else [], doc.date_uploaded, 'opened')
+    return bool(updated)
+
+
+def mark_read_many(pairs):
+    """
+    ``mark_read`` para sa maraming ``(doc_id, school_id)`` nang sabay; ito ang
+    gamit ng viewcounts.flush() kaya walang InboxEntry/rollup write sa
+    download request. Returns bilang ng bagong nabuksang InboxEntry.
+    """
+    matches = Q(pk__in=[])
+    for doc_id, school_id in pairs:
+        matches |= Q(document_id=doc_id, school_id=school_id)
+
+    with transaction.atomic():
+        entries = list(
+            InboxEntry.objects.select_for_update()
+            .filter(matches, is_read=False)
+            .values_list('pk', 'school_id', 'date_sent')
+        )
+        if not entries:
+            return 0
+        InboxEntry.objects.filter(pk__in=[pk for pk, _, _ in entries]).update(is_read=True, read_at=timezone.now())
+
+        # Rollup: isang bump bawat (buwan, dagdag) sa halip na bawat entry
+        per_month = defaultdict(Counter)
+        moments = {}
+        for _, school_id, date_sent in entries:
+            month = month_of(date_sent)
+            per_month[month][school_id] += 1
+            moments[month] = date_sent
+        for month, counts in per_month.items():
+            by_delta = defaultdict(list)
+            for school_id, delta in counts.items():
+                by_delta[delta].append(school_id)
+            for delta, school_ids in by_delta.items():
+                bump_rollup(school_ids, moments[month], 'opened', delta)
+    return len(entries)
+
+
+def acknowledge(doc, user):
+    """
+    I-acknowledge ang memo para sa school ng ``user`` (binubuksan din ito).
+    Returns ang InboxEntry, o None kapag hindi recipient ang school.
+    """
+    if not user.school_id:
+        return None
+    with transaction.atomic():
+        mark_read(doc, user.school_id)
+        updated = InboxEntry.objects.filter(
+            document_id=doc.pk, school_id=user.school_id, acknowledged_at__isnull=True
+        ).update(acknowledged_at=timezone.now(), acknowledged_by=user)
+        bump_rollup([user.school_id] if updated else [], doc.date_uploaded, 'acknowledged')
+    return InboxEntry.objects.filter(document_id=doc.pk, school_id=user.school_id).first()
+
+
+def unread_count(school_id):
+    if not school_id:
+        return 0
+    return InboxEntry.objects.filter(school_id=school_id, is_read=False).count()
@@ -0,0 +1,142 @@
+"""
+Pag-serve ng memo files sa likod ng access check.
+
+Sinusuportahan ang conditional requests (ETag mula sa sha256 ng blob at
+Last-Modified mula sa date_uploaded), isang HTTP Range para sa resume ng
+malalaking PDF, at sendfile offload (``X-Accel-Redirect``/``X-Sendfile``)
+para hindi nakatali ang Python worker habang ipinapadala ang bytes.
+"""
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+class RangeFile:
+    """File-like na nagbabasa lang ng ``length`` bytes simula sa ``start``."""
+
+    def __init__(self, handle, start, length):
+        self.handle = handle
+        self.remaining = length
+        handle.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.handle.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.handle.close()
+
+
+def download_filename(doc):
+    """Ang title ng memo ang pangalan ng download, hindi ang sha256 na blob name."""
+    title = doc.title.strip() or 'memo'
+    ext = os.path.splitext(doc.file.name)[1]
+    return title if title.lower().endswith(ext) else title + ext
+
+
+def document_etag(doc):
+    if doc.sha256:
+        return f'"{doc.sha256}"'
+    return f'"{doc.pk}-{doc.file_size or 0}-{int(doc.date_uploaded.timestamp())}"'
+
+
+def parse_range(header, size):
+    """
+    Returns ``(start, end)`` (inclusive) para sa isang ``bytes=`` range,
+    None kapag walang (o hindi suportadong) Range, o ``False`` kapag hindi
+    ma-satisfy (416). Multiple ranges ay binabalewala (buong file ang ibibigay).
+    """
+    match = RANGE_RE.match((header or '').strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: huling N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def _if_range_matches(request, etag, last_modified):
+    value = request.META.get('HTTP_IF_RANGE')
+    if not value:
+        return True
+    if value.startswith('"') or value.startswith('W/'):
+        return value == etag
+    since = parse_http_date_safe(value)
+    return since is not None and since >= last_modified
+
+
+def serve_document(request, doc, as_attachment=False):
+    """Ibalik ang HttpResponse para sa file ng ``doc`` (access ay na-check na)."""
+    etag = document_etag(doc)
+    last_modified = int(doc.date_uploaded.timestamp())
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return response
+
+    path = doc.file.path
+    content_type = doc.mime_type or 'application/octet-stream'
+
+    sendfile_header = getattr(settings, 'DOCUMENT_SENDFILE_HEADER', None)
+    if sendfile_header:
+        # Ang web server na ang bahala sa Range at sa pagpapadala ng bytes
+        response = HttpResponse(content_type=content_type)
+        if sendfile_header.lower() == 'x-accel-redirect':
+            prefix = getattr(settings, 'DOCUMENT_SENDFILE_PREFIX', '/protected-media/')
+            response[sendfile_header] = quote(prefix.rstrip('/') + '/' + doc.file.name)
+        else:
+            response[sendfile_header] = path
+        response.headers.pop('Content-Length', None)
+    else:
+        size = doc.file_size if doc.file_size is not None else os.path.getsize(path)
+        byte_range = None
+        if _if_range_matches(request, etag, last_modified):
+            byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+        handle = open(path, 'rb')
+        if byte_range:
+            start, end = byte_range
+            response = FileResponse(RangeFile(handle, start, end - start + 1), content_type=content_type,
+                                    status=206)
+            response.block_size = STREAM_BLOCK_SIZE
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = str(end - start + 1)
+        else:
+            # Buong file: puwedeng gamitin ng WSGI server ang wsgi.file_wrapper (sendfile)
+            response = FileResponse(handle, content_type=content_type)
+            response['Content-Length'] = str(size)
+
+    response['Content-Disposition'] = content_disposition_header(as_attachment, download_filename(doc))
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, max-age=0, must-revalidate'
+    return response
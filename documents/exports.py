@@ -0,0 +1,196 @@
+"""
+Streaming exports (CSV at XLSX) para sa malalaking listahan.
+
+Ang rows ay generator (karaniwan ay galing sa ``QuerySet.iterator()``) kaya
+hindi kailanman buo sa memory ang listahan, at ang header ay naipapadala
+agad bago pa matapos ang unang query. Ang XLSX ay isinusulat bilang ZIP sa
+isang non-seekable buffer (data descriptors) at inline strings, kaya hindi
+rin kailangan ng openpyxl o ng temp file.
+"""
+import csv
+import io
+import re
+import zipfile
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Ilang bytes ang naiipon bago i-yield ang susunod na bahagi ng XLSX
+XLSX_FLUSH_SIZE = 64 * 1024
+
+# Mga value na nagsisimula rito ay itinuturing na formula ng Excel
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# Mga control character na bawal sa XML 1.0
+ILLEGAL_XML_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def cell_value(value):
+    """Gawing ligtas na spreadsheet value ang isang Python value."""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'Yes' if value else 'No'
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime('%Y-%m-%d %H:%M')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (int, float)):
+        return value
+    value = str(value)
+    # Iwas CSV/formula injection kapag binuksan sa Excel
+    if value.startswith(FORMULA_PREFIXES):
+        value = "'" + value
+    return value
+
+
+class _Echo:
+    """Para sa csv.writer: ibinabalik lang ang linya sa halip na isulat."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(header, rows):
+    writer = csv.writer(_Echo())
+    # BOM para mabasa nang tama ng Excel ang UTF-8 (hal. ñ sa pangalan)
+    yield '\ufeff' + writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([cell_value(value) for value in row])
+
+
+class _StreamSink(io.RawIOBase):
+    """Write-only, non-seekable na buffer na pinagsusulatan ng ZipFile."""
+
+    def __init__(self):
+        self._chunks = []
+        self._size = 0
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._size += len(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def pending(self):
+        return self._size
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        self._size = 0
+        return data
+
+
+def _column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _xlsx_row(number, values):
+    cells = []
+    for index, value in enumerate(values):
+        ref = f'{_column_letter(index)}{number}'
+        value = cell_value(value)
+        if isinstance(value, (int, float)):
+            cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        elif value != '':
+            text = escape(ILLEGAL_XML_RE.sub('', value))
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row r="{number}">{"".join(cells)}</row>'
+
+
+XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def iter_xlsx(header, rows, sheet_name='Sheet1'):
+    sink = _StreamSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+        archive.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{escape(sheet_name[:31])}" sheetId="1" r:id="rId1"/></sheets>'
+            '</workbook>'
+        ))
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetData>'
+            )
+            sheet.write(_xlsx_row(1, header).encode())
+            # Ipadala agad ang simula ng file (unang byte) bago ang mga query
+            yield sink.drain()
+            for number, row in enumerate(rows, start=2):
+                sheet.write(_xlsx_row(number, row).encode())
+                if sink.pending() >= XLSX_FLUSH_SIZE:
+                    yield sink.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
+
+
+def export_response(export_format, filename, header, rows, sheet_name='Sheet1'):
+    """
+    StreamingHttpResponse ng ``rows`` bilang CSV (default) o XLSX.
+    ``filename`` ay walang extension.
+    """
+    if export_format == 'xlsx':
+        response = StreamingHttpResponse(iter_xlsx(header, rows, sheet_name), content_type=XLSX_CONTENT_TYPE)
+        filename += '.xlsx'
+    else:
+        response = StreamingHttpResponse(iter_csv(header, rows), content_type='text/csv; charset=utf-8')
+        filename += '.csv'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # Huwag i-buffer ng nginx para dumating agad ang unang bytes
+    response['X-Accel-Buffering'] = 'no'
+    return response
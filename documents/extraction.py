@@ -0,0 +1,120 @@
+"""
+Pagkuha ng text mula sa mga memo file para sa full-text search.
+
+Ang DOCX/XLSX/PPTX ay ZIP ng XML files kaya binabasa ito gamit lang ang
+standard library. Ang PDF ay gumagamit ng ``pypdf`` kung naka-install;
+kung wala, walang content na ini-index (title lang).
+"""
+import html
+import os
+import re
+import resource
+import signal
+import zipfile
+
+MAX_TEXT_LENGTH = 1_000_000
+
+TAG_RE = re.compile(r'<[^>]+>')
+SPACE_RE = re.compile(r'[ \t\r\f\v]+')
+# Mga XML tag na katumbas ng bagong linya/cell
+BREAK_RE = re.compile(r'</(?:w:p|a:p|si|c|row)>|<w:br/>|<w:tab/>')
+
+
+def _xml_to_text(xml):
+    xml = BREAK_RE.sub('\n', xml)
+    return html.unescape(TAG_RE.sub(' ', xml))
+
+
+def _zip_text(path, member_filter):
+    parts = []
+    with zipfile.ZipFile(path) as archive:
+        for name in sorted(archive.namelist()):
+            if member_filter(name):
+                parts.append(_xml_to_text(archive.read(name).decode('utf-8', 'ignore')))
+    return '\n'.join(parts)
+
+
+def _word_text(path):
+    return _zip_text(path, lambda n: n == 'word/document.xml' or re.match(r'word/(header|footer)\d*\.xml$', n))
+
+
+def _excel_text(path):
+    return _zip_text(path, lambda n: n == 'xl/sharedStrings.xml' or re.match(r'xl/worksheets/sheet\d+\.xml$', n))
+
+
+def _ppt_text(path):
+    return _zip_text(path, lambda n: re.match(r'ppt/slides/slide\d+\.xml$', n))
+
+
+def _pdf_text(path):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return ''
+    reader = PdfReader(path)
+    return '\n'.join(page.extract_text() or '' for page in reader.pages)
+
+
+EXTRACTORS = {
+    'word': _word_text,
+    'excel': _excel_text,
+    'ppt': _ppt_text,
+    'pdf': _pdf_text,
+}
+
+
+def extract_text(path, category):
+    """
+    Text ng file sa ``path`` ayon sa Document.category. Walang laman kapag
+    hindi suportado ang uri (hal. lumang .doc/.xls o 'other').
+    """
+    extractor = EXTRACTORS.get(category)
+    if extractor is None:
+        return ''
+    try:
+        text = extractor(path)
+    except (zipfile.BadZipFile, KeyError):
+        # Lumang binary Office format (OLE2) o sirang file
+        return ''
+    text = SPACE_RE.sub(' ', text)
+    return '\n'.join(line.strip() for line in text.splitlines() if line.strip())[:MAX_TEXT_LENGTH]
+
+
+# --- PROCESS-POOL WORKER HELPERS (walang Django, kaya ligtas sa kahit anong start method) ---
+
+class ExtractionTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise ExtractionTimeout()
+
+
+def limit_worker_memory(memory_limit_mb):
+    """Initializer ng worker process: limitahan ang address space nito."""
+    if memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def run_extraction(doc_id, path, category, timeout):
+    """
+    Tinatawag sa loob ng worker process. Returns ``(doc_id, status, text, error)``
+    kung saan ang status ay 'done' o 'failed'; hindi nagre-raise.
+    """
+    if not os.path.exists(path):
+        return doc_id, 'failed', '', 'File not found.'
+
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.alarm(max(1, int(timeout)))
+    try:
+        return doc_id, 'done', extract_text(path, category), ''
+    except ExtractionTimeout:
+        return doc_id, 'failed', '', f'Timed out after {timeout}s.'
+    except MemoryError:
+        return doc_id, 'failed', '', 'Memory limit exceeded.'
+    except Exception as e:
+        return doc_id, 'failed', '', f'{type(e).__name__}: {e}'[:2000]
+    finally:
+        signal.alarm(0)
+        signal.signal(signal.SIGALRM, previous)
@@ -0,0 +1,203 @@
+"""
+Pag-detect ng uri ng file (category) mula sa magic bytes at extension.
+
+Hindi pinagkakatiwalaan ang extension lang: ang PDF ay may ``%PDF`` header,
+ang DOCX/XLSX/PPTX ay ZIP na may ``word/``, ``xl/`` o ``ppt/`` folder, at
+ang lumang DOC/XLS/PPT ay OLE2 compound file.
+"""
+import mimetypes
+import os
+import re
+import zipfile
+
+PDF_MAGIC = b'%PDF'
+ZIP_MAGIC = b'PK\x03\x04'
+OLE2_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+EXTENSION_CATEGORIES = {
+    '.pdf': 'pdf',
+    '.doc': 'word', '.docx': 'word', '.docm': 'word', '.odt': 'word', '.rtf': 'word',
+    '.xls': 'excel', '.xlsx': 'excel', '.xlsm': 'excel', '.ods': 'excel', '.csv': 'excel',
+    '.ppt': 'ppt', '.pptx': 'ppt', '.pptm': 'ppt', '.odp': 'ppt',
+}
+
+# Plain-text formats na walang magic bytes
+TEXT_EXTENSIONS = {'.csv', '.rtf'}
+
+# MIME type kada category kapag hindi kilala ang extension
+CATEGORY_MIME_TYPES = {
+    'pdf': 'application/pdf',
+    'word': 'application/msword',
+    'excel': 'application/vnd.ms-excel',
+    'ppt': 'application/vnd.ms-powerpoint',
+}
+
+# Unang folder sa loob ng Office Open XML package
+OOXML_FOLDERS = {'word/': 'word', 'xl/': 'excel', 'ppt/': 'ppt'}
+
+
+def category_from_extension(name):
+    ext = os.path.splitext(name or '')[1].lower()
+    return EXTENSION_CATEGORIES.get(ext, 'other')
+
+
+def _ooxml_category(fileobj):
+    try:
+        with zipfile.ZipFile(fileobj) as archive:
+            for entry in archive.namelist():
+                for folder, category in OOXML_FOLDERS.items():
+                    if entry.startswith(folder):
+                        return category
+    except (zipfile.BadZipFile, OSError, ValueError):
+        pass
+    return None
+
+
+def detect_category(fileobj, name=None):
+    """
+    Ibalik ang category ('word', 'excel', 'ppt', 'pdf' o 'other') ng file.
+
+    ``fileobj`` ay kahit anong seekable binary file (UploadedFile, FieldFile,
+    open() file). Ibinabalik sa simula ang position pagkatapos basahin.
+    """
+    name = name or getattr(fileobj, 'name', '')
+    by_extension = category_from_extension(name)
+    try:
+        fileobj.seek(0)
+        header = fileobj.read(8)
+    except (OSError, ValueError):
+        return by_extension
+
+    try:
+        if header.startswith(PDF_MAGIC):
+            return 'pdf'
+        if header.startswith(ZIP_MAGIC):
+            fileobj.seek(0)
+            return _ooxml_category(fileobj) or by_extension
+        if header.startswith(OLE2_MAGIC):
+            # Iisa ang header ng DOC/XLS/PPT kaya extension na ang basehan
+            return by_extension if by_extension in ('word', 'excel', 'ppt') else 'other'
+        # Walang kilalang magic: text formats lang ang puwedeng extension ang basehan
+        ext = os.path.splitext(name or '')[1].lower()
+        return by_extension if ext in TEXT_EXTENSIONS else 'other'
+    finally:
+        fileobj.seek(0)
+
+
+# --- FILE METADATA (size, MIME type, page count) ---
+
+PDF_PAGE_RE = re.compile(rb'/Type\s*/Page(?![a-zA-Z])')
+PDF_SCAN_BLOCK = 1024 * 1024
+
+
+def guess_mime_type(name, category=None):
+    mime_type, _ = mimetypes.guess_type(name or '')
+    return mime_type or CATEGORY_MIME_TYPES.get(category, 'application/octet-stream')
+
+
+def _pdf_page_count(fileobj):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        PdfReader = None
+
+    if PdfReader is not None:
+        try:
+            return len(PdfReader(fileobj).pages)
+        except Exception:
+            fileobj.seek(0)
+
+    # Fallback: bilangin ang "/Type /Page" objects (hindi kasama ang /Pages).
+    # Ang huling 32 bytes ng bawat block ay isinasama sa susunod para sa
+    # match na nahati sa dalawang block.
+    count = 0
+    tail = b''
+    for block in iter(lambda: fileobj.read(PDF_SCAN_BLOCK), b''):
+        data = tail + block
+        cut = max(0, len(data) - 32)
+        count += sum(1 for match in PDF_PAGE_RE.finditer(data) if match.start() < cut)
+        tail = data[cut:]
+    count += len(PDF_PAGE_RE.findall(tail))
+    return count or None
+
+
+def _ooxml_page_count(fileobj, category):
+    """Pages (DOCX) o Slides (PPTX) mula sa docProps/app.xml."""
+    tag = 'Pages' if category == 'word' else 'Slides'
+    try:
+        with zipfile.ZipFile(fileobj) as archive:
+            try:
+                app = archive.read('docProps/app.xml').decode('utf-8', 'ignore')
+            except KeyError:
+                app = ''
+            match = re.search(rf'<{tag}>(\d+)</{tag}>', app)
+            if match:
+                return int(match.group(1))
+            if category == 'ppt':
+                return sum(
+                    1 for entry in archive.namelist()
+                    if re.fullmatch(r'ppt/slides/slide\d+\.xml', entry)
+                ) or None
+    except (zipfile.BadZipFile, OSError, ValueError):
+        pass
+    return None
+
+
+def page_count(fileobj, category):
+    """
+    Bilang ng pages (PDF, DOCX) o slides (PPTX); None kapag hindi applicable
+    o hindi mabasa. Ibinabalik sa simula ang position ng ``fileobj``.
+    """
+    if category not in ('pdf', 'word', 'ppt'):
+        return None
+    try:
+        fileobj.seek(0)
+        header = fileobj.read(4)
+        fileobj.seek(0)
+        if header.startswith(PDF_MAGIC):
+            return _pdf_page_count(fileobj)
+        if header.startswith(ZIP_MAGIC):
+            return _ooxml_page_count(fileobj, category)
+    except (OSError, ValueError):
+        pass
+    finally:
+        try:
+            fileobj.seek(0)
+        except (OSError, ValueError):
+            pass
+    return None
+
+
+def file_metadata(fileobj, name, category):
+    """Returns ``{'file_size', 'mime_type', 'page_count'}`` ng isang file."""
+    return {
+        'file_size': fileobj.size,
+        'mime_type': guess_mime_type(name, category),
+        'page_count': page_count(fileobj, category),
+    }
+
+
+def path_metadata(path, category):
+    """
+    Tulad ng ``file_metadata`` pero mula sa path sa disk, kasama ang sha256.
+    Walang Django dito kaya puwedeng tawagin sa worker process.
+    """
+    from .storage import path_sha256
+
+    with open(path, 'rb') as handle:
+        count = page_count(handle, category)
+    return {
+        'file_size': os.path.getsize(path),
+        'mime_type': guess_mime_type(path, category),
+        'page_count': count,
+        'sha256': path_sha256(path),
+    }
+
+
+def path_metadata_job(job):
+    """Worker wrapper ng ``path_metadata``: ``(doc_id, path, category)`` -> ``(doc_id, metadata, error)``."""
+    doc_id, path, category = job
+    try:
+        return doc_id, path_metadata(path, category), ''
+    except OSError as e:
+        return doc_id, None, str(e)
@@ -1,11 +1,52 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm, PasswordResetForm
 from django.contrib.auth import get_user_model
+from django.forms.utils import flatatt
+from django.template import loader
+from django.utils.html import format_html
+from .caching import school_options
+from .mail import queue_mail
 from .models import User, School
 
 # Kunin ang kasalukuyang User model
 User = get_user_model()
 
+DEPED_EMAIL_DOMAIN = '@deped.gov.ph'
+RECOVERY_EMAIL_DOMAIN = '@gmail.com'
+
+# --- DOMAIN RULES (ginagamit din ng bulk roster import, tingnan ang importers.py) ---
+
+def validate_deped_email(email):
+    """Dapat official @deped.gov.ph ang login email. Returns lowercase email."""
+    email = (email or '').strip().lower()
+    if not email.endswith(DEPED_EMAIL_DOMAIN):
+        raise forms.ValidationError("Please use your official @deped.gov.ph email address.")
+    return email
+
+def validate_recovery_email(p_email):
+    """Dapat Gmail ang recovery email. Returns lowercase email."""
+    p_email = (p_email or '').strip().lower()
+    if not p_email.endswith(RECOVERY_EMAIL_DOMAIN):
+        raise forms.ValidationError("Please provide a valid @gmail.com address for recovery.")
+    return p_email
+
+# --- SCHOOL SELECT (naka-cache ang options, tingnan ang caching.py) ---
+
+class SchoolSelect(forms.Select):
+    """Select ng schools na galing sa naka-cache na markup; walang School query sa render."""
+
+    def __init__(self, attrs=None, empty_label=None):
+        super().__init__(attrs)
+        self.empty_label = empty_label
+
+    def render(self, name, value, attrs=None, renderer=None):
+        empty = format_html('<option value="">{}</option>', self.empty_label) if self.empty_label else ''
+        return format_html(
+            '<select name="{}"{}>{}{}</select>',
+            name, flatatt(self.build_attrs(self.attrs, attrs)), empty,
+            school_options(selected=value, label='full'),
+        )
+
 # --- REGISTRATION FORM ---
 
 class EmployeeRegistrationForm(UserCreationForm):
@@ -52,9 +93,9 @@ class EmployeeRegistrationForm(UserCreationForm):
         label="School/Office",
         required=True,
         empty_label="Select School/Office",
-        widget=forms.Select(attrs={
+        widget=SchoolSelect(attrs={
             'class': 'form-select'
-        })
+        }, empty_label="Select School/Office")
     )
 
     password1 = forms.CharField(
@@ -89,20 +130,15 @@ class EmployeeRegistrationForm(UserCreationForm):
 
     def clean_email(self):
         """Siguraduhin na @deped.gov.ph ang gamit at unique."""
-        email = self.cleaned_data.get('email').lower()
-        if not email.endswith('@deped.gov.ph'):
-            raise forms.ValidationError("Please use your official @deped.gov.ph email address.")
-        
-        if User.objects.filter(email__iexact=email).exists():
+        email = validate_deped_email(self.cleaned_data.get('email'))
+
+        if User.objects.by_email(email).exists():
             raise forms.ValidationError("This DepEd email is already registered.")
         return email
 
     def clean_personal_email(self):
         """Siguraduhin na Gmail ang recovery email."""
-        p_email = self.cleaned_data.get('personal_email').lower()
-        if not p_email.endswith('@gmail.com'):
-            raise forms.ValidationError("Please provide a valid @gmail.com address for recovery.")
-        return p_email
+        return validate_recovery_email(self.cleaned_data.get('personal_email'))
 
     def clean_password2(self):
         """Validation para sa pagtutugma ng password."""
@@ -154,13 +190,33 @@ class CustomPasswordResetForm(PasswordResetForm):
         })
     )
 
+    def send_mail(self, subject_template_name, email_template_name, context,
+                  from_email, to_email, html_email_template_name=None):
+        """Ilagay sa outbox ang reset email sa halip na ipadala sa loob ng request."""
+        subject = ''.join(loader.render_to_string(subject_template_name, context).splitlines())
+        body = loader.render_to_string(email_template_name, context)
+        html_body = ''
+        if html_email_template_name is not None:
+            html_body = loader.render_to_string(html_email_template_name, context)
+        queue_mail(subject, body, from_email, [to_email], html_message=html_body)
+
     def get_users(self, email):
         """
         Overrides the default method to search in personal_email field
         instead of the primary email field.
         """
-        active_users = User.objects.filter(
-            personal_email__iexact=email, 
-            is_active=True 
-        )
-        return active_users
\ No newline at end of file
+        active_users = User.objects.by_personal_email(email).filter(is_active=True)
+        return active_users
+
+# --- BULK ROSTER IMPORT (ADMIN) ---
+
+class RosterImportForm(forms.Form):
+    roster = forms.FileField(
+        label="Roster file (CSV or XLSX)",
+        help_text="Columns: email, personal_email, full_name, school_id, gender, position, password (optional)."
+    )
+    activate = forms.BooleanField(
+        label="Activate accounts immediately",
+        required=False,
+        initial=True
+    )
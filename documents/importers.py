@@ -0,0 +1,234 @@
+"""
+Bulk import ng employee roster (CSV o XLSX) para sa buong division.
+
+Binabasa ang file nang row-by-row (hindi nilo-load lahat sa memory),
+vina-validate ang parehong domain rules ng EmployeeRegistrationForm, at
+nag-i-insert kada batch gamit ang ``bulk_create`` sa loob ng isang
+transaction, kaya kapag pumalya ang import, buo ang mga naunang batch at
+puwedeng patakbuhin ulit ang parehong file (nilalaktawan ang rehistrado na).
+
+Sa ``import_users`` command, ang password hashing (ang pinakamabagal na
+bahagi) ay hinahati sa isang process pool; sa admin upload (web request) ay
+sunod-sunod lang ito, walang fork.
+"""
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+
+from django import db
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+
+from .caching import invalidate_pending_count
+from .forms import validate_deped_email, validate_recovery_email
+from .models import School, SystemCounter, User
+
+ROSTER_COLUMNS = ('email', 'personal_email', 'full_name', 'school_id', 'gender', 'position', 'password')
+REQUIRED_COLUMNS = ('email', 'personal_email', 'full_name', 'school_id')
+GENDERS = {'male': 'Male', 'female': 'Female'}
+
+
+class RosterImportError(Exception):
+    """Hindi mabasa ang roster file (maling format o kulang na columns)."""
+
+
+def _normalize_header(header):
+    return [str(col or '').strip().lower().replace(' ', '_') for col in header]
+
+
+def _check_header(header):
+    missing = [col for col in REQUIRED_COLUMNS if col not in header]
+    if missing:
+        raise RosterImportError(f"Missing column(s): {', '.join(missing)}")
+
+
+def iter_csv_rows(fileobj):
+    if isinstance(fileobj.read(0), bytes):
+        fileobj = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    reader = csv.reader(fileobj)
+    header = _normalize_header(next(reader, []))
+    _check_header(header)
+    for values in reader:
+        if any(values):
+            yield dict(zip(header, values))
+
+
+def iter_xlsx_rows(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise RosterImportError("XLSX import requires the openpyxl package. Save the roster as CSV instead.")
+
+    # read_only mode: isang row lang ang nasa memory bawat pagkakataon
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = _normalize_header(next(rows, []))
+        _check_header(header)
+        for values in rows:
+            if any(v not in (None, '') for v in values):
+                yield {key: '' if value is None else str(value) for key, value in zip(header, values)}
+    finally:
+        workbook.close()
+
+
+def iter_roster_rows(fileobj, filename):
+    ext = os.path.splitext(filename or '')[1].lower()
+    if ext == '.xlsx':
+        return iter_xlsx_rows(fileobj)
+    if ext in ('.csv', '.txt', ''):
+        return iter_csv_rows(fileobj)
+    raise RosterImportError("Unsupported roster format. Use CSV or XLSX.")
+
+
+class RosterImportResult:
+    def __init__(self):
+        self.created = 0
+        self.errors = []  # (line number, message)
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+
+def _init_hash_worker():
+    # Kailangan kapag "spawn" ang start method (hindi minana ang settings)
+    import django
+    django.setup()
+
+
+def _validate_row(row, school_map):
+    """Returns (cleaned dict, None) o (None, error message)."""
+    try:
+        email = validate_deped_email(row.get('email'))
+        personal_email = validate_recovery_email(row.get('personal_email'))
+    except ValidationError as e:
+        return None, ' '.join(e.messages)
+
+    full_name = (row.get('full_name') or '').strip()
+    if not full_name:
+        return None, "Full name is required."
+
+    school_code = (row.get('school_id') or '').strip().upper()
+    school_pk = school_map.get(school_code)
+    if school_pk is None:
+        return None, f"Unknown school ID '{school_code}'."
+
+    return {
+        'email': email,
+        'personal_email': personal_email,
+        'full_name': full_name[:255],
+        'school_id': school_pk,
+        'gender': GENDERS.get((row.get('gender') or '').strip().lower()),
+        'position': (row.get('position') or '').strip()[:100],
+        'password': row.get('password') or '',
+    }, None
+
+
+def import_roster(rows, batch_size=1000, workers=1, active=True):
+    """
+    I-import ang ``rows`` (iterable ng dicts mula sa ``iter_roster_rows``).
+    Ang mga row na may mali ay nilalaktawan at inililista sa result.errors.
+    Kapag ``workers`` > 1 (o None = CPU count), sa process pool ginagawa ang
+    password hashing; para lang ito sa management command, hindi sa request.
+    """
+    result = RosterImportResult()
+    school_map = dict(School.objects.values_list('school_id', 'pk'))
+    seen_emails = set()
+    numbered = enumerate(rows, start=2)  # line 1 ang header
+    workers = workers or os.cpu_count() or 1
+
+    if workers > 1:
+        # Isara ang DB connections bago mag-fork para hindi ito mamana ng workers
+        db.connections.close_all()
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_hash_worker)
+    else:
+        executor = nullcontext()
+
+    try:
+        with executor as pool:
+            while True:
+                batch = list(islice(numbered, batch_size))
+                if not batch:
+                    break
+                result.created += _import_batch(batch, school_map, seen_emails, result, pool, workers, active)
+    finally:
+        # Hindi dumadaan sa signals ang bulk_create; bilangin kahit pumalya sa gitna
+        if result.created:
+            SystemCounter.rebuild([SystemCounter.TOTAL_USERS])
+            invalidate_pending_count()
+    return result
+
+
+def _import_batch(batch, school_map, seen_emails, result, pool, workers, active):
+    """I-validate at i-insert ang isang batch sa iisang transaction. Returns bilang ng nagawa."""
+    cleaned = []
+    for line, row in batch:
+        data, error = _validate_row(row, school_map)
+        if error:
+            result.add_error(line, error)
+        elif data['email'] in seen_emails:
+            result.add_error(line, f"Duplicate email {data['email']} in roster.")
+        else:
+            seen_emails.add(data['email'])
+            cleaned.append((line, data))
+
+    # Isang query kada batch para sa mga email na rehistrado na (hal. sa retry);
+    # case-insensitive tulad ng by_email (LOWER(email) index). Lowercase na ang
+    # emails ng roster (validate_deped_email).
+    existing = set(
+        User.objects.annotate(email_lower=Lower('email'))
+        .filter(email_lower__in=[data['email'] for _, data in cleaned])
+        .values_list('email_lower', flat=True)
+    )
+    new_rows = []
+    for line, data in cleaned:
+        if data['email'] in existing:
+            result.add_error(line, f"{data['email']} is already registered.")
+        else:
+            new_rows.append((line, data))
+    if not new_rows:
+        return 0
+
+    # Walang password sa roster -> unusable; gagamit sila ng "Forgot Password"
+    passwords = [data.pop('password') or None for _, data in new_rows]
+    if pool is not None:
+        chunksize = max(1, len(passwords) // (4 * workers))
+        hashes = pool.map(make_password, passwords, chunksize=chunksize)
+    else:
+        hashes = map(make_password, passwords)
+
+    users = [
+        (line, User(
+            username=data['email'],
+            is_active=active,
+            is_employee=True,
+            password=password_hash,
+            **data,
+        ))
+        for (line, data), password_hash in zip(new_rows, hashes)
+    ]
+    # Buo o wala ang batch; ang mga naunang batch ay naka-commit na
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create([user for _, user in users], batch_size=len(users))
+        return len(users)
+    except IntegrityError:
+        pass
+
+    # May nakarehistrong kasabay (hal. sabay na registration): isa-isa na lang
+    # para malaman kung aling row ang nagbanggaan
+    created = 0
+    for line, user in users:
+        try:
+            with transaction.atomic():
+                user.save(force_insert=True)
+        except IntegrityError:
+            result.add_error(line, f"{user.email} is already registered.")
+        else:
+            created += 1
+    return created
@@ -0,0 +1,142 @@
+"""
+Durable email outbox.
+
+``queue_mail`` ay kapalit ng ``send_mail`` sa loob ng views: isang INSERT
+lang, kaya hindi na naghihintay ang request sa SMTP server. Ang
+``send_outbox`` management command ang kumukuha ng mga naka-pilang email at
+nagpapadala gamit ang iisang SMTP connection kada batch, may retry at
+exponential backoff kapag pumalya.
+"""
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+MAX_ATTEMPTS = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 6)
+RETRY_BASE_SECONDS = getattr(settings, 'OUTBOX_RETRY_BASE_SECONDS', 60)
+RETRY_MAX_SECONDS = 60 * 60
+# Gaano katagal "hawak" ng isang worker ang na-claim na batch bago ito
+# puwedeng kunin ulit ng iba (hal. kapag nag-crash ang worker)
+CLAIM_LEASE_SECONDS = 5 * 60
+# Mga error kapag hindi maabot o pumalya ang SMTP server
+CONNECTION_ERRORS = (OSError, smtplib.SMTPException)
+
+
+def queue_mail(subject, message, from_email, recipient_list, html_message=''):
+    """Kapareho ng signature ng ``send_mail``, pero nilalagay lang sa outbox."""
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=message,
+        html_body=html_message or '',
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipient_list),
+    )
+
+
+def queue_mass_mail(datatuple):
+    """Maraming email sa isang INSERT; ``datatuple`` ay (subject, message, from_email, recipient_list)."""
+    return OutboxEmail.objects.bulk_create([
+        OutboxEmail(
+            subject=subject,
+            body=message,
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+            recipients=list(recipients),
+        )
+        for subject, message, from_email, recipients in datatuple
+    ])
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS))
+
+
+def claim_batch(batch_size):
+    """Kunin ang mga due na email at i-lease para hindi makuha ng ibang worker."""
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if batch:
+            OutboxEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+                next_attempt_at=now + timedelta(seconds=CLAIM_LEASE_SECONDS)
+            )
+    return batch
+
+
+def mark_failed(email, error, max_attempts=MAX_ATTEMPTS):
+    """Dagdag attempt; ibalik sa pila na may backoff o i-fail kapag ubos na ang attempts."""
+    email.attempts += 1
+    email.last_error = str(error)[:2000]
+    if email.attempts >= max_attempts:
+        email.status = OutboxEmail.STATUS_FAILED
+    else:
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def send_pending(batch_size=50, max_attempts=MAX_ATTEMPTS, connection=None):
+    """
+    Ipadala ang isang batch ng outbox emails gamit ang iisang connection.
+    Returns ``(sent, failed)`` na bilang para sa batch na ito. Hindi ito
+    nagre-raise kapag hindi maabot ang SMTP server; ang mga email ay
+    ibinabalik sa pila na may backoff.
+    """
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+
+    connection = connection or get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except CONNECTION_ERRORS as e:
+        for email in batch:
+            mark_failed(email, e, max_attempts)
+        return 0, len(batch)
+
+    sent = failed = 0
+    try:
+        for index, email in enumerate(batch):
+            message = EmailMultiAlternatives(
+                email.subject, email.body, email.from_email, email.recipients, connection=connection,
+            )
+            if email.html_body:
+                message.attach_alternative(email.html_body, 'text/html')
+            try:
+                message.send()
+            except Exception as e:
+                failed += 1
+                mark_failed(email, e, max_attempts)
+                # Baka sira na ang SMTP session; bagong connection para sa natitira
+                _close_quietly(connection)
+                try:
+                    connection.open()
+                except CONNECTION_ERRORS as e:
+                    remaining = batch[index + 1:]
+                    for other in remaining:
+                        mark_failed(other, e, max_attempts)
+                    failed += len(remaining)
+                    break
+            else:
+                sent += 1
+                email.status = OutboxEmail.STATUS_SENT
+                email.sent_at = timezone.now()
+                email.attempts += 1
+                email.save(update_fields=['status', 'sent_at', 'attempts'])
+    finally:
+        _close_quietly(connection)
+    return sent, failed
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except CONNECTION_ERRORS:
+        pass
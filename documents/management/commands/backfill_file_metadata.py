@@ -0,0 +1,61 @@
+"""
+Punan ang file_size, mime_type, sha256 at page_count ng mga lumang memo.
+
+Pinoproseso ang mga Document nang naka-batch ayon sa pk; ang pagbasa at
+pag-hash ng mga file ay ginagawa nang sabay-sabay sa isang process pool, at
+isang ``bulk_update`` lang ang tinatakbo bawat batch.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from documents.filetypes import path_metadata_job
+from documents.models import Document
+
+METADATA_FIELDS = ['file_size', 'mime_type', 'sha256', 'page_count']
+
+
+class Command(BaseCommand):
+    help = "I-backfill ang file metadata ng mga memo gamit ang process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--all', action='store_true', help="Kasama pati ang may metadata na.")
+
+    def handle(self, *args, **options):
+        docs = Document.objects.only('id', 'file', 'category')
+        if not options['all']:
+            docs = docs.filter(Q(file_size__isnull=True) | Q(sha256=''))
+
+        updated = missing = 0
+        last_id = 0
+        context = multiprocessing.get_context('forkserver')
+        with ProcessPoolExecutor(max_workers=max(1, options['workers']), mp_context=context) as pool:
+            while True:
+                batch = list(docs.filter(id__gt=last_id).order_by('id')[:options['batch_size']])
+                if not batch:
+                    break
+                last_id = batch[-1].pk
+
+                by_id = {doc.pk: doc for doc in batch}
+                jobs = [(doc.pk, doc.file.path, doc.category) for doc in batch if doc.file]
+                changed = []
+                for doc_id, metadata, error in pool.map(path_metadata_job, jobs, chunksize=16):
+                    if metadata is None:
+                        missing += 1
+                        self.stderr.write(f"Document {doc_id}: {error}")
+                        continue
+                    doc = by_id[doc_id]
+                    for field, value in metadata.items():
+                        setattr(doc, field, value)
+                    changed.append(doc)
+
+                Document.objects.bulk_update(changed, METADATA_FIELDS)
+                updated += len(changed)
+                self.stdout.write(f"Updated {updated} memos...")
+
+        self.stdout.write(self.style.SUCCESS(f"Updated {updated} memo(s); {missing} unreadable."))
@@ -0,0 +1,161 @@
+"""
+Sukatin ang latency (p50/p95/p99) at bilang ng queries ng mga pangunahing views.
+
+Ginagamit ang Django test client laban sa kasalukuyang database (hal.
+pagkatapos ng ``seed_division``). Kapag may ``--baseline``, ikinukumpara ang
+resulta at nagfa-fail ang command kapag mas mabagal ang p95 nang lampas sa
+``--tolerance`` o kapag dumami ang queries.
+"""
+import json
+import math
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from documents.metrics import QueryCounter
+from documents.models import User
+from documents.seeding import SEED_PASSWORD, seed_email
+
+# (name, role ng client, method, url name, POST data, expected status)
+SCENARIOS = [
+    ('login_page', None, 'get', 'login', None, 200),
+    ('login_submit', None, 'post', 'login', 'credentials', 302),
+    ('dashboard_superadmin', 'superuser', 'get', 'super_admin_dashboard', None, 200),
+    ('dashboard_secretary', 'secretary', 'get', 'admin_dashboard', None, 200),
+    ('dashboard_school_head', 'school_head', 'get', 'school_head_dashboard', None, 200),
+    ('dashboard_district', 'district', 'get', 'admin_dashboard', None, 200),
+    ('user_management', 'superuser', 'get', 'user_management', None, 200),
+    ('user_management_data', 'superuser', 'get', 'user_management_data', None, 200),
+    ('upload_page', 'school_head', 'get', 'upload_document', None, 200),
+    ('received_documents', 'school_head', 'get', 'received_documents', None, 200),
+]
+
+ROLE_FILTERS = {
+    'superuser': {'is_superuser': True},
+    'secretary': {'is_deped_secretary': True},
+    'school_head': {'is_school_head': True, 'school__isnull': False},
+    'district': {'org_unit__kind': 'district'},
+}
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile (values ay naka-sort na)."""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank - 1]
+
+
+class Command(BaseCommand):
+    help = "I-benchmark ang login, dashboards, user management, upload page at received memos views."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--only', nargs='*', help="Mga scenario name lang na patatakbuhin.")
+        parser.add_argument('--email', default=seed_email('head0'), help="Account para sa login_submit.")
+        parser.add_argument('--password', default=SEED_PASSWORD)
+        parser.add_argument('--baseline', help="JSON file ng dating resulta na pagkukumparahan.")
+        parser.add_argument('--save-baseline', help="I-save ang resulta bilang bagong baseline.")
+        parser.add_argument('--tolerance', type=float, default=0.25, help="Pinapayagang dagdag sa p95 (0.25 = 25%%).")
+        parser.add_argument('--min-delta-ms', type=float, default=5.0, help="Hindi regression kapag mas maliit dito ang dagdag.")
+
+    def handle(self, *args, **options):
+        clients = self.role_clients()
+        scenarios = [s for s in SCENARIOS if not options['only'] or s[0] in options['only']]
+        if not scenarios:
+            raise CommandError("Walang tumugmang scenario.")
+
+        results = {}
+        for name, role, method, url_name, data, expected in scenarios:
+            if role and role not in clients:
+                self.stderr.write(f"{name}: skipped (walang active na {role} user)")
+                continue
+            if data == 'credentials':
+                data = {'username': options['email'], 'password': options['password']}
+            result = self.run_scenario(
+                clients.get(role), method, reverse(url_name), data, expected,
+                options['iterations'], options['warmup'],
+            )
+            if result is None:
+                raise CommandError(f"{name}: hindi {expected} ang status; tingnan ang account o data.")
+            results[name] = result
+
+        self.report(results)
+
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as handle:
+                json.dump(results, handle, indent=2, sort_keys=True)
+            self.stdout.write(f"Baseline saved to {options['save_baseline']}.")
+
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as handle:
+                    baseline = json.load(handle)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Hindi mabasa ang baseline: {e}")
+            regressions = self.compare(results, baseline, options['tolerance'], options['min_delta_ms'])
+            if regressions:
+                for line in regressions:
+                    self.stderr.write(line)
+                raise CommandError(f"{len(regressions)} regression(s) laban sa baseline.")
+            self.stdout.write(self.style.SUCCESS("Walang regression laban sa baseline."))
+
+    def role_clients(self):
+        clients = {}
+        for role, filters in ROLE_FILTERS.items():
+            user = User.objects.filter(is_active=True, **filters).order_by('id').first()
+            if user:
+                client = Client(HTTP_HOST='localhost')
+                client.force_login(user)
+                clients[role] = client
+        return clients
+
+    def run_scenario(self, client, method, url, data, expected, iterations, warmup):
+        timings = []
+        queries = []
+        for run in range(warmup + iterations):
+            # Anonymous: bagong client bawat request para walang naiwang session
+            request_client = client or Client(HTTP_HOST='localhost')
+            counter = QueryCounter()
+            start = time.perf_counter()
+            with connection.execute_wrapper(counter):
+                response = getattr(request_client, method)(url, data)
+            elapsed = (time.perf_counter() - start) * 1000
+            if response.status_code != expected:
+                return None
+            if run >= warmup:
+                timings.append(elapsed)
+                queries.append(counter.count)
+
+        timings.sort()
+        return {
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'p99_ms': round(percentile(timings, 99), 2),
+            'queries': max(queries),
+        }
+
+    def report(self, results):
+        self.stdout.write(f"{'scenario':<24}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<24}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+                f"{result['p99_ms']:>10.2f}{result['queries']:>9}"
+            )
+
+    def compare(self, results, baseline, tolerance, min_delta_ms):
+        regressions = []
+        for name, result in results.items():
+            base = baseline.get(name)
+            if not base:
+                continue
+            limit = base['p95_ms'] * (1 + tolerance)
+            if result['p95_ms'] > limit and result['p95_ms'] - base['p95_ms'] >= min_delta_ms:
+                regressions.append(f"{name}: p95 {result['p95_ms']:.2f}ms (baseline {base['p95_ms']:.2f}ms)")
+            if result['queries'] > base['queries']:
+                regressions.append(f"{name}: {result['queries']} queries (baseline {base['queries']})")
+        return regressions
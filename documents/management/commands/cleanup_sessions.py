@@ -0,0 +1,34 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from documents.sessions import CLEANUP_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Burahin ang expired sessions nang paunti-unti (puwedeng patakbuhin nang tuloy-tuloy gamit ang --loop)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=CLEANUP_BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=0.1, help="Segundong pahinga sa pagitan ng mga batch.")
+        parser.add_argument('--loop', action='store_true', help="Huwag tumigil; maglinis tuwing --interval.")
+        parser.add_argument('--interval', type=float, default=3600.0)
+
+    def handle(self, *args, **options):
+        engine = import_module(settings.SESSION_ENGINE)
+        clear_expired = engine.SessionStore.clear_expired
+        batched = settings.SESSION_ENGINE == 'documents.sessions'
+
+        while True:
+            if batched:
+                deleted = clear_expired(batch_size=options['batch_size'], pause=options['pause'])
+                self.stdout.write(f"Deleted {deleted} expired session(s).")
+            else:
+                # Ibang engine (hal. signed_cookies): ang sariling clear_expired nito
+                clear_expired()
+                self.stdout.write("Expired sessions cleared.")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from documents.uploads import EXPIRE_AFTER, expire_upload_sessions
+
+
+class Command(BaseCommand):
+    help = "Burahin ang mga chunked upload na hindi natapos at ang kanilang .part files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age', type=float, default=EXPIRE_AFTER / 3600,
+            help="Oras na walang bagong chunk bago ituring na iniwan ang upload.",
+        )
+
+    def handle(self, *args, **options):
+        expired = expire_upload_sessions(max_age=options['max_age'] * 3600)
+        self.stdout.write(self.style.SUCCESS(f"Expired {expired} abandoned upload session(s)."))
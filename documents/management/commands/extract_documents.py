@@ -0,0 +1,149 @@
+"""
+Background text extraction ng mga memo (para sa full-text search).
+
+Kinukuha ang mga Document na ``extraction_status='pending'``, minamarkahang
+``processing`` (claim), at pinoproseso sa isang ProcessPoolExecutor na may
+per-file timeout at memory limit. Kapag nag-crash ang worker command, ang mga
+naiwang ``processing`` rows na lumampas sa ``--stale-after`` ay ibinabalik
+sa pending sa susunod na takbo, kaya tuloy lang ito kung saan huminto.
+"""
+import multiprocessing
+import os
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from documents import search
+from documents.extraction import EXTRACTORS, limit_worker_memory, run_extraction
+from documents.models import Document, DocumentText
+
+MAX_ATTEMPTS = 3
+
+
+class Command(BaseCommand):
+    help = "I-extract ang text ng mga naka-pilang memo gamit ang process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--timeout', type=int, default=60, help="Segundo bawat file.")
+        parser.add_argument('--memory-limit', type=int, default=1024, help="MB bawat worker process (0 = walang limit).")
+        parser.add_argument('--stale-after', type=int, default=900, help="Segundo bago ibalik sa pending ang naiwang 'processing'.")
+        parser.add_argument('--loop', action='store_true', help="Huwag tumigil; hintayin ang mga bagong upload.")
+        parser.add_argument('--interval', type=float, default=10.0)
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.processed = self.failed = 0
+        self.recover_stale()
+
+        while True:
+            try:
+                self.run_pool()
+            except BrokenProcessPool:
+                # May worker na namatay (hal. segfault); ibalik ang in-flight at ulitin
+                self.stderr.write("Worker pool crashed; restarting.")
+                self.recover_stale(force=True)
+                continue
+            if not self.options['loop']:
+                break
+            time.sleep(self.options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Extracted {self.processed} memo(s); {self.failed} failed."))
+
+    def recover_stale(self, force=False):
+        stale = Document.objects.filter(extraction_status=Document.EXTRACTION_PROCESSING)
+        if not force:
+            cutoff = timezone.now() - timedelta(seconds=self.options['stale_after'])
+            stale = stale.filter(extraction_started_at__lt=cutoff)
+        stale.filter(extraction_attempts__gte=MAX_ATTEMPTS).update(extraction_status=Document.EXTRACTION_FAILED)
+        stale.update(extraction_status=Document.EXTRACTION_PENDING)
+
+    def claim(self, limit):
+        """Markahang processing ang susunod na batch; returns ang mga na-claim."""
+        ids = list(
+            Document.objects.filter(extraction_status=Document.EXTRACTION_PENDING)
+            .order_by('id').values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        now = timezone.now()
+        Document.objects.filter(pk__in=ids, extraction_status=Document.EXTRACTION_PENDING).update(
+            extraction_status=Document.EXTRACTION_PROCESSING,
+            extraction_started_at=now,
+            extraction_attempts=F('extraction_attempts') + 1,
+        )
+        # Ang mga na-update lang natin (baka may ibang worker na nauna)
+        return list(
+            Document.objects.filter(pk__in=ids, extraction_status=Document.EXTRACTION_PROCESSING,
+                                    extraction_started_at=now)
+            .only('id', 'title', 'file', 'category', 'school', 'date_uploaded')
+        )
+
+    def run_pool(self):
+        workers = max(1, self.options['workers'])
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            # forkserver: malinis na workers at puwedeng i-recycle (max_tasks_per_child)
+            mp_context=multiprocessing.get_context('forkserver'),
+            initializer=limit_worker_memory,
+            initargs=(self.options['memory_limit'],),
+            max_tasks_per_child=200,
+        )
+        in_flight = {}
+        docs_by_id = {}
+        try:
+            while True:
+                # Panatilihing puno ang pool para gamit ang lahat ng cores
+                if len(in_flight) < workers * 2:
+                    for doc in self.claim(self.options['batch_size']):
+                        if doc.category not in EXTRACTORS:
+                            self.finish(doc, Document.EXTRACTION_SKIPPED, '', '')
+                            continue
+                        try:
+                            path = doc.file.path
+                        except (ValueError, NotImplementedError):
+                            self.finish(doc, Document.EXTRACTION_FAILED, '', 'No local file.')
+                            continue
+                        future = pool.submit(run_extraction, doc.pk, path, doc.category, self.options['timeout'])
+                        in_flight[future] = doc.pk
+                        docs_by_id[doc.pk] = doc
+
+                if not in_flight:
+                    return
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    in_flight.pop(future)
+                    doc_id, status, text, error = future.result()
+                    self.finish(docs_by_id.pop(doc_id), status, text, error)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def finish(self, doc, status, text, error):
+        # Baka nabura ang memo habang ine-extract; wala nang ise-save
+        if not Document.objects.filter(pk=doc.pk).update(extraction_status=status):
+            return
+        try:
+            with transaction.atomic():
+                DocumentText.objects.update_or_create(document_id=doc.pk, defaults={'text': text, 'error': error})
+        except IntegrityError:
+            # Nabura sa pagitan ng dalawang query
+            return
+        if status == Document.EXTRACTION_FAILED:
+            self.failed += 1
+            self.stderr.write(f"Document {doc.pk}: {error}")
+        else:
+            self.processed += 1
+            # Hindi dapat tumigil ang worker dahil lang sa search index
+            try:
+                search.index_document(doc, text)
+            except sqlite3.Error as e:
+                self.stderr.write(f"Document {doc.pk}: search index update failed ({e})")
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from documents.importers import RosterImportError, import_roster, iter_roster_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk import ng employee roster mula sa CSV o XLSX file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV o XLSX file na may header row.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=None, help="Ilang process para sa password hashing (default: CPU count).")
+        parser.add_argument('--inactive', action='store_true', help="I-import bilang pending (kailangan pang i-approve).")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as handle:
+                rows = iter_roster_rows(handle, options['path'])
+                result = import_roster(
+                    rows,
+                    batch_size=options['batch_size'],
+                    workers=options['workers'] or None,
+                    active=not options['inactive'],
+                )
+        except (OSError, RosterImportError) as e:
+            raise CommandError(str(e))
+
+        for line, message in result.errors:
+            self.stderr.write(f"Line {line}: {message}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.created} user(s); skipped {len(result.errors)} row(s)."
+        ))
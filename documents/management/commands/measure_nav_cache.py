@@ -0,0 +1,77 @@
+"""
+Sukatin kung gaano kabilis ang bawat dashboard kapag naka-cache ang navbar at
+sidebar fragments (``{% navcache %}``) kumpara sa buong render.
+
+Salitan ang requests na naka-on at naka-off ang ``NAV_CACHE_ENABLED`` para
+pareho ang kondisyon ng dalawa; median ang ipinapakita.
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from documents.management.commands.benchmark_views import ROLE_FILTERS
+from documents.models import User
+
+# (url name, role ng user na titingin)
+DASHBOARDS = [
+    ('super_admin_dashboard', 'superuser'),
+    ('user_management', 'superuser'),
+    ('access_requests', 'superuser'),
+    ('admin_dashboard', 'secretary'),
+    ('compliance_report', 'secretary'),
+    ('school_head_dashboard', 'school_head'),
+    ('received_documents', 'school_head'),
+    ('upload_document', 'school_head'),
+]
+
+
+class Command(BaseCommand):
+    help = "Sukatin ang render time na natitipid ng naka-cache na navbar/sidebar sa bawat dashboard."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def handle(self, *args, **options):
+        clients = {}
+        for url_name, role in DASHBOARDS:
+            if role not in clients:
+                user = User.objects.filter(is_active=True, **ROLE_FILTERS[role]).order_by('id').first()
+                clients[role] = None
+                if user:
+                    clients[role] = Client(HTTP_HOST='localhost')
+                    clients[role].force_login(user)
+
+        self.stdout.write(f"{'page':<24}{'full ms':>10}{'cached ms':>11}{'saved ms':>10}{'saved':>8}")
+        measured = 0
+        for url_name, role in DASHBOARDS:
+            client = clients[role]
+            if client is None:
+                self.stderr.write(f"{url_name}: skipped (walang active na {role} user)")
+                continue
+            url = reverse(url_name)
+            self.request(client, url)  # punuin ang cache
+            full, cached = [], []
+            for _ in range(options['iterations']):
+                with override_settings(NAV_CACHE_ENABLED=False):
+                    full.append(self.request(client, url))
+                cached.append(self.request(client, url))
+            full_ms, cached_ms = statistics.median(full), statistics.median(cached)
+            saved = full_ms - cached_ms
+            self.stdout.write(
+                f"{url_name:<24}{full_ms:>10.2f}{cached_ms:>11.2f}{saved:>10.2f}{saved * 100 / full_ms:>7.0f}%"
+            )
+            measured += 1
+
+        if not measured:
+            raise CommandError("Walang na-measure na dashboard; gumawa muna ng users (hal. seed_division).")
+
+    def request(self, client, url):
+        start = time.perf_counter()
+        response = client.get(url)
+        elapsed = (time.perf_counter() - start) * 1000
+        if response.status_code != 200:
+            raise CommandError(f"{url}: status {response.status_code}")
+        return elapsed
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from documents.compliance import rebuild_rollup
+
+
+class Command(BaseCommand):
+    help = "Buuin ulit ang ComplianceRollup (received/opened/acknowledged kada school kada buwan) mula sa InboxEntry."
+
+    def handle(self, *args, **options):
+        count = rebuild_rollup()
+        self.stdout.write(self.style.SUCCESS(f"Compliance rollup rebuilt ({count} school-month rows)."))
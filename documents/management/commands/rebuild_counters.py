@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from documents.models import SystemCounter
+
+
+class Command(BaseCommand):
+    help = "Bilangin ulit ang SystemCounter totals (users, schools, memos) mula sa database."
+
+    def handle(self, *args, **options):
+        values = SystemCounter.rebuild()
+        for name, value in values.items():
+            self.stdout.write(f"{name}: {value}")
+        self.stdout.write(self.style.SUCCESS("System counters rebuilt."))
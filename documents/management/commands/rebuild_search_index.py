@@ -0,0 +1,51 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery
+
+from documents import search
+from documents.models import Document, DocumentText, InboxEntry
+
+
+class Command(BaseCommand):
+    help = (
+        "Buuin ulit ang full-text search index ng memos mula sa title at sa "
+        "na-extract nang text (tingnan ang extract_documents)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles-only', action='store_true', help="Title lang; huwag galawin ang naka-index na text.")
+        parser.add_argument('--clear', action='store_true', help="Burahin muna ang buong index.")
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            search.clear_index()
+
+        count = 0
+        docs = Document.objects.only('id', 'title', 'school', 'date_uploaded')
+        if not options['titles_only']:
+            docs = docs.annotate(
+                stored_text=Subquery(DocumentText.objects.filter(document=OuterRef('pk')).values('text')[:1])
+            )
+        last_id = 0
+        while True:
+            batch = list(docs.filter(id__gt=last_id).order_by('id')[:500])
+            if not batch:
+                break
+            last_id = batch[-1].pk
+
+            # Recipient schools ng buong batch sa isang query
+            recipients = defaultdict(list)
+            entries = InboxEntry.objects.filter(document_id__in=[doc.pk for doc in batch])
+            for doc_id, school_id in entries.values_list('document_id', 'school_id'):
+                recipients[doc_id].append(school_id)
+
+            for doc in batch:
+                content = None
+                if not options['titles_only']:
+                    content = doc.stored_text or ''
+                search.index_document(doc, content, recipients[doc.pk])
+                count += 1
+            self.stdout.write(f"Indexed {count} memos...")
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} memos."))
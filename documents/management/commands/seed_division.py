@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from documents.seeding import SEED_PASSWORD, SeedError, flush_seed, seed_division
+
+
+class Command(BaseCommand):
+    help = "Gumawa ng synthetic na division-scale dataset (schools, users, memos, inbox) para sa benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50000, help="Bilang ng active users.")
+        parser.add_argument('--documents', type=int, default=500000)
+        parser.add_argument('--pending', type=int, default=2000, help="Bilang ng pending registrations.")
+        parser.add_argument('--days', type=int, default=730, help="Ilang araw pabalik ikakalat ang memos.")
+        parser.add_argument('--broadcast-every', type=int, default=50, help="Bawat ika-N na memo ay para sa lahat ng school.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=1, help="Random seed (parehong dataset sa parehong seed).")
+        parser.add_argument('--flush', action='store_true', help="Burahin muna ang dating seeded data.")
+        parser.add_argument('--force', action='store_true', help="Payagan kahit DEBUG=False.")
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError("Ayaw mag-seed kapag DEBUG=False (baka production ito). Gamitin ang --force kung sigurado.")
+
+        if options['flush']:
+            self.stdout.write(f"Deleted seeded data ({flush_seed()} memos).")
+
+        try:
+            result = seed_division(
+                users=options['users'],
+                documents=options['documents'],
+                pending=options['pending'],
+                days=options['days'],
+                broadcast_every=options['broadcast_every'],
+                batch_size=options['batch_size'],
+                seed=options['seed'],
+                progress=self.stdout.write,
+            )
+        except SeedError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {result.schools} schools, {result.users} users, {result.pending} pending, "
+            f"{result.documents} memos, {result.inbox_entries} inbox entries. "
+            f"Password ng lahat ng seeded users: {SEED_PASSWORD}"
+        ))
+        self.stdout.write("Patakbuhin ang rebuild_search_index kung kailangan ng search sa seeded memos.")
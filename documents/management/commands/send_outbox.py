@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from documents.mail import MAX_ATTEMPTS, send_pending
+
+
+class Command(BaseCommand):
+    help = "Ipadala ang mga naka-pilang email sa outbox (iisang SMTP connection kada batch)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS)
+        parser.add_argument('--loop', action='store_true', help="Huwag tumigil; i-check ang outbox bawat --interval segundo.")
+        parser.add_argument('--interval', type=float, default=10.0)
+
+    def handle(self, *args, **options):
+        while True:
+            total_sent = total_failed = 0
+            while True:
+                sent, failed = send_pending(options['batch_size'], options['max_attempts'])
+                total_sent += sent
+                total_failed += failed
+                # Tapos na ang due emails, o pumalya ang buong batch (hal. down ang
+                # SMTP): hintayin ang susunod na interval sa halip na ubusin ang pila
+                if sent + failed < options['batch_size'] or not sent:
+                    break
+
+            if total_sent or total_failed or not options['loop']:
+                self.stdout.write(f"Sent: {total_sent}, failed: {total_failed}")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
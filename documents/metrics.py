@@ -0,0 +1,159 @@
+"""
+Per-view na latency, database queries at response size (Prometheus format).
+
+Ang ``MetricsMiddleware`` ay nagre-record ng isang sample bawat request (o
+bahagi lang ng requests ayon sa ``METRICS_SAMPLE_RATE``) sa mga histogram na
+nasa memory ng process, naka-label ayon sa URL name at HTTP method. Ang
+``/metrics`` view ang naglalabas nito sa Prometheus text format.
+
+Per process ang histograms: kapag maraming worker (hal. gunicorn), may
+``pid`` label ang bawat series at dapat i-``sum()`` sa query.
+"""
+import bisect
+import os
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+SAMPLE_RATE = getattr(settings, 'METRICS_SAMPLE_RATE', 1.0)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Para hindi lumobo ang bilang ng series dahil sa kakaibang methods
+KNOWN_METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+METRICS = (
+    # (pangalan, help, buckets)
+    ('erdms_request_duration_seconds', 'Wall time of the request.', LATENCY_BUCKETS),
+    ('erdms_db_queries', 'Database queries executed per request.', QUERY_COUNT_BUCKETS),
+    ('erdms_db_query_duration_seconds', 'Total database time per request.', LATENCY_BUCKETS),
+    ('erdms_response_size_bytes', 'Response body size (non-streaming responses).', SIZE_BUCKETS),
+)
+
+_lock = threading.Lock()
+# (view, method, status class) -> [Histogram bawat METRICS]
+_series = {}
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+
+class QueryCounter:
+    """``connection.execute_wrapper`` na nagbibilang ng queries at oras nito."""
+    __slots__ = ('count', 'duration')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def observe(view, method, status, duration, queries, query_time, size=None):
+    key = (view, method if method in KNOWN_METHODS else 'OTHER', f'{status // 100}xx')
+    values = (duration, queries, query_time, size)
+    with _lock:
+        histograms = _series.get(key)
+        if histograms is None:
+            histograms = _series[key] = [Histogram(buckets) for _, _, buckets in METRICS]
+        for histogram, value in zip(histograms, values):
+            if value is not None:
+                histogram.observe(value)
+
+
+def reset():
+    with _lock:
+        _series.clear()
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    """Lahat ng histograms sa Prometheus text exposition format (0.0.4)."""
+    with _lock:
+        snapshot = {
+            key: [(list(h.counts), h.total, h.count) for h in histograms]
+            for key, histograms in _series.items()
+        }
+
+    pid = os.getpid()
+    lines = [
+        '# HELP erdms_metrics_sample_rate Fraction of requests that are measured.',
+        '# TYPE erdms_metrics_sample_rate gauge',
+        f'erdms_metrics_sample_rate {_number(float(SAMPLE_RATE))}',
+    ]
+    for index, (name, help_text, buckets) in enumerate(METRICS):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for (view, method, status), histograms in sorted(snapshot.items()):
+            counts, total, count = histograms[index]
+            if not count:
+                continue
+            labels = f'view="{_label(view)}",method="{method}",status="{status}",pid="{pid}"'
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{{{labels},le="{_number(bound)}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'{name}_sum{{{labels}}} {_number(total)}')
+            lines.append(f'{name}_count{{{labels}}} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """I-record ang oras, queries at laki ng response bawat URL name."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if SAMPLE_RATE < 1.0 and random.random() >= SAMPLE_RATE:
+            return self.get_response(request)
+
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name if match else None) or '<unresolved>'
+        if view == 'metrics':
+            return response
+
+        size = None
+        if not response.streaming:
+            size = len(response.content)
+        observe(view, request.method, response.status_code, duration, counter.count, counter.duration, size)
+        return response
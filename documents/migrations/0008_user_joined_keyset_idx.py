@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('documents', '0007_user_personal_email'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-date_joined', '-id'], name='user_joined_keyset_idx'),
+        ),
+    ]
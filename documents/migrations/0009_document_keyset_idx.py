@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0008_user_joined_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['-date_uploaded', '-id'], name='doc_uploaded_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['school', '-date_uploaded', '-id'], name='doc_school_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:34
+
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    SystemCounter = apps.get_model('documents', 'SystemCounter')
+    sources = {
+        'total_users': apps.get_model('documents', 'User'),
+        'total_schools': apps.get_model('documents', 'School'),
+        'total_memos': apps.get_model('documents', 'Document'),
+    }
+    for name, model in sources.items():
+        SystemCounter.objects.update_or_create(name=name, defaults={'value': model.objects.count()})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0009_document_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SystemCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
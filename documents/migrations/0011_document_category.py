@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:34
+
+from django.db import migrations, models
+from django.db.models import Q
+
+# Kopya ng filetypes.EXTENSION_CATEGORIES noong ginawa ang migration na ito;
+# hindi ini-import para hindi masira ang migration kapag nagbago ang module.
+EXTENSION_CATEGORIES = {
+    'pdf': ['.pdf'],
+    'word': ['.doc', '.docx', '.docm', '.odt', '.rtf'],
+    'excel': ['.xls', '.xlsx', '.xlsm', '.ods', '.csv'],
+    'ppt': ['.ppt', '.pptx', '.pptm', '.odp'],
+}
+
+
+def backfill_category(apps, schema_editor):
+    # Extension lang ang basehan dito para hindi buksan ang bawat file;
+    # isang UPDATE bawat category, ang natitira ay 'other'
+    Document = apps.get_model('documents', 'Document')
+    for category, extensions in EXTENSION_CATEGORIES.items():
+        matches = Q()
+        for ext in extensions:
+            matches |= Q(file__iendswith=ext)
+        Document.objects.filter(matches, category='').update(category=category)
+    Document.objects.filter(category='').update(category='other')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0010_systemcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='category',
+            field=models.CharField(blank=True, choices=[('word', 'Word Document'), ('excel', 'Excel Spreadsheet'), ('ppt', 'PowerPoint Presentation'), ('pdf', 'PDF File'), ('other', 'Other')], db_index=True, max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['uploaded_by', 'category', 'date_uploaded'], name='doc_uploader_category_idx'),
+        ),
+        migrations.RunPython(backfill_category, migrations.RunPython.noop),
+    ]
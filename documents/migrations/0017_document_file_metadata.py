@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0016_document_extraction'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='file_size',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='mime_type',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='page_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0017_document_file_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentView',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_viewed_at', models.DateTimeField(auto_now_add=True)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='viewers', to='documents.document')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='viewed_documents', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('document', 'user'), name='unique_document_viewer')],
+            },
+        ),
+    ]
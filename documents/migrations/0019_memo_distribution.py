@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_inbox(apps, schema_editor):
+    # Ang mga lumang memo ay para sa school ng uploader (Document.school).
+    # Naka-mark na read para hindi bumaha ng "unread" ang mga luma nang memo.
+    Document = apps.get_model('documents', 'Document')
+    InboxEntry = apps.get_model('documents', 'InboxEntry')
+    batch = []
+    rows = Document.objects.filter(school__isnull=False).values_list('id', 'school_id', 'date_uploaded')
+    for doc_id, school_id, date_uploaded in rows.iterator(chunk_size=2000):
+        batch.append(InboxEntry(document_id=doc_id, school_id=school_id, date_sent=date_uploaded, is_read=True))
+        if len(batch) >= 2000:
+            InboxEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    InboxEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0018_documentview'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchoolGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('schools', models.ManyToManyField(blank=True, related_name='groups', to='documents.school')),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='InboxEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date_sent', models.DateTimeField()),
+                ('is_read', models.BooleanField(default=False)),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_entries', to='documents.document')),
+                ('school', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='inbox_entries', to='documents.school')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['school', '-date_sent', '-id'], name='inbox_school_keyset_idx'), models.Index(fields=['school', 'is_read'], name='inbox_school_unread_idx')],
+                'constraints': [models.UniqueConstraint(fields=('document', 'school'), name='unique_inbox_entry')],
+            },
+        ),
+        migrations.RunPython(backfill_inbox, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_rollup(apps, schema_editor):
+    # Isang beses na bilang mula sa mga InboxEntry na na-backfill sa 0019;
+    # incremental na ang mga susunod na update (documents/compliance.py)
+    from collections import Counter
+    from django.utils import timezone
+
+    InboxEntry = apps.get_model('documents', 'InboxEntry')
+    ComplianceRollup = apps.get_model('documents', 'ComplianceRollup')
+    received, opened = Counter(), Counter()
+    rows = InboxEntry.objects.values_list('school_id', 'date_sent', 'is_read')
+    for school_id, date_sent, is_read in rows.iterator(chunk_size=5000):
+        key = (school_id, timezone.localtime(date_sent).date().replace(day=1))
+        received[key] += 1
+        if is_read:
+            opened[key] += 1
+    ComplianceRollup.objects.bulk_create(
+        [
+            ComplianceRollup(school_id=school_id, month=month, received=count, opened=opened[(school_id, month)])
+            for (school_id, month), count in received.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0019_memo_distribution'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inboxentry',
+            name='acknowledged_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='inboxentry',
+            name='acknowledged_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='acknowledged_memos', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.CreateModel(
+            name='ComplianceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='Unang araw ng buwan (local time ng date_sent).')),
+                ('received', models.PositiveIntegerField(default=0)),
+                ('opened', models.PositiveIntegerField(default=0)),
+                ('acknowledged', models.PositiveIntegerField(default=0)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='compliance_rollups', to='documents.school')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['month', 'school'], name='compliance_month_idx')],
+                'constraints': [models.UniqueConstraint(fields=('school', 'month'), name='unique_compliance_rollup')],
+            },
+        ),
+        migrations.RunPython(seed_rollup, migrations.RunPython.noop),
+    ]
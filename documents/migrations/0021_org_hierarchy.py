@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:10
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_division(apps, schema_editor):
+    # Isang root na division; ang mga district ay idinadagdag sa admin at
+    # doon inililipat ang mga school
+    OrgUnit = apps.get_model('documents', 'OrgUnit')
+    School = apps.get_model('documents', 'School')
+    division = OrgUnit.objects.create(name='Schools Division Office', code='SDO', kind='division')
+    division.path = f"{division.pk:06d}/"
+    division.save(update_fields=['path'])
+    School.objects.update(org_unit=division, org_path=division.path)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0020_memo_acknowledgement'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='school',
+            name='org_path',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+        migrations.CreateModel(
+            name='OrgUnit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('code', models.CharField(max_length=50, unique=True, validators=[django.core.validators.RegexValidator('^[A-Z0-9-]+$', 'Code must be uppercase letters, numbers, and hyphens only')])),
+                ('kind', models.CharField(choices=[('division', 'Division'), ('district', 'District')], default='district', max_length=10)),
+                ('path', models.CharField(editable=False, max_length=255, null=True, unique=True)),
+                ('parent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='children', to='documents.orgunit')),
+            ],
+            options={
+                'verbose_name': 'Organization Unit',
+                'ordering': ['path'],
+            },
+        ),
+        migrations.AddField(
+            model_name='school',
+            name='org_unit',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='schools', to='documents.orgunit', verbose_name='District/Division'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='org_unit',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='users', to='documents.orgunit', verbose_name='Scope (District/Division)'),
+        ),
+        migrations.RunPython(create_division, migrations.RunPython.noop),
+    ]
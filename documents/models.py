@@ -1,9 +1,34 @@
+import math
+import os
+import uuid
+
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser, BaseUserManager
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.core.exceptions import ValidationError
+from django.db.models import Q, Value
+from django.db.models.functions import Concat, Length, Lower, Substr
+from django.db.models.lookups import Exact
 from django.utils import timezone
 from django.core.validators import RegexValidator
 
+from .choices import DOCUMENT_CATEGORY_CHOICES
+from .filetypes import detect_category, file_metadata
+from .storage import ContentAddressedStorage, sha256_from_name
+
 class UserManager(BaseUserManager):
+    # Case-insensitive email lookups na gumagamit ng LOWER() functional index
+    # (user_email_lower_idx / user_personal_email_lower_idx). Huwag gumamit ng
+    # email__iexact: sa MySQL, UPPER()/LIKE ang nagiging query at full scan ito.
+    def by_email(self, email):
+        return self.filter(Exact(Lower('email'), (email or '').strip().lower()))
+
+    def by_personal_email(self, email):
+        return self.filter(Exact(Lower('personal_email'), (email or '').strip().lower()))
+
+    def get_by_natural_key(self, username):
+        return self.by_email(username).get()
+
     def create_user(self, email, full_name, password=None, **extra_fields):
         if not email:
             raise ValueError('The Email field must be set')
@@ -30,6 +55,86 @@ class UserManager(BaseUserManager):
         return self.create_user(email, full_name, password, **extra_fields)
 
 
+class OrgUnit(models.Model):
+    """
+    Bahagi ng organisasyon (division -> district) na may materialized path.
+
+    Ang ``path`` ay ang mga pk mula sa root, tig-6 na digit at may "/" (hal.
+    ``000001/000004/``), kaya ang "lahat ng nasa ilalim ng district X" ay
+    isang indexed na ``path__startswith`` lang, walang recursive queries.
+    Kinokopya rin ang path sa ``School.org_path`` para sa mga query sa
+    schools, users, at memos.
+    """
+    KIND_DIVISION = 'division'
+    KIND_DISTRICT = 'district'
+    KIND_CHOICES = [
+        (KIND_DIVISION, 'Division'),
+        (KIND_DISTRICT, 'District'),
+    ]
+    PATH_STEP = 7  # len('000001/')
+
+    name = models.CharField(max_length=255)
+    code = models.CharField(
+        max_length=50,
+        unique=True,
+        validators=[RegexValidator(r'^[A-Z0-9-]+$', 'Code must be uppercase letters, numbers, and hyphens only')]
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default=KIND_DISTRICT)
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='children'
+    )
+    path = models.CharField(max_length=255, unique=True, editable=False, null=True)
+
+    class Meta:
+        verbose_name = "Organization Unit"
+        ordering = ['path']
+
+    def __str__(self):
+        return f"{self.name} ({self.get_kind_display()})"
+
+    @property
+    def depth(self):
+        return len(self.path or '') // self.PATH_STEP
+
+    def clean(self):
+        if self.parent_id and self.pk and self.path and self.parent.path.startswith(self.path):
+            raise ValidationError({'parent': "Hindi puwedeng ilagay ang unit sa ilalim ng sarili nito."})
+
+    def save(self, *args, **kwargs):
+        old_path = self.path
+        super().save(*args, **kwargs)
+        path = f"{self.parent.path if self.parent_id else ''}{self.pk:06d}/"
+        if path == old_path:
+            return
+        with transaction.atomic():
+            OrgUnit.objects.filter(pk=self.pk).update(path=path)
+            self.path = path
+            if old_path:
+                # Inilipat: palitan ang prefix ng lahat ng nasa ilalim (units at schools)
+                OrgUnit.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                    path=Concat(Value(path), Substr('path', len(old_path) + 1), output_field=models.CharField())
+                )
+                School.objects.filter(org_path__startswith=old_path).update(
+                    org_path=Concat(Value(path), Substr('org_path', len(old_path) + 1), output_field=models.CharField())
+                )
+
+    def descendants(self, include_self=True):
+        units = OrgUnit.objects.filter(path__startswith=self.path)
+        return units if include_self else units.exclude(pk=self.pk)
+
+    def ancestors(self):
+        """Mula root hanggang sa unit na ito, galing lang sa path (isang query)."""
+        prefixes = [self.path[:end] for end in range(self.PATH_STEP, len(self.path) + 1, self.PATH_STEP)]
+        return OrgUnit.objects.filter(path__in=prefixes).order_by(Length('path'))
+
+    def all_schools(self):
+        return School.objects.filter(org_path__startswith=self.path)
+
+
 class School(models.Model):
     name = models.CharField(max_length=255, unique=True)
     school_id = models.CharField(
@@ -39,6 +144,16 @@ class School(models.Model):
     )
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    org_unit = models.ForeignKey(
+        OrgUnit,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='schools',
+        verbose_name="District/Division"
+    )
+    # Kopya ng org_unit.path (ina-update ng OrgUnit.save kapag inilipat)
+    org_path = models.CharField(max_length=255, blank=True, db_index=True, editable=False)
 
     class Meta:
         verbose_name = "School/Office"
@@ -48,6 +163,23 @@ class School(models.Model):
     def __str__(self):
         return f"{self.name} ({self.school_id})"
 
+    def save(self, *args, **kwargs):
+        self.org_path = self.org_unit.path if self.org_unit_id else ''
+        super().save(*args, **kwargs)
+
+
+class SchoolGroup(models.Model):
+    """Pangalan para sa isang set ng schools (hal. "District I", "Senior High") na puwedeng padalhan ng memo."""
+    name = models.CharField(max_length=100, unique=True)
+    schools = models.ManyToManyField(School, related_name='groups', blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
 
 class User(AbstractUser):
     # Authentication - email as primary identifier (@deped.gov.ph)
@@ -88,6 +220,15 @@ class User(AbstractUser):
         blank=True,
         related_name='users'
     )
+    # Saklaw ng district supervisors atbp.: lahat ng school sa ilalim ng unit
+    org_unit = models.ForeignKey(
+        OrgUnit,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='users',
+        verbose_name="Scope (District/Division)"
+    )
     position = models.CharField(max_length=100, blank=True)
     contact_number = models.CharField(
         max_length=15, 
@@ -103,6 +244,13 @@ class User(AbstractUser):
 
     class Meta:
         ordering = ['-date_joined']
+        indexes = [
+            # Para sa keyset pagination ng User List (user_management_data)
+            models.Index(fields=['-date_joined', '-id'], name='user_joined_keyset_idx'),
+            # Login at password reset (UserManager.by_email / by_personal_email)
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+            models.Index(Lower('personal_email'), name='user_personal_email_lower_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         # Auto-set username to email
@@ -136,11 +284,53 @@ class User(AbstractUser):
         """Check if user belongs to a school"""
         return bool(self.school and self.school.is_active)
 
+    @property
+    def can_distribute_memos(self):
+        """Division office (admin/secretary) ang puwedeng pumili ng recipients ng memo."""
+        return self.is_superuser or self.is_deped_admin or self.is_deped_secretary
+
+    @property
+    def scope_path(self):
+        """
+        Materialized path ng saklaw ng user: '' = buong division (admin,
+        secretary, superuser), path ng ``org_unit`` para sa district scope,
+        None = sariling school lang.
+        """
+        if self.is_superuser or self.is_deped_admin or self.is_deped_secretary:
+            return ''
+        if self.org_unit_id:
+            return self.org_unit.path
+        return None
+
+    @property
+    def has_scope(self):
+        """May saklaw na higit sa sariling school (division o district)."""
+        return self.scope_path is not None
+
+    def scope_q(self, prefix='school__'):
+        """
+        Q filter para sa schools na saklaw ng user; ``prefix`` ay ang daan
+        papunta sa School (hal. 'school__' para sa User/Document/InboxEntry,
+        '' para sa School mismo).
+        """
+        path = self.scope_path
+        if path == '':
+            return Q()
+        if path is None:
+            return Q(**{f'{prefix}pk': self.school_id}) if self.school_id else Q(pk__in=[])
+        return Q(**{f'{prefix}org_path__startswith': path})
+
+    def scoped_schools(self):
+        return School.objects.filter(self.scope_q(prefix=''))
+
     def has_school_access(self, school_id):
         """Check if user can access specific school"""
-        if self.is_deped_admin or self.is_deped_secretary:
+        path = self.scope_path
+        if path == '':
             return True
-        return self.school_id == school_id
+        if path is None:
+            return self.school_id == school_id
+        return School.objects.filter(pk=school_id, org_path__startswith=path).exists()
 
     @property
     def display_name(self):
@@ -152,11 +342,48 @@ class User(AbstractUser):
 
 class Document(models.Model):
     title = models.CharField(max_length=255)
-    file = models.FileField(upload_to='memos/%Y/%m/%d/')
+    # Naka-key sa SHA-256 ang mga file; iisang kopya lang ang magkakaparehong memo
+    file = models.FileField(upload_to='memos/%Y/%m/%d/', storage=ContentAddressedStorage())
     uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='documents')
     date_uploaded = models.DateTimeField(auto_now_add=True)
+    # Auto-detected mula sa magic bytes/extension sa unang save
+    category = models.CharField(
+        max_length=10,
+        choices=DOCUMENT_CATEGORY_CHOICES,
+        blank=True,
+        db_index=True
+    )
     is_active = models.BooleanField(default=True)
     views_count = models.PositiveIntegerField(default=0)
+
+    # File metadata na kinukuha sa upload para hindi na kailangang buksan o
+    # i-stat ang file tuwing ipapakita sa listahan (backfill_file_metadata)
+    file_size = models.BigIntegerField(null=True, blank=True)
+    mime_type = models.CharField(max_length=100, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    page_count = models.PositiveIntegerField(null=True, blank=True)
+
+    # Text extraction para sa search (tingnan ang extract_documents command)
+    EXTRACTION_PENDING = 'pending'
+    EXTRACTION_PROCESSING = 'processing'
+    EXTRACTION_DONE = 'done'
+    EXTRACTION_FAILED = 'failed'
+    EXTRACTION_SKIPPED = 'skipped'
+    EXTRACTION_STATUS_CHOICES = [
+        (EXTRACTION_PENDING, 'Pending'),
+        (EXTRACTION_PROCESSING, 'Processing'),
+        (EXTRACTION_DONE, 'Done'),
+        (EXTRACTION_FAILED, 'Failed'),
+        (EXTRACTION_SKIPPED, 'Skipped'),
+    ]
+    extraction_status = models.CharField(
+        max_length=10,
+        choices=EXTRACTION_STATUS_CHOICES,
+        default=EXTRACTION_PENDING,
+        db_index=True
+    )
+    extraction_attempts = models.PositiveSmallIntegerField(default=0)
+    extraction_started_at = models.DateTimeField(null=True, blank=True)
     
     # For school-specific memos
     school = models.ForeignKey(
@@ -169,13 +396,360 @@ class Document(models.Model):
 
     class Meta:
         ordering = ['-date_uploaded']
+        indexes = [
+            # Keyset pagination ng memo feed (lahat at per school)
+            models.Index(fields=['-date_uploaded', '-id'], name='doc_uploaded_keyset_idx'),
+            models.Index(fields=['school', '-date_uploaded', '-id'], name='doc_school_keyset_idx'),
+            # "My Uploaded Assets" stats at listahan kada uploader
+            models.Index(fields=['uploaded_by', 'category', 'date_uploaded'], name='doc_uploader_category_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} by {self.uploaded_by.display_name}"
 
+    def is_visible_to(self, user):
+        """Uploader, division office, o recipient school na saklaw ng user (InboxEntry)."""
+        if user.can_distribute_memos or self.uploaded_by_id == user.id:
+            return True
+        return self.inbox_entries.filter(user.scope_q()).exists()
+
     def save(self, *args, **kwargs):
+        if not self.category and self.file:
+            try:
+                self.category = detect_category(self.file, self.file.name)
+            except OSError:
+                self.category = 'other'
+        if self.file_size is None and self.file:
+            try:
+                for field, value in file_metadata(self.file, self.file.name, self.category).items():
+                    setattr(self, field, value)
+            except OSError:
+                pass
         super().save(*args, **kwargs)
+
+        update_fields = []
+        # Ang sha256 ay nasa pangalan ng blob, na alam lang pagkatapos ma-save ang file
+        if not self.sha256 and self.file:
+            self.sha256 = sha256_from_name(self.file.name)
+            if self.sha256:
+                update_fields.append('sha256')
         # Auto-set school from uploader if not specified
         if not self.school and self.uploaded_by.school:
             self.school = self.uploaded_by.school
-            super().save(update_fields=['school'])
\ No newline at end of file
+            update_fields.append('school')
+        if update_fields:
+            super().save(update_fields=update_fields)
+
+class SystemCounter(models.Model):
+    """
+    Naka-maintain na bilang ng rows para sa dashboard stats.
+
+    Sa MySQL InnoDB, ang COUNT(*) ay nag-i-scan ng buong table, kaya dito na
+    lang binabasa ng dashboards ang totals. Ina-update ito ng signals kapag may
+    nadagdag o nabura (tingnan ang signals.py); ang ``rebuild_counters``
+    management command ang nag-aayos kapag may drift (hal. bulk operations).
+    """
+    TOTAL_USERS = 'total_users'
+    TOTAL_SCHOOLS = 'total_schools'
+    TOTAL_MEMOS = 'total_memos'
+
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+    @classmethod
+    def sources(cls):
+        """Ang totoong query na pinagmumulan ng bawat counter."""
+        return {
+            cls.TOTAL_USERS: User.objects.all(),
+            cls.TOTAL_SCHOOLS: School.objects.all(),
+            cls.TOTAL_MEMOS: Document.objects.all(),
+        }
+
+    @classmethod
+    def increment(cls, name, delta=1):
+        updated = cls.objects.filter(name=name).update(
+            value=models.F('value') + delta, updated_at=timezone.now()
+        )
+        if not updated:
+            cls.rebuild([name])
+
+    @classmethod
+    def rebuild(cls, names=None):
+        """Bilangin ulit mula sa database at i-save. Returns dict ng values."""
+        sources = cls.sources()
+        values = {}
+        for name in names or sources:
+            values[name] = sources[name].count()
+            cls.objects.update_or_create(name=name, defaults={'value': values[name]})
+        return values
+
+    @classmethod
+    def get_values(cls, names=None):
+        """Lahat ng hininging counters sa isang query (rebuild kung may kulang)."""
+        names = list(names or cls.sources())
+        values = dict(cls.objects.filter(name__in=names).values_list('name', 'value'))
+        missing = [name for name in names if name not in values]
+        if missing:
+            values.update(cls.rebuild(missing))
+        return values
+
+
+class DocumentText(models.Model):
+    """
+    Extracted text ng isang Document. Hiwalay na table para hindi kasamang
+    nilo-load ang malaking text sa bawat listahan ng memos.
+    """
+    document = models.OneToOneField(
+        Document,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='text'
+    )
+    text = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+    extracted_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Text of document {self.document_id}"
+
+
+class InboxEntry(models.Model):
+    """
+    Materialized na inbox: isang row bawat (memo, recipient school). Naka-copy
+    ang petsa ng memo sa ``date_sent`` para ang "Received Memos" at ang unread
+    count ay iisang index range scan sa (school, date) at (school, is_read).
+    """
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name='inbox_entries')
+    # Walang hiwalay na index: nauuna na ang school sa dalawang composite index sa ibaba
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name='inbox_entries', db_index=False)
+    date_sent = models.DateTimeField()
+    is_read = models.BooleanField(default=False)
+    read_at = models.DateTimeField(null=True, blank=True)
+    acknowledged_at = models.DateTimeField(null=True, blank=True)
+    acknowledged_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='acknowledged_memos'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['document', 'school'], name='unique_inbox_entry'),
+        ]
+        indexes = [
+            models.Index(fields=['school', '-date_sent', '-id'], name='inbox_school_keyset_idx'),
+            models.Index(fields=['school', 'is_read'], name='inbox_school_unread_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.document_id} -> {self.school_id}"
+
+
+class ComplianceRollup(models.Model):
+    """
+    Naka-maintain na bilang bawat (school, buwan): ilang memo ang natanggap,
+    nabuksan at na-acknowledge. Ina-update nang incremental ng distribution.py
+    kaya ang compliance summary ay hindi na nag-a-aggregate ng buong inbox
+    history. ``manage.py rebuild_compliance_rollup`` para buuin ulit.
+    """
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name='compliance_rollups')
+    month = models.DateField(help_text="Unang araw ng buwan (local time ng date_sent).")
+    received = models.PositiveIntegerField(default=0)
+    opened = models.PositiveIntegerField(default=0)
+    acknowledged = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['school', 'month'], name='unique_compliance_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['month', 'school'], name='compliance_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.school_id} {self.month:%Y-%m}"
+
+
+class DocumentView(models.Model):
+    """
+    Isang row bawat (memo, user) na nakabasa na nito. Isinusulat nang naka-batch
+    ng viewcounts.flush(); ang ``views_count`` ng Document ang kabuuang bilang.
+    """
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name='viewers')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='viewed_documents')
+    first_viewed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['document', 'user'], name='unique_document_viewer'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} viewed {self.document_id}"
+
+
+class StoredBlob(models.Model):
+    """Isang file sa content-addressed storage at kung ilang Document ang gumagamit nito."""
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True)
+    size = models.BigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
+
+    @classmethod
+    def acquire(cls, sha256, name, size):
+        """
+        Dagdagan ang reference ng blob (o gawin ito). Returns ang StoredBlob;
+        ang ``blob.name`` ang dapat i-save sa Document. Savepoint lang ito kapag
+        nasa transaction ang caller, kaya kasamang nare-rollback ng Document.
+        """
+        for attempt in range(2):
+            try:
+                with transaction.atomic():
+                    blob = cls.objects.select_for_update().filter(sha256=sha256).first()
+                    if blob is None:
+                        return cls.objects.create(sha256=sha256, name=name, size=size, ref_count=1)
+                    cls.objects.filter(pk=blob.pk).update(ref_count=models.F('ref_count') + 1)
+                    blob.ref_count += 1
+                    return blob
+            except IntegrityError:
+                # Sabay na na-insert ng ibang upload; makikita na ang row sa retry
+                if attempt:
+                    raise
+
+    @classmethod
+    def release(cls, name):
+        """
+        Returns True kapag wala nang gumagamit at puwede nang burahin ang file.
+        Tawagin sa loob ng transaction at burahin ang file bago ito mag-commit,
+        para hindi ito makita ng kasabay na upload (tingnan ang storage.release).
+        """
+        with transaction.atomic():
+            blob = cls.objects.select_for_update().filter(name=name).first()
+            if blob is None:
+                # Lumang file (bago ang content-addressed storage); hindi ginagalaw
+                return False
+            if blob.ref_count <= 1:
+                blob.delete()
+                return True
+            cls.objects.filter(pk=blob.pk).update(ref_count=models.F('ref_count') - 1)
+        return False
+
+
+class UploadSession(models.Model):
+    """
+    Isang resumable (chunked) upload. Ang bawat chunk ay direktang isinusulat
+    sa ``part_path`` sa tamang offset; sa finalize, ini-move (hindi kinokopya)
+    ang buong file papunta sa storage at gagawa ng Document.
+    """
+    STATUS_ACTIVE = 'active'
+    STATUS_COMPLETE = 'complete'
+    STATUS_CHOICES = [
+        (STATUS_ACTIVE, 'Active'),
+        (STATUS_COMPLETE, 'Complete'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    title = models.CharField(max_length=255)
+    filename = models.CharField(max_length=255)
+    total_size = models.BigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_ACTIVE)
+    document = models.ForeignKey(
+        Document,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload_sessions'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.filename} ({self.get_status_display()})"
+
+    @property
+    def total_chunks(self):
+        return max(1, math.ceil(self.total_size / self.chunk_size))
+
+    @property
+    def part_path(self):
+        return os.path.join(settings.MEDIA_ROOT, 'uploads', 'partial', f"{self.id}.part")
+
+    def expected_chunk_size(self, index):
+        """Laki ng chunk sa ``index`` (mas maliit ang huling chunk)."""
+        if index == self.total_chunks - 1:
+            return self.total_size - index * self.chunk_size
+        return self.chunk_size
+
+
+class UploadChunk(models.Model):
+    session = models.ForeignKey(UploadSession, on_delete=models.CASCADE, related_name='chunks')
+    index = models.PositiveIntegerField()
+    size = models.PositiveIntegerField()
+    sha256 = models.CharField(max_length=64)
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['index']
+        constraints = [
+            models.UniqueConstraint(fields=['session', 'index'], name='unique_upload_chunk'),
+        ]
+
+    def __str__(self):
+        return f"{self.session_id} #{self.index}"
+
+
+class OutboxEmail(models.Model):
+    """
+    Email na naka-pila para ipadala ng ``send_outbox`` worker.
+
+    Hindi na nagse-send ng email ang views sa loob ng request; dito lang
+    sila naglalagay ng row (tingnan ang mail.py).
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Ito ang hinahanap ng worker: pending na due na
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.get_status_display()})"
@@ -0,0 +1,57 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Hindi tayo gumagamit ng OFFSET dito: bawat page ay nagsisimula sa huling
+(timestamp, id) na nakita ng client, kaya pareho ang bilis ng page 1 at
+page 4,000 basta may index sa (timestamp, id).
+"""
+import base64
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(value, pk):
+    """Gawing opaque string ang (datetime, id) ng huling row."""
+    raw = f"{value.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Returns (datetime, id) o None kapag sira o walang cursor."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, pk = base64.urlsafe_b64decode(padded.encode()).decode().rsplit('|', 1)
+        moment = parse_datetime(value)
+        if moment is None:
+            return None
+        return moment, int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_page(queryset, field, cursor=None, size=25):
+    """
+    Kunin ang susunod na page ng ``queryset`` na naka-order sa (-field, -id).
+
+    Returns ``(rows, next_cursor)``; ``next_cursor`` ay None kapag wala nang
+    kasunod. Isang query lang ang tinatakbo (size + 1 rows para malaman kung
+    may susunod pa).
+    """
+    queryset = queryset.order_by(f'-{field}', '-id')
+    position = decode_cursor(cursor)
+    if position:
+        value, pk = position
+        queryset = queryset.filter(
+            Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': pk})
+        )
+
+    rows = list(queryset[:size + 1])
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk)
+    return rows, next_cursor
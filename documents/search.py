@@ -0,0 +1,165 @@
+"""
+Full-text search ng memos gamit ang SQLite FTS5.
+
+Hiwalay na SQLite file (``SEARCH_INDEX_PATH``) ang index kaya gumagana ito
+kahit MySQL ang main database at walang external search service. Ang rowid
+ng bawat entry ay ang Document.id; ang title at extracted text ang
+ini-index, at ang recipient schools/date ay naka-store para sa filters.
+Ang ``school_id`` column ay listahan ng recipient school ids na may space
+sa magkabilang dulo (hal. `` 3 12 ``) para ma-filter gamit ang ``instr``.
+
+Ina-update ng signals ang title kapag na-save o nabura ang Document; ang
+content (text ng file) ay pinupuno ng ``rebuild_search_index`` command.
+"""
+import html
+import re
+import sqlite3
+import threading
+
+from django.conf import settings
+from django.utils import timezone
+
+INDEX_PATH = getattr(settings, 'SEARCH_INDEX_PATH', str(settings.BASE_DIR / 'search_index.sqlite3'))
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS memo_fts USING fts5(
+    title,
+    content,
+    school_id UNINDEXED,
+    uploaded UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+# Mas mabigat ang match sa title kaysa sa laman ng file
+TITLE_WEIGHT = 10.0
+CONTENT_WEIGHT = 1.0
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+
+_local = threading.local()
+
+
+def _connection():
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(INDEX_PATH, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def _school_tokens(school_ids):
+    return f" {' '.join(str(pk) for pk in sorted(school_ids))} "
+
+
+def _row_values(doc, school_ids=None):
+    if school_ids is None:
+        from .models import InboxEntry
+        school_ids = InboxEntry.objects.filter(document_id=doc.pk).values_list('school_id', flat=True)
+    # Local time (Asia/Manila) para tugma ang date filters sa nakikita ng user
+    uploaded = timezone.localtime(doc.date_uploaded).isoformat() if doc.date_uploaded else ''
+    return doc.title, _school_tokens(school_ids), uploaded
+
+
+def index_document(doc, content=None, school_ids=None):
+    """
+    I-index (o i-update) ang isang Document. Kapag ``content`` ay None,
+    pinapanatili ang dating naka-index na text ng file. Ang ``school_ids``
+    (recipients) ay kinukuha sa InboxEntry kapag hindi ibinigay.
+    """
+    conn = _connection()
+    with conn:
+        if content is None:
+            row = conn.execute('SELECT content FROM memo_fts WHERE rowid = ?', (doc.pk,)).fetchone()
+            content = row[0] if row else ''
+        conn.execute('DELETE FROM memo_fts WHERE rowid = ?', (doc.pk,))
+        title, school_id, uploaded = _row_values(doc, school_ids)
+        conn.execute(
+            'INSERT INTO memo_fts (rowid, title, content, school_id, uploaded) VALUES (?, ?, ?, ?, ?)',
+            (doc.pk, title, content or '', school_id, uploaded),
+        )
+
+
+def remove_document(doc_id):
+    conn = _connection()
+    with conn:
+        conn.execute('DELETE FROM memo_fts WHERE rowid = ?', (doc_id,))
+
+
+def remove_documents(doc_ids):
+    """Maramihang remove_document sa iisang transaction."""
+    conn = _connection()
+    with conn:
+        conn.executemany('DELETE FROM memo_fts WHERE rowid = ?', ((doc_id,) for doc_id in doc_ids))
+
+
+def clear_index():
+    conn = _connection()
+    with conn:
+        conn.execute('DELETE FROM memo_fts')
+
+
+def build_match_query(text):
+    """
+    Gawing FTS5 MATCH expression ang tinype ng user: bawat salita ay
+    kailangang nandoon (AND), at prefix match ang huling salita para gumana
+    habang nagta-type.
+    """
+    terms = TERM_RE.findall(text or '')
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def search(text, school_ids=None, date_from=None, date_to=None, limit=20):
+    """
+    Returns listahan ng ``(doc_id, snippet)`` na naka-rank ayon sa bm25.
+
+    ``school_ids``: None = lahat ng schools; kung hindi, mga memo lang na
+    ipinadala sa kahit isa sa mga ito.
+    ``date_from``/``date_to``: ``date`` objects (inclusive).
+    """
+    match = build_match_query(text)
+    if match is None:
+        return []
+
+    sql = [
+        'SELECT rowid, snippet(memo_fts, 1, ?, ?, ?, 16) FROM memo_fts WHERE memo_fts MATCH ?'
+    ]
+    params = [HIGHLIGHT_START, HIGHLIGHT_END, '…', match]
+    if school_ids is not None:
+        school_ids = [f' {pk} ' for pk in school_ids]
+        if not school_ids:
+            return []
+        sql.append('AND (' + ' OR '.join(['instr(school_id, ?) > 0'] * len(school_ids)) + ')')
+        params.extend(school_ids)
+    if date_from:
+        sql.append('AND uploaded >= ?')
+        params.append(date_from.isoformat())
+    if date_to:
+        # Kasama ang buong araw ng date_to
+        sql.append('AND uploaded < ?')
+        params.append(date_to.isoformat() + '\uffff')
+    sql.append(f'ORDER BY bm25(memo_fts, {TITLE_WEIGHT}, {CONTENT_WEIGHT}) LIMIT ?')
+    params.append(max(1, int(limit)))
+
+    try:
+        rows = _connection().execute(' '.join(sql), params).fetchall()
+    except sqlite3.OperationalError:
+        return []
+    return rows
+
+
+def snippet_html(snippet):
+    """Escaped snippet na naka-<mark> ang mga tumugmang salita."""
+    return (
+        html.escape(snippet or '')
+        .replace(HIGHLIGHT_START, '<mark>')
+        .replace(HIGHLIGHT_END, '</mark>')
+    )
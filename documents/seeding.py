@@ -0,0 +1,318 @@
+"""
+Synthetic na division-scale dataset para sa load testing at benchmarks.
+
+Ginagawa nito ang lahat ng school sa ``SCHOOL_CHOICES``, libo-libong users
+(kasama ang pending registrations), daan-daang libong memos at ang kanilang
+InboxEntry rows. Lahat ay ``bulk_create`` nang naka-batch at iisang password
+hash lang ang kinukuwenta, kaya ilang minuto lang kahit 500k memos.
+
+Hindi dumadaan sa signals ang bulk_create, kaya sa dulo ay binubuo ulit ang
+SystemCounter, pending count cache at ComplianceRollup.
+"""
+import hashlib
+import random
+import re
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import search
+from .caching import bump_school_list_version, invalidate_pending_count
+from .choices import SCHOOL_CHOICES
+from .compliance import rebuild_rollup
+from .models import (
+    Document, DocumentText, DocumentView, InboxEntry, OrgUnit, School, StoredBlob, SystemCounter, UploadSession,
+    User,
+)
+
+SEED_PASSWORD = 'Seed-Benchmark-2024'
+SEED_EMAIL_PREFIX = 'seed.'
+SEED_EMAIL_DOMAIN = '@deped.gov.ph'
+DIVISION_SCHOOL_CODE = 'SDO'
+SEED_DISTRICTS = ['I', 'II', 'III', 'IV', 'V']
+
+# Pinakamaliit na valid na PDF; iisang blob lang ang gamit ng lahat ng seeded memos
+SEED_PDF = (
+    b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+    b"2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj\n"
+    b"3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]>>endobj\n"
+    b"trailer<</Root 1 0 R>>\n%%EOF\n"
+)
+
+MEMO_SUBJECTS = [
+    'Division Memorandum', 'Regional Memorandum', 'Advisory', 'Division Order',
+    'Unnumbered Memorandum', 'Notice of Meeting', 'Training Invitation',
+]
+MEMO_TOPICS = [
+    'Brigada Eskwela', 'School Sports Meet', 'INSET Schedule', 'Submission of SF2',
+    'LIS Updating', 'Reading Program', 'Disaster Preparedness Drill',
+    'Teachers Day Celebration', 'MOOE Liquidation', 'Class Observation',
+]
+
+
+class SeedError(Exception):
+    pass
+
+
+class SeedResult:
+    def __init__(self):
+        self.schools = 0
+        self.users = 0
+        self.pending = 0
+        self.documents = 0
+        self.inbox_entries = 0
+
+
+def seed_email(label):
+    return f"{SEED_EMAIL_PREFIX}{label}{SEED_EMAIL_DOMAIN}"
+
+
+def seeded_users():
+    return User.objects.filter(email__startswith=SEED_EMAIL_PREFIX, email__endswith=SEED_EMAIL_DOMAIN)
+
+
+def school_code(code):
+    """'Agban NHS' -> 'AGBAN-NHS' (pasok sa validator ng School.school_id)."""
+    return re.sub(r'[^A-Z0-9]+', '-', code.upper()).strip('-')
+
+
+def flush_seed():
+    """
+    Burahin ang dating seeded users at ang kanilang memos. Returns bilang ng memos.
+
+    Ang Document.delete() ay may signals bawat row (blob refs, search index,
+    counters), kaya sa 500k memos ay inaabot ng oras; dito ay binubura nang
+    maramihan ang memos at kanilang related rows, saka inaayos ang blob refs,
+    search index at counters nang minsanan.
+    """
+    users = seeded_users()
+    docs = Document.objects.filter(uploaded_by__in=users)
+    doc_ids = list(docs.values_list('id', flat=True))
+    blob_names = list(docs.values_list('file', flat=True).distinct())
+    with transaction.atomic():
+        for model in (InboxEntry, DocumentView, DocumentText):
+            model.objects.filter(document__in=docs).delete()
+        UploadSession.objects.filter(document__in=docs).update(document=None)
+        docs._raw_delete(docs.db)
+        users.delete()
+
+        storage = Document._meta.get_field('file').storage
+        for name in blob_names:
+            remaining = Document.objects.filter(file=name).count()
+            if remaining:
+                StoredBlob.objects.filter(name=name).update(ref_count=remaining)
+            elif StoredBlob.objects.filter(name=name).delete()[0]:
+                transaction.on_commit(lambda name=name: storage.delete(name))
+
+    search.remove_documents(doc_ids)
+    SystemCounter.rebuild()
+    invalidate_pending_count()
+    rebuild_rollup()
+    return len(doc_ids)
+
+
+def ensure_schools():
+    """Lahat ng school sa SCHOOL_CHOICES. Returns list na SDO ang una."""
+    School.objects.bulk_create(
+        [School(name=label, school_id=school_code(code)) for code, label in SCHOOL_CHOICES],
+        ignore_conflicts=True,
+    )
+    bump_school_list_version()
+    by_name = {school.name: school for school in School.objects.filter(name__in=[l for _, l in SCHOOL_CHOICES])}
+    return [by_name[label] for _, label in SCHOOL_CHOICES if label in by_name]
+
+
+def ensure_districts(schools):
+    """
+    Hatiin ang schools (maliban sa SDO) sa SEED_DISTRICTS sa ilalim ng
+    division. Ang mga school na nasa isang district na ay hindi ginagalaw.
+    Returns listahan ng districts.
+    """
+    division, _ = OrgUnit.objects.get_or_create(
+        code=DIVISION_SCHOOL_CODE,
+        defaults={'name': 'Schools Division Office', 'kind': OrgUnit.KIND_DIVISION},
+    )
+    districts = [
+        OrgUnit.objects.get_or_create(
+            code=f'DISTRICT-{numeral}',
+            defaults={'name': f'District {numeral}', 'kind': OrgUnit.KIND_DISTRICT, 'parent': division},
+        )[0]
+        for numeral in SEED_DISTRICTS
+    ]
+    unassigned = Q(org_unit__isnull=True) | Q(org_unit=division)
+    School.objects.filter(unassigned, pk=schools[0].pk).update(org_unit=division, org_path=division.path)
+    for index, district in enumerate(districts):
+        school_ids = [school.pk for school in schools[1 + index::len(districts)]]
+        School.objects.filter(unassigned, pk__in=school_ids).update(org_unit=district, org_path=district.path)
+    return districts
+
+
+def seed_blob_name():
+    """I-save (o gamitin ulit) ang iisang PDF blob at ibalik ang storage name."""
+    storage = Document._meta.get_field('file').storage
+    return storage.save('seed-memo.pdf', ContentFile(SEED_PDF))
+
+
+def _build_users(schools, districts, count, pending, password_hash, rng, now):
+    division = schools[0]
+    users = [
+        User(
+            username=seed_email('admin'), email=seed_email('admin'),
+            personal_email='seed.admin@gmail.com', full_name='Seed Superadmin',
+            password=password_hash, school=division, is_superuser=True, is_staff=True,
+            is_deped_admin=True, is_employee=False, is_email_verified=True,
+            date_joined=now - timedelta(days=1000),
+        ),
+        User(
+            username=seed_email('secretary'), email=seed_email('secretary'),
+            personal_email='seed.secretary@gmail.com', full_name='Seed Secretary',
+            password=password_hash, school=division, is_deped_secretary=True,
+            is_employee=False, is_email_verified=True,
+            date_joined=now - timedelta(days=1000),
+        ),
+    ]
+    # Isang supervisor bawat district
+    for index, district in enumerate(districts):
+        users.append(User(
+            username=seed_email(f'district{index}'), email=seed_email(f'district{index}'),
+            personal_email=f'seed.district{index}@gmail.com', full_name=f'Supervisor {district.name}',
+            password=password_hash, school=division, org_unit=district, position='Public Schools District Supervisor',
+            is_email_verified=True, date_joined=now - timedelta(days=1000),
+        ))
+    # Isang school head bawat school, ang natitira ay employees
+    for index, school in enumerate(schools):
+        users.append(User(
+            username=seed_email(f'head{index}'), email=seed_email(f'head{index}'),
+            personal_email=f'seed.head{index}@gmail.com', full_name=f'Head {school.name}',
+            password=password_hash, school=school, is_school_head=True, is_employee=False,
+            is_email_verified=True, date_joined=now - timedelta(days=rng.randint(300, 1000)),
+        ))
+    for index in range(max(0, count - len(users))):
+        users.append(User(
+            username=seed_email(f'emp{index}'), email=seed_email(f'emp{index}'),
+            personal_email=f'seed.emp{index}@gmail.com', full_name=f'Employee {index}',
+            password=password_hash, school=rng.choice(schools), position='Teacher I',
+            gender=rng.choice(['Male', 'Female']), is_email_verified=True,
+            date_joined=now - timedelta(days=rng.randint(1, 1000), seconds=rng.randint(0, 86399)),
+        ))
+    for index in range(pending):
+        users.append(User(
+            username=seed_email(f'pending{index}'), email=seed_email(f'pending{index}'),
+            personal_email=f'seed.pending{index}@gmail.com', full_name=f'Applicant {index}',
+            password=password_hash, school=rng.choice(schools), position='Teacher I',
+            is_active=False, date_joined=now - timedelta(days=rng.randint(0, 30), seconds=rng.randint(0, 86399)),
+        ))
+    return users
+
+
+def _inbox_entry(doc_id, school_id, sent, rng, now, reader_id):
+    # Mas malamang nabasa/na-acknowledge na ang mas lumang memos
+    age_days = (now - sent).days
+    is_read = rng.random() < min(0.95, 0.3 + age_days / 60)
+    read_at = sent + timedelta(hours=rng.randint(1, 72)) if is_read else None
+    acknowledged = is_read and rng.random() < 0.7
+    return InboxEntry(
+        document_id=doc_id, school_id=school_id, date_sent=sent,
+        is_read=is_read, read_at=read_at,
+        acknowledged_at=read_at + timedelta(hours=1) if acknowledged else None,
+        acknowledged_by_id=reader_id if acknowledged else None,
+    )
+
+
+def seed_division(users=50000, documents=500000, pending=2000, days=730,
+                  broadcast_every=50, batch_size=5000, seed=1, progress=None):
+    """
+    Gawin ang dataset. ``broadcast_every``: bawat ika-N na memo ay galing sa
+    division office at ipinapadala sa lahat ng school; ang iba ay sa sariling
+    school lang ng uploader.
+    """
+    if seeded_users().exists():
+        raise SeedError("May seeded data na; gamitin ang --flush para palitan.")
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    result = SeedResult()
+    progress = progress or (lambda message: None)
+
+    schools = ensure_schools()
+    if not schools or schools[0].name != dict(SCHOOL_CHOICES)[DIVISION_SCHOOL_CODE]:
+        raise SeedError("Hindi nagawa ang Division Office school.")
+    result.schools = len(schools)
+    districts = ensure_districts(schools)
+
+    # Iisang hash para sa lahat (ang PBKDF2 ang pinakamabagal na bahagi kung hindi)
+    password_hash = make_password(SEED_PASSWORD)
+    user_objs = _build_users(schools, districts, users, pending, password_hash, rng, now)
+    User.objects.bulk_create(user_objs, batch_size=batch_size)
+    result.users = len(user_objs) - pending
+    result.pending = pending
+    progress(f"Created {len(user_objs)} users.")
+
+    seeded = seeded_users()
+    secretary_id = seeded.get(email=seed_email('secretary')).pk
+    heads = dict(seeded.filter(is_school_head=True).values_list('school_id', 'pk'))
+    school_ids = [school.pk for school in schools]
+    local_school_ids = [school_id for school_id in school_ids if school_id in heads]
+
+    blob_name = seed_blob_name()
+    blob_sha256 = hashlib.sha256(SEED_PDF).hexdigest()
+
+    start = now - timedelta(days=days)
+    step = timedelta(days=days) / max(1, documents)
+    created = 0
+    while created < documents:
+        size = min(batch_size, documents - created)
+        docs, targets = [], []
+        for offset in range(size):
+            index = created + offset
+            sent = start + step * index
+            if broadcast_every and index % broadcast_every == 0:
+                uploader, school_id, recipients = secretary_id, school_ids[0], school_ids
+            else:
+                school_id = rng.choice(local_school_ids)
+                uploader, recipients = heads[school_id], [school_id]
+            docs.append(Document(
+                title=f"{rng.choice(MEMO_SUBJECTS)} No. {index + 1}, s. {sent.year}: {rng.choice(MEMO_TOPICS)}",
+                file=blob_name, uploaded_by_id=uploader, school_id=school_id,
+                category='pdf', file_size=len(SEED_PDF),
+                mime_type='application/pdf', sha256=blob_sha256, page_count=1,
+                views_count=rng.randint(0, 40),
+                extraction_status=Document.EXTRACTION_SKIPPED,
+            ))
+            targets.append((sent, recipients))
+
+        with transaction.atomic():
+            last_id = Document.objects.order_by('-id').values_list('id', flat=True).first() or 0
+            Document.objects.bulk_create(docs, batch_size=batch_size)
+            # Hindi lahat ng backend ay nagbabalik ng pk sa bulk_create (MySQL),
+            # kaya kunin ulit ayon sa pagkakasunod ng insert
+            doc_ids = list(Document.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True))
+            # auto_now_add ay laging "ngayon" sa insert; ikalat ang date_uploaded
+            # sa buong ``days`` pagkatapos (kailangan ito ng keyset at compliance)
+            for doc, doc_id, (sent, _) in zip(docs, doc_ids, targets):
+                doc.pk, doc.date_uploaded = doc_id, sent
+            # CASE ... WHEN bawat row ang bulk_update kaya mas maliit ang batch
+            Document.objects.bulk_update(docs, ['date_uploaded'], batch_size=min(batch_size, 500))
+            entries = [
+                _inbox_entry(doc_id, school_id, sent, rng, now, heads.get(school_id))
+                for doc_id, (sent, recipients) in zip(doc_ids, targets)
+                for school_id in recipients
+            ]
+            InboxEntry.objects.bulk_create(entries, batch_size=batch_size)
+
+        created += size
+        result.inbox_entries += len(entries)
+        progress(f"Created {created} memos...")
+    result.documents = created
+
+    StoredBlob.objects.filter(name=blob_name).update(
+        ref_count=Document.objects.filter(file=blob_name).count()
+    )
+    SystemCounter.rebuild()
+    invalidate_pending_count()
+    rebuild_rollup()
+    return result
@@ -0,0 +1,101 @@
+"""
+Session engine na cache muna bago database (SESSION_ENGINE = 'documents.sessions').
+
+Katulad ng ``cached_db`` ng Django: binabasa ang session sa cache at sa
+``django_session`` lang kapag wala sa cache. Ang kaibahan ay hindi na
+sinusulat ulit sa database ang session kapag walang nagbago sa laman nito
+(hal. ``set_expiry()`` na pareho ang value); ang cache lang ang nire-refresh.
+Sinusulat pa rin kapag malapit nang mag-expire ang naka-save na
+``expire_date`` para hindi mauna ang database kaysa sa cookie.
+
+Ang ``clear_expired()`` (ginagamit ng ``clearsessions`` at ``cleanup_sessions``)
+ay nagbubura nang paunti-unti para hindi ma-lock nang matagal ang table.
+
+Paalala: kapag maraming worker process, dapat shared ang cache (Redis o
+Memcached). Sa LocMemCache ay may sariling kopya ang bawat process, kaya
+puwedeng makita pa ng ibang worker ang session na na-logout na.
+"""
+import logging
+import time
+
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.utils import timezone
+
+KEY_PREFIX = 'documents.sessions'
+CLEANUP_BATCH_SIZE = 1000
+
+logger = logging.getLogger('django.contrib.sessions')
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # Laman at expire_date ng session ayon sa huling basa/sulat sa database
+        self._stored_data = None
+        self._stored_expiry = None
+
+    def _fingerprint(self, data):
+        return self.serializer().dumps(data)
+
+    def _remember(self, data, expire_date):
+        self._stored_data = self._fingerprint(data)
+        self._stored_expiry = expire_date
+
+    def load(self):
+        try:
+            cached = self._cache.get(self.cache_key)
+        except Exception:
+            # Gaya ng cached_db: invalid key sa ilang cache backends
+            cached = None
+
+        if isinstance(cached, tuple):
+            data, expire_date = cached
+        else:
+            s = self._get_session_from_db()
+            if not s:
+                return {}
+            data, expire_date = self.decode(s.session_data), s.expire_date
+            self._cache.set(self.cache_key, (data, expire_date), self.get_expiry_age(expiry=expire_date))
+        self._remember(data, expire_date)
+        return data
+
+    def _unchanged(self):
+        if self._stored_data is None or self._fingerprint(self._get_session(no_load=True)) != self._stored_data:
+            return False
+        # Isulat ulit kapag lampas kalahati na ng buhay ng naka-save na expire_date
+        remaining = (self._stored_expiry - timezone.now()).total_seconds()
+        return remaining > self.get_expiry_age() / 2
+
+    def save(self, must_create=False):
+        if not must_create and self.session_key and self._unchanged():
+            return
+        # DBStore.save lang; ang cache ay sinusulat dito sa sariling format
+        super(CachedDBStore, self).save(must_create)
+        expire_date = self.get_expiry_date()
+        try:
+            self._cache.set(self.cache_key, (self._session, expire_date), self.get_expiry_age())
+        except Exception:
+            logger.exception("Error saving to cache (%s)", self._cache)
+        self._remember(self._session, expire_date)
+
+    @classmethod
+    def clear_expired(cls, batch_size=CLEANUP_BATCH_SIZE, pause=0.0):
+        """
+        Burahin ang expired sessions nang ``batch_size`` bawat DELETE, naka-order
+        sa expire_date index. Returns bilang ng nabura.
+        """
+        model = cls.get_model_class()
+        deleted = 0
+        while True:
+            keys = list(
+                model.objects.filter(expire_date__lt=timezone.now())
+                .order_by('expire_date')
+                .values_list('session_key', flat=True)[:batch_size]
+            )
+            if not keys:
+                return deleted
+            deleted += model.objects.filter(session_key__in=keys).delete()[0]
+            if pause:
+                time.sleep(pause)
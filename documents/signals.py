@@ -0,0 +1,154 @@
+import logging
+import sqlite3
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from .caching import adjust_pending_count, bump_nav_version, bump_school_list_version, invalidate_pending_count
+from . import compliance, search
+from .models import Document, School, SystemCounter, User
+
+logger = logging.getLogger(__name__)
+
+
+def _loaded_is_active(instance):
+    # Huwag i-trigger ang deferred field load (hal. mula sa .only())
+    return instance.__dict__.get('is_active')
+
+
+@receiver(post_init, sender=User)
+def remember_user_active_state(sender, instance, **kwargs):
+    instance._was_active = _loaded_is_active(instance)
+
+
+@receiver(post_save, sender=User)
+def update_pending_count_on_save(sender, instance, created, **kwargs):
+    is_active = _loaded_is_active(instance)
+    was_active = None if created else instance._was_active
+    instance._was_active = is_active
+
+    if created:
+        delta = 0 if is_active else 1
+    elif was_active is None or is_active is None:
+        transaction.on_commit(invalidate_pending_count)
+        return
+    else:
+        delta = int(was_active) - int(is_active)
+
+    if delta:
+        transaction.on_commit(lambda: adjust_pending_count(delta))
+
+
+@receiver(post_delete, sender=User)
+def update_pending_count_on_delete(sender, instance, **kwargs):
+    is_active = _loaded_is_active(instance)
+    if is_active is None:
+        transaction.on_commit(invalidate_pending_count)
+    elif not is_active:
+        transaction.on_commit(lambda: adjust_pending_count(-1))
+
+
+# --- SYSTEM COUNTERS (dashboard totals) ---
+
+COUNTED_MODELS = {
+    User: SystemCounter.TOTAL_USERS,
+    School: SystemCounter.TOTAL_SCHOOLS,
+    Document: SystemCounter.TOTAL_MEMOS,
+}
+
+
+def _count_created(sender, instance, created, **kwargs):
+    if created:
+        name = COUNTED_MODELS[sender]
+        transaction.on_commit(lambda: SystemCounter.increment(name, 1))
+
+
+def _count_deleted(sender, instance, **kwargs):
+    name = COUNTED_MODELS[sender]
+    transaction.on_commit(lambda: SystemCounter.increment(name, -1))
+
+
+for counted_model in COUNTED_MODELS:
+    post_save.connect(_count_created, sender=counted_model, dispatch_uid=f'count_created_{counted_model.__name__}')
+    post_delete.connect(_count_deleted, sender=counted_model, dispatch_uid=f'count_deleted_{counted_model.__name__}')
+
+
+# --- SCHOOL LIST AT NAV FRAGMENT CACHE ---
+
+@receiver(post_save, sender=School)
+@receiver(post_delete, sender=School)
+def bump_school_list_on_change(sender, instance, **kwargs):
+    transaction.on_commit(bump_school_list_version)
+    transaction.on_commit(bump_nav_version)
+
+
+# Mga field na tumutukoy kung aling nav fragment ang nakikita ng user
+NAV_ROLE_FIELDS = (
+    'is_superuser', 'is_deped_admin', 'is_deped_secretary', 'is_school_head',
+    'is_employee', 'school_id', 'org_unit_id',
+)
+NAV_ROLE_NAMES = {field.removesuffix('_id') for field in NAV_ROLE_FIELDS}
+
+
+def _loaded_nav_role(instance):
+    # None kapag may deferred na field (hindi alam ang dating value)
+    if any(field not in instance.__dict__ for field in NAV_ROLE_FIELDS):
+        return None
+    return tuple(instance.__dict__[field] for field in NAV_ROLE_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def remember_user_nav_role(sender, instance, **kwargs):
+    instance._nav_role = _loaded_nav_role(instance)
+
+
+@receiver(post_save, sender=User)
+def bump_nav_on_role_change(sender, instance, created, update_fields=None, **kwargs):
+    # Hal. save(update_fields=['last_login']) ng login: walang nabagong role
+    if update_fields and not {field.removesuffix('_id') for field in update_fields} & NAV_ROLE_NAMES:
+        return
+    nav_role = _loaded_nav_role(instance)
+    changed = not created and (nav_role is None or nav_role != instance._nav_role)
+    instance._nav_role = nav_role
+    if changed:
+        transaction.on_commit(bump_nav_version)
+
+
+# --- CONTENT-ADDRESSED STORAGE REFERENCES ---
+
+@receiver(post_delete, sender=Document)
+def release_document_file(sender, instance, **kwargs):
+    name = instance.file.name
+    if name:
+        storage = instance.file.storage
+        transaction.on_commit(lambda: storage.release(name))
+
+
+# --- COMPLIANCE ROLLUP ---
+
+@receiver(pre_delete, sender=Document)
+def remove_document_from_rollup(sender, instance, **kwargs):
+    # Bago ma-cascade ang InboxEntry rows; nasa parehong transaction ng delete
+    compliance.remove_from_rollup([instance.pk])
+
+
+# --- FULL-TEXT SEARCH INDEX ---
+
+def _update_search_index(update, *args):
+    # Hindi dapat pumalya ang pag-save ng memo dahil lang sa search index
+    try:
+        update(*args)
+    except sqlite3.Error:
+        logger.exception("Search index update failed")
+
+
+@receiver(post_save, sender=Document)
+def index_document_title(sender, instance, **kwargs):
+    transaction.on_commit(lambda: _update_search_index(search.index_document, instance))
+
+
+@receiver(post_delete, sender=Document)
+def remove_document_from_index(sender, instance, **kwargs):
+    doc_id = instance.pk
+    transaction.on_commit(lambda: _update_search_index(search.remove_document, doc_id))
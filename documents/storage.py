@@ -0,0 +1,119 @@
+"""
+Content-addressed storage para sa Document.file.
+
+Ang bawat file ay naka-save sa ``blobs/ab/cd/<sha256><ext>`` kaya ang
+parehong memo na ini-upload ng maraming school heads ay iisang kopya lang sa
+disk. Ang ``StoredBlob`` model ang nagbibilang kung ilang Document ang
+gumagamit ng bawat blob; kapag umabot sa zero, saka lang binubura ang file.
+"""
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils.deconstruct import deconstructible
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_sha256(fileobj):
+    """SHA-256 ng isang File/UploadedFile (binabasa nang paunti-unti)."""
+    digest = hashlib.sha256()
+    if hasattr(fileobj, 'seek'):
+        fileobj.seek(0)
+    for chunk in fileobj.chunks(HASH_BLOCK_SIZE):
+        digest.update(chunk)
+    if hasattr(fileobj, 'seek'):
+        fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def path_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(HASH_BLOCK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sha256_from_name(name):
+    """Kunin ang sha256 mula sa pangalan ng blob; '' kapag hindi blob name."""
+    stem = os.path.splitext(os.path.basename(name or ''))[0]
+    if len(stem) == 64 and all(c in '0123456789abcdef' for c in stem):
+        return stem
+    return ''
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    blob_prefix = 'blobs'
+
+    def blob_name(self, sha256, original_name):
+        ext = os.path.splitext(original_name or '')[1].lower()[:10]
+        return f"{self.blob_prefix}/{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}"
+
+    def _save(self, name, content):
+        from .models import StoredBlob
+
+        sha256 = file_sha256(content)
+        with transaction.atomic():
+            # Naka-lock ang blob row hanggang mag-commit ang caller, kaya hindi ito
+            # mabubura ng kasabay na release() habang ginagamit pa
+            blob = StoredBlob.objects.select_for_update().filter(sha256=sha256).first()
+            name = blob.name if blob else self.blob_name(sha256, name)
+            written = None
+            if not self.exists(name):
+                written = super()._save(name, content)
+            blob = StoredBlob.acquire(sha256, name, content.size)
+            if written and written != blob.name:
+                # Naunahan ng kasabay na upload ng parehong laman (``<sha>_AbCdE``
+                # o ibang extension); iisang kopya lang ang itinatago
+                super().delete(written)
+        return blob.name
+
+    def adopt(self, path, original_name):
+        """
+        Ipasok sa storage ang isang file na nasa disk na (hal. ang ``.part``
+        file ng chunked upload) sa pamamagitan ng hard link, kaya walang kopya.
+        Binubura lang ang ``path`` kapag na-commit na ang transaction ng caller;
+        kapag nag-rollback, buo pa rin ito at puwedeng ulitin. Returns ang
+        storage name.
+        """
+        from .models import StoredBlob
+
+        sha256 = path_sha256(path)
+        size = os.path.getsize(path)
+        with transaction.atomic():
+            blob = StoredBlob.objects.select_for_update().filter(sha256=sha256).first()
+            name = blob.name if blob else self.blob_name(sha256, original_name)
+            linked = False
+            if not self.exists(name):
+                target = self.path(name)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                try:
+                    os.link(path, target)
+                    linked = True
+                except FileExistsError:
+                    pass
+            blob = StoredBlob.acquire(sha256, name, size)
+            if linked and name != blob.name:
+                os.remove(self.path(name))
+        transaction.on_commit(lambda: _remove_file(path))
+        return blob.name
+
+    def release(self, name):
+        """Bawasan ang reference; burahin ang file kapag wala nang gumagamit."""
+        from .models import StoredBlob
+
+        with transaction.atomic():
+            # Binubura ang file habang hawak pa ang row lock: ang kasabay na
+            # _save/adopt ay maghihintay at gagawa ng bagong blob pagkatapos
+            if StoredBlob.release(name):
+                self.delete(name)
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,96 @@
+"""
+Naka-cache na navbar/sidebar fragments para sa base.html.
+
+Halos pareho ang markup ng navigation sa bawat request; nagbabago lang ito
+ayon sa role ng user, sa kasalukuyang page (active/collapsed states) at sa
+mga counter (hal. pending badge). Kaya::
+
+    {% load nav_cache %}
+    {% navcache 'sidebar' pending_count=pending_count %}
+        ... <span class="badge">{% navslot 'pending_count' %}</span> ...
+    {% endnavcache %}
+
+Isang beses lang nire-render ang laman para sa bawat (role, url_name, kung
+zero o hindi ang bawat counter); ang ``{% navslot %}`` ay nagiging marker na
+pinapalitan ng totoong value (escaped) sa bawat request. Kaya ang mga
+kondisyon sa loob ng fragment ay dapat nakadepende lang sa role, sa
+``request.resolver_match.url_name``/``request.path`` ng page, o kung zero ang
+isang counter.
+
+Ang version key (``caching.nav_version``) ay itinataas kapag may nagbagong
+School o role/school ng isang user. ``NAV_CACHE_ENABLED = False`` sa settings
+para i-render nang buo ang fragments (hal. sa pag-measure, tingnan ang
+``measure_nav_cache`` command).
+"""
+import re
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.base import token_kwargs
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+
+from ..caching import NAV_CACHE_TIMEOUT, nav_version
+
+register = template.Library()
+
+SLOT_MARK = '\x1e'
+SLOT_RE = re.compile(f'{SLOT_MARK}(\\w+){SLOT_MARK}')
+
+
+def nav_role(user):
+    """Pangalan ng nav variant ng user (hindi kasama ang user mismo)."""
+    if not user.is_authenticated:
+        return 'anonymous'
+    role = user.get_role().lower().replace(' ', '-')
+    return f"{role}:{int(user.is_superuser)}:{int(user.has_scope)}"
+
+
+class NavCacheNode(template.Node):
+    def __init__(self, name, slots, nodelist):
+        self.name = name
+        self.slots = slots
+        self.nodelist = nodelist
+
+    def cache_key(self, request, values):
+        match = getattr(request, 'resolver_match', None)
+        url_name = match.url_name if match else ''
+        # Counters: kung zero o hindi lang ang bahagi ng key; ang value ay nasa slot
+        flags = ''.join(
+            '1' if values[name] else '0'
+            for name in sorted(values) if isinstance(values[name], int)
+        )
+        return f"documents:nav:{nav_version()}:{self.name}:{nav_role(request.user)}:{url_name}:{flags}"
+
+    def render(self, context):
+        values = {name: expression.resolve(context) for name, expression in self.slots.items()}
+        request = context.get('request')
+        if request is None or not getattr(settings, 'NAV_CACHE_ENABLED', True):
+            markup = self.nodelist.render(context)
+        else:
+            key = self.cache_key(request, values)
+            markup = cache.get(key)
+            if markup is None:
+                markup = self.nodelist.render(context)
+                cache.set(key, markup, NAV_CACHE_TIMEOUT)
+        return mark_safe(SLOT_RE.sub(lambda m: str(conditional_escape(values.get(m.group(1), ''))), markup))
+
+
+@register.tag
+def navcache(parser, token):
+    bits = token.split_contents()
+    if len(bits) < 2 or bits[1][0] not in '"\'' or bits[1][0] != bits[1][-1]:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' requires a quoted fragment name.")
+    slots = token_kwargs(bits[2:], parser)
+    if len(slots) != len(bits) - 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' only accepts name=value slots after the fragment name.")
+    nodelist = parser.parse(('endnavcache',))
+    parser.delete_first_token()
+    return NavCacheNode(bits[1][1:-1], slots, nodelist)
+
+
+@register.simple_tag
+def navslot(name):
+    """Marker na papalitan ng value ng ``name`` mula sa ``{% navcache %}``."""
+    return mark_safe(f'{SLOT_MARK}{name}{SLOT_MARK}')
@@ -1,3 +1,1327 @@
-from django.test import TestCase
+import csv
+import hashlib
+import io
+import os
+import shutil
+import smtplib
+import sqlite3
+import tempfile
+import zipfile
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import authenticate
+from django.contrib.messages import get_messages
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.exceptions import ValidationError
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends import locmem
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.template import Context, Template, TemplateSyntaxError
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import compliance, distribution, search, seeding, viewcounts
+from . import metrics as request_metrics
+from .caching import (
+    PENDING_COUNT_KEY, SCHOOL_LIST_VERSION_KEY, get_pending_count, get_school_list, school_list_version, school_options,
+)
+from .context_processors import global_user_counts
+from .exports import XLSX_CONTENT_TYPE, cell_value
+from .extraction import run_extraction
+from .filetypes import OLE2_MAGIC, detect_category, page_count, path_metadata_job
+from .forms import CustomPasswordResetForm
+from .importers import import_roster, iter_roster_rows
+from .mail import queue_mail, queue_mass_mail, send_pending
+from .management.commands.extract_documents import Command as ExtractCommand
+from .models import (
+    ComplianceRollup, Document, DocumentText, DocumentView, InboxEntry, OrgUnit, OutboxEmail, School, SystemCounter,
+    SchoolGroup, StoredBlob, UploadChunk, UploadSession, User,
+)
+from .pagination import decode_cursor, encode_cursor
+from .sessions import SessionStore
+from .uploads import expire_upload_sessions, find_reusable_blob
+
+
+class TempMediaMixin:
+    """Sariling MEDIA_ROOT at search index bawat test class (hindi ginagalaw ang totoong files)."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls._media_root = tempfile.mkdtemp()
+        cls._media_override = override_settings(MEDIA_ROOT=cls._media_root)
+        cls._media_override.enable()
+        cls._index_path = search.INDEX_PATH
+        search.INDEX_PATH = ':memory:'
+        search._local.conn = None
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        search.INDEX_PATH = cls._index_path
+        search._local.conn = None
+        cls._media_override.disable()
+        shutil.rmtree(cls._media_root, ignore_errors=True)
+
+
+def make_memo(uploader, title, schools=(), **fields):
+    """Document (walang file) na ipinadala sa ``schools``."""
+    doc = Document.objects.create(uploaded_by=uploader, title=title, school=uploader.school, **fields)
+    InboxEntry.objects.bulk_create([
+        InboxEntry(document=doc, school=school, date_sent=doc.date_uploaded) for school in schools
+    ])
+    return doc
+
+
+class ScopedUsersMixin:
+    """Division na may dalawang district; bawat district ay may isang school."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.division = OrgUnit.objects.create(name='Division', code='DIV', kind=OrgUnit.KIND_DIVISION)
+        cls.district_a = OrgUnit.objects.create(name='District A', code='DA', parent=cls.division)
+        cls.district_b = OrgUnit.objects.create(name='District B', code='DB', parent=cls.division)
+        cls.school_a = School.objects.create(name='School A', school_id='SCH-A', org_unit=cls.district_a)
+        cls.school_b = School.objects.create(name='School B', school_id='SCH-B', org_unit=cls.district_b)
+        cls.secretary = User.objects.create_user(
+            'secretary@deped.gov.ph', 'Secretary', password='pw', is_deped_secretary=True, school=cls.school_a,
+        )
+        cls.supervisor = User.objects.create_user(
+            'supervisor@deped.gov.ph', 'Supervisor', password='pw', school=cls.school_a, org_unit=cls.district_a,
+        )
+        cls.head_a = User.objects.create_user(
+            'head.a@deped.gov.ph', 'Head A', password='pw', is_school_head=True, school=cls.school_a,
+        )
+        cls.head_b = User.objects.create_user(
+            'head.b@deped.gov.ph', 'Head B', password='pw', is_school_head=True, school=cls.school_b,
+        )
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class EmailLookupTests(TestCase):
+    """Ang login at password reset ay dapat iisang indexed lookup lang."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            'Juan.DelaCruz@deped.gov.ph', 'Juan Dela Cruz', password='s3cret-pass',
+            personal_email='Juan.DelaCruz@gmail.com',
+        )
+
+    def test_email_lookup_uses_lower_email_index(self):
+        plan = User.objects.by_email('JUAN.delacruz@DEPED.gov.ph').explain()
+        self.assertIn('user_email_lower_idx', plan)
+
+    def test_personal_email_lookup_uses_lower_index(self):
+        plan = User.objects.by_personal_email('juan.delacruz@GMAIL.com').explain()
+        self.assertIn('user_personal_email_lower_idx', plan)
+
+    def test_authenticate_is_case_insensitive_single_query(self):
+        with self.assertNumQueries(1):
+            user = authenticate(username='JUAN.DELACRUZ@deped.gov.ph', password='s3cret-pass')
+        self.assertEqual(user, self.user)
+
+    def test_authenticate_rejects_wrong_password(self):
+        self.assertIsNone(authenticate(username='juan.delacruz@deped.gov.ph', password='wrong'))
+
+    def test_password_reset_finds_user_by_personal_email(self):
+        users = CustomPasswordResetForm().get_users('JUAN.DELACRUZ@gmail.com')
+        self.assertEqual(list(users), [self.user])
+
+
+class FailingOpenBackend(BaseEmailBackend):
+    """SMTP server na hindi maabot."""
+
+    def open(self):
+        raise ConnectionRefusedError("Connection refused")
+
+    def send_messages(self, email_messages):
+        raise AssertionError("hindi dapat tawagin")
+
+
+class RejectingBackend(locmem.EmailBackend):
+    """Tinatanggihan ang email na papunta sa ``bad@`` address."""
+
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            if any(address.startswith('bad@') for address in message.to):
+                raise smtplib.SMTPRecipientsRefused({message.to[0]: (550, b'No such user')})
+        return super().send_messages(email_messages)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class OutboxTests(TestCase):
+    def test_queue_mail_is_sent_by_worker(self):
+        queue_mail('Approved', 'Welcome!', None, ['juan@gmail.com'], html_message='<p>Welcome!</p>')
+        self.assertEqual(len(mail.outbox), 0)
+
+        self.assertEqual(send_pending(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['juan@gmail.com'])
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.status, OutboxEmail.STATUS_SENT)
+        self.assertEqual(email.attempts, 1)
+
+    def test_unreachable_smtp_backs_off_whole_batch(self):
+        queue_mass_mail([('Memo', 'Body', None, [f'user{i}@gmail.com']) for i in range(3)])
+
+        self.assertEqual(send_pending(connection=FailingOpenBackend()), (0, 3))
+        for email in OutboxEmail.objects.all():
+            self.assertEqual(email.status, OutboxEmail.STATUS_PENDING)
+            self.assertEqual(email.attempts, 1)
+            self.assertIn('Connection refused', email.last_error)
+            self.assertGreater(email.next_attempt_at, timezone.now())
+        # Wala nang due hanggang matapos ang backoff
+        self.assertEqual(send_pending(), (0, 0))
+
+    def test_send_outbox_command_survives_unreachable_smtp(self):
+        queue_mail('Memo', 'Body', None, ['juan@gmail.com'])
+        with override_settings(EMAIL_BACKEND='documents.tests.FailingOpenBackend'):
+            call_command('send_outbox', stdout=StringIO())
+        self.assertEqual(OutboxEmail.objects.get().attempts, 1)
+
+    def test_rejected_email_fails_after_max_attempts(self):
+        queue_mail('Memo', 'Body', None, ['bad@gmail.com'])
+        queue_mail('Memo', 'Body', None, ['good@gmail.com'])
+
+        self.assertEqual(send_pending(max_attempts=2, connection=RejectingBackend()), (1, 1))
+        OutboxEmail.objects.filter(status=OutboxEmail.STATUS_PENDING).update(next_attempt_at=timezone.now())
+        self.assertEqual(send_pending(max_attempts=2, connection=RejectingBackend()), (0, 1))
+
+        rejected = OutboxEmail.objects.get(recipients=['bad@gmail.com'])
+        self.assertEqual(rejected.status, OutboxEmail.STATUS_FAILED)
+        self.assertEqual(rejected.attempts, 2)
+        self.assertEqual([m.to for m in mail.outbox], [['good@gmail.com']])
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoginViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create_user('juan@deped.gov.ph', 'Juan', password='s3cret-pass')
+        User.objects.create_user('maria@gmail.com', 'Maria', password='s3cret-pass')
+        User.objects.create_superuser('root@gmail.com', 'Root', password='s3cret-pass')
+
+    def login_error(self, username, password):
+        response = self.client.post(reverse('login'), {'username': username, 'password': password})
+        return [str(m) for m in get_messages(response.wsgi_request)]
+
+    def test_non_deped_email_is_denied_before_password_check(self):
+        denied = "Access Denied. Only official DepEd email addresses (@deped.gov.ph) are allowed."
+        self.assertEqual(self.login_error('maria@gmail.com', 'wrong'), [denied])
+        self.assertEqual(self.login_error('nobody@gmail.com', 'wrong'), [denied])
+
+    def test_wrong_password_message(self):
+        incorrect = "Incorrect email or password. Please try again."
+        self.assertEqual(self.login_error('juan@deped.gov.ph', 'wrong'), [incorrect])
+        self.assertEqual(self.login_error('root@gmail.com', 'wrong'), [incorrect])
+
+    def test_superuser_with_non_deped_email_can_log_in(self):
+        response = self.client.post(reverse('login'), {'username': 'ROOT@gmail.com', 'password': 's3cret-pass'})
+        self.assertRedirects(response, reverse('dashboard_selector'), fetch_redirect_response=False)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class RosterImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school = School.objects.create(name='Agban NHS', school_id='AGBAN-NHS')
+        User.objects.create_user('Juan@DepEd.gov.ph', 'Juan', password='s3cret-pass')
+
+    def roster(self, *lines):
+        header = 'email,personal_email,full_name,school_id,password\n'
+        return iter_roster_rows(io.BytesIO((header + '\n'.join(lines)).encode()), 'roster.csv')
+
+    def test_imports_valid_rows_and_reports_errors(self):
+        result = import_roster(self.roster(
+            'maria@deped.gov.ph,maria@gmail.com,Maria,agban-nhs,pw-12345',
+            'pedro@deped.gov.ph,pedro@gmail.com,Pedro,AGBAN-NHS,',
+            'bad@yahoo.com,bad@gmail.com,Bad,AGBAN-NHS,',
+            'ana@deped.gov.ph,ana@gmail.com,Ana,NOPE,',
+            'MARIA@deped.gov.ph,maria2@gmail.com,Maria Dup,AGBAN-NHS,',
+        ), batch_size=2)
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual([line for line, _ in result.errors], [4, 5, 6])
+        maria = User.objects.get(email='maria@deped.gov.ph')
+        self.assertEqual(maria.school, self.school)
+        self.assertTrue(maria.check_password('pw-12345'))
+        self.assertFalse(User.objects.get(email='pedro@deped.gov.ph').has_usable_password())
+
+    def test_existing_email_is_matched_case_insensitively(self):
+        result = import_roster(self.roster('JUAN@deped.gov.ph,juan@gmail.com,Juan Again,AGBAN-NHS,'))
+
+        self.assertEqual(result.created, 0)
+        self.assertEqual(result.errors, [(2, 'juan@deped.gov.ph is already registered.')])
+        self.assertEqual(User.objects.by_email('juan@deped.gov.ph').count(), 1)
+
+    def test_rerun_skips_already_imported_rows(self):
+        line = 'maria@deped.gov.ph,maria@gmail.com,Maria,AGBAN-NHS,'
+        self.assertEqual(import_roster(self.roster(line)).created, 1)
+        result = import_roster(self.roster(line))
+        self.assertEqual(result.created, 0)
+        self.assertEqual(len(result.errors), 1)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SearchTests(TempMediaMixin, ScopedUsersMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.memo_a = make_memo(cls.secretary, 'Brigada Eskwela schedule', [cls.school_a])
+        cls.memo_b = make_memo(cls.secretary, 'Brigada Eskwela report', [cls.school_b])
+
+    def setUp(self):
+        search.clear_index()
+        search.index_document(self.memo_a, content='Paglilinis ng silid-aralan')
+        search.index_document(self.memo_b, content='Ulat ng paaralan')
+
+    def search_ids(self, user, **params):
+        self.client.force_login(user)
+        response = self.client.get(reverse('search_documents'), {'q': 'brigada', **params})
+        self.assertEqual(response.status_code, 200)
+        return {row['id'] for row in response.json()['results']}
+
+    def test_matches_title_prefix_and_content(self):
+        self.assertEqual({doc_id for doc_id, _ in search.search('brig')}, {self.memo_a.pk, self.memo_b.pk})
+        self.assertEqual([doc_id for doc_id, _ in search.search('silid')], [self.memo_a.pk])
+        self.assertEqual(search.search('   '), [])
+
+    def test_results_are_scoped_by_role(self):
+        self.assertEqual(self.search_ids(self.secretary), {self.memo_a.pk, self.memo_b.pk})
+        self.assertEqual(self.search_ids(self.secretary, school=self.school_b.pk), {self.memo_b.pk})
+        self.assertEqual(self.search_ids(self.supervisor), {self.memo_a.pk})
+        self.assertEqual(self.search_ids(self.supervisor, school=self.school_b.pk), set())
+        self.assertEqual(self.search_ids(self.head_b), {self.memo_b.pk})
+
+    def test_limit_is_clamped(self):
+        self.assertEqual(len(self.search_ids(self.secretary, limit='-1')), 1)
+        self.assertEqual(len(self.search_ids(self.secretary, limit='abc')), 2)
+        self.assertEqual(len(self.search_ids(self.secretary, limit='1000')), 2)
+
+
+class ExtractionTests(TempMediaMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('head@deped.gov.ph', 'Head', password='pw')
+
+    def docx(self, text):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('[Content_Types].xml', '<Types/>')
+            archive.writestr('word/document.xml', f'<w:document><w:body><w:p><w:t>{text}</w:t></w:p></w:body></w:document>')
+        return buffer.getvalue()
+
+    def command(self):
+        command = ExtractCommand(stdout=StringIO(), stderr=StringIO())
+        command.processed = command.failed = 0
+        return command
+
+    def test_run_extraction_reads_docx_text(self):
+        doc = Document.objects.create(
+            uploaded_by=self.user, title='Memo', file=ContentFile(self.docx('Brigada &amp; Eskwela'), name='memo.docx'),
+        )
+        self.assertEqual(doc.category, 'word')
+
+        doc_id, status, text, error = run_extraction(doc.pk, doc.file.path, doc.category, timeout=10)
+        self.assertEqual((doc_id, status, error), (doc.pk, 'done', ''))
+        self.assertIn('Brigada & Eskwela', text)
+        self.assertEqual(run_extraction(doc.pk, '/nonexistent.docx', 'word', 10)[1:], ('failed', '', 'File not found.'))
+
+    def test_finish_saves_text_and_indexes_it(self):
+        doc = make_memo(self.user, 'Memo')
+        command = self.command()
+        command.finish(doc, Document.EXTRACTION_DONE, 'silid-aralan', '')
+
+        doc.refresh_from_db()
+        self.assertEqual(doc.extraction_status, Document.EXTRACTION_DONE)
+        self.assertEqual(DocumentText.objects.get(document=doc).text, 'silid-aralan')
+        self.assertEqual([doc_id for doc_id, _ in search.search('silid')], [doc.pk])
+        self.assertEqual(command.processed, 1)
+
+    def test_finish_skips_document_deleted_during_extraction(self):
+        doc = make_memo(self.user, 'Memo')
+        Document.objects.filter(pk=doc.pk).delete()
+        command = self.command()
+        command.finish(doc, Document.EXTRACTION_DONE, 'text', '')
+
+        self.assertFalse(DocumentText.objects.exists())
+        self.assertEqual(command.processed, 0)
+
+
+class ViewCountTests(TempMediaMixin, ScopedUsersMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.memo = make_memo(cls.secretary, 'Brigada Eskwela', [cls.school_a, cls.school_b])
+        cls.other = make_memo(cls.secretary, 'Oplan Kalusugan', [cls.school_a])
+
+    def setUp(self):
+        # Walang background flusher sa tests; tahasang flush() lang
+        patcher = mock.patch.object(viewcounts, '_ensure_flusher')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        viewcounts.flush()
+        self.addCleanup(viewcounts.flush)
+
+    def test_flush_batches_counts_viewers_and_reads(self):
+        viewcounts.record_view(self.memo.pk, self.head_a.pk, self.school_a.pk)
+        viewcounts.record_view(self.memo.pk, self.head_a.pk, self.school_a.pk)
+        viewcounts.record_view(self.other.pk, self.head_a.pk, self.school_a.pk)
+        self.assertEqual(viewcounts.pending_views(), {self.memo.pk: 2, self.other.pk: 1})
+
+        self.assertEqual(viewcounts.flush(), 3)
+        self.assertEqual(viewcounts.pending_views(), {})
+        self.memo.refresh_from_db()
+        self.assertEqual(self.memo.views_count, 2)
+        self.assertEqual(DocumentView.objects.filter(user=self.head_a).count(), 2)
+        self.assertTrue(InboxEntry.objects.get(document=self.memo, school=self.school_a).is_read)
+        self.assertFalse(InboxEntry.objects.get(document=self.memo, school=self.school_b).is_read)
+
+    def test_deleted_document_does_not_poison_the_buffer(self):
+        viewcounts.record_view(self.memo.pk, self.head_a.pk, self.school_a.pk)
+        viewcounts.record_view(self.other.pk, self.head_b.pk, self.school_a.pk)
+        self.memo.delete()
+
+        viewcounts.flush()
+        self.assertEqual(viewcounts.pending_views(), {})
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.views_count, 1)
+        self.assertEqual(list(DocumentView.objects.values_list('document_id', 'user_id')), [(self.other.pk, self.head_b.pk)])
+        self.assertTrue(InboxEntry.objects.get(document=self.other).is_read)
+
+    def test_transient_error_requeues_the_batch(self):
+        viewcounts.record_view(self.memo.pk, self.head_a.pk)
+        with mock.patch.object(viewcounts, '_write', side_effect=OperationalError('database is locked')):
+            with self.assertLogs('documents.viewcounts', 'ERROR'):
+                self.assertEqual(viewcounts.flush(), 0)
+        self.assertEqual(viewcounts.pending_views(), {self.memo.pk: 1})
+
+        self.assertEqual(viewcounts.flush(), 1)
+        self.memo.refresh_from_db()
+        self.assertEqual(self.memo.views_count, 1)
+
+
+class ComplianceTests(TempMediaMixin, ScopedUsersMixin, TestCase):
+    def setUp(self):
+        self.memo = make_memo(self.secretary, 'Brigada Eskwela')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(distribution.distribute(self.memo, [self.school_a.pk, self.school_b.pk]), 2)
+
+    def rollup(self, school):
+        row = ComplianceRollup.objects.get(school=school, month=compliance.month_of(self.memo.date_uploaded))
+        return row.received, row.opened, row.acknowledged
+
+    def test_distribute_is_idempotent(self):
+        self.assertEqual(distribution.distribute(self.memo, [self.school_a.pk]), 0)
+        self.assertEqual(self.rollup(self.school_a), (1, 0, 0))
+        self.assertEqual(self.rollup(self.school_b), (1, 0, 0))
+
+    def test_read_and_acknowledge_bump_once(self):
+        self.assertEqual(distribution.mark_read_many({(self.memo.pk, self.school_b.pk)}), 1)
+        self.assertEqual(distribution.mark_read_many({(self.memo.pk, self.school_b.pk)}), 0)
+        entry = distribution.acknowledge(self.memo, self.head_a)
+        distribution.acknowledge(self.memo, self.head_a)
+
+        self.assertTrue(entry.is_read)
+        self.assertEqual(entry.acknowledged_by, self.head_a)
+        self.assertEqual(self.rollup(self.school_a), (1, 1, 1))
+        self.assertEqual(self.rollup(self.school_b), (1, 1, 0))
+
+    def test_summary_matches_matrix(self):
+        distribution.acknowledge(self.memo, self.head_a)
+        today = timezone.localdate()
+        date_from, date_to = compliance.month_window(today, today)
+        summary = {row['school'].pk: row for row in compliance.school_summary(date_from, date_to)}
+        memos = list(compliance.report_memos(date_from, date_to))
+        cells, totals = compliance.matrix(memos)
+
+        self.assertEqual(memos, [self.memo])
+        self.assertEqual(cells[self.memo.pk], {self.school_a.pk: compliance.ACKNOWLEDGED, self.school_b.pk: compliance.UNREAD})
+        self.assertEqual(totals[self.memo.pk], {'received': 2, 'opened': 1, 'acknowledged': 1})
+        self.assertEqual(summary[self.school_a.pk]['rate'], 100)
+        self.assertEqual(summary[self.school_b.pk]['rate'], 0)
+
+        scoped = compliance.school_summary(date_from, date_to, scope_path=self.district_a.path)
+        self.assertEqual([row['school'] for row in scoped], [self.school_a])
+
+    def test_delete_decrements_rollup(self):
+        distribution.acknowledge(self.memo, self.head_a)
+        self.memo.delete()
+        self.assertEqual(self.rollup(self.school_a), (0, 0, 0))
+        self.assertEqual(self.rollup(self.school_b), (0, 0, 0))
+
+    def test_month_window_covers_whole_months(self):
+        self.assertEqual(
+            compliance.month_window(date(2024, 2, 15), date(2024, 2, 20)), (date(2024, 2, 1), date(2024, 2, 29)),
+        )
+        self.assertEqual(
+            compliance.month_window(date(2023, 11, 30), date(2023, 12, 1)), (date(2023, 11, 1), date(2023, 12, 31)),
+        )
+
+
+class SeedingTests(TempMediaMixin, TestCase):
+    def test_seed_spreads_upload_dates_and_flushes(self):
+        before = timezone.now()
+        result = seeding.seed_division(users=30, documents=40, pending=2, days=60, batch_size=15)
+        self.assertEqual((result.documents, result.pending), (40, 2))
+        self.assertEqual(seeding.seeded_users().filter(is_active=True).count(), result.users)
+
+        dates = list(Document.objects.order_by('id').values_list('date_uploaded', flat=True))
+        self.assertEqual(dates, sorted(dates))
+        self.assertLess(dates[0], before - timedelta(days=59))
+        self.assertLess(dates[-1], before)
+        self.assertEqual(InboxEntry.objects.count(), result.inbox_entries)
+        self.assertTrue(Document._meta.get_field('date_uploaded').auto_now_add)
+        self.assertGreaterEqual(make_memo(User.objects.first(), 'Bago').date_uploaded, before)
+
+        with self.assertRaises(seeding.SeedError):
+            seeding.seed_division(users=5, documents=1)
+        self.assertEqual(seeding.flush_seed(), 41)
+        self.assertFalse(seeding.seeded_users().exists())
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class UserManagementDataTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin@deped.gov.ph', 'Admin', password='pw')
+        cls.users = [
+            User.objects.create_user(f'teacher{index}@deped.gov.ph', f'Teacher {index}', password='pw')
+            for index in range(5)
+        ]
+        # Magkakaparehong date_joined para masubok ang tie-break sa id
+        User.objects.filter(pk__in=[user.pk for user in cls.users]).update(date_joined=timezone.now())
+        SystemCounter.rebuild()
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def fetch(self, **params):
+        response = self.client.get(reverse('user_management_data'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cursor_pages_through_every_user_once(self):
+        first = self.fetch(draw='3', length='2')
+        self.assertEqual(first['draw'], 3)
+        self.assertEqual((first['recordsTotal'], first['recordsFiltered']), (6, 6))
+
+        seen = [row['id'] for row in first['data']]
+        cursor = first['next_cursor']
+        while cursor:
+            page = self.fetch(length='2', cursor=cursor)
+            self.assertNotIn('recordsTotal', page)
+            seen += [row['id'] for row in page['data']]
+            cursor = page['next_cursor']
+        self.assertEqual(seen[:5], sorted((user.pk for user in self.users), reverse=True))
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(set(seen), {self.admin.pk, *(user.pk for user in self.users)})
+
+    def test_filters_and_capped_count(self):
+        data = self.fetch(**{'search[value]': 'teacher', 'columns[3][search][value]': 'Employee'})
+        self.assertEqual(data['recordsFiltered'], 5)
+        self.assertFalse(data['recordsFilteredCapped'])
+
+        with mock.patch('documents.views.USER_TABLE_COUNT_LIMIT', 3):
+            data = self.fetch(**{'search[value]': 'teacher'})
+        self.assertEqual(data['recordsFiltered'], 3)
+        self.assertTrue(data['recordsFilteredCapped'])
+
+    def test_bad_params_and_non_superuser(self):
+        data = self.fetch(draw='x', length='-5')
+        self.assertEqual(data['draw'], 0)
+        self.assertEqual(len(data['data']), 6)
+
+        self.client.force_login(self.users[0])
+        self.assertEqual(self.client.get(reverse('user_management_data')).status_code, 403)
+
+
+class MemoFeedTests(TempMediaMixin, ScopedUsersMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.memos = [make_memo(cls.secretary, f'Memo {index}', [cls.school_a]) for index in range(3)]
+        cls.memos.append(make_memo(cls.secretary, 'Memo B', [cls.school_b]))
+        # Iisang date para masubok ang tie-break sa id
+        moment = timezone.now()
+        Document.objects.update(date_uploaded=moment)
+        InboxEntry.objects.update(date_sent=moment)
+
+    def test_cursor_round_trip(self):
+        moment = timezone.now()
+        self.assertEqual(decode_cursor(encode_cursor(moment, 42)), (moment, 42))
+        for cursor in ('', 'not-base64!', encode_cursor(moment, 1)[:-3]):
+            self.assertIsNone(decode_cursor(cursor))
+
+    def feed_ids(self, user):
+        self.client.force_login(user)
+        ids, cursor = [], None
+        with mock.patch('documents.views.MEMO_FEED_PAGE_SIZE', 2):
+            while True:
+                response = self.client.get(reverse('memo_feed'), {'cursor': cursor} if cursor else {})
+                data = response.json()
+                ids += [memo['id'] for memo in data['memos']]
+                cursor = data['next_cursor']
+                if not cursor:
+                    return ids
+
+    def test_pages_are_ordered_without_gaps_or_repeats(self):
+        everything = sorted((memo.pk for memo in self.memos), reverse=True)
+        self.assertEqual(self.feed_ids(self.secretary), everything)
+        self.assertEqual(self.feed_ids(self.supervisor), [pk for pk in everything if pk != self.memos[3].pk])
+        self.assertEqual(self.feed_ids(self.head_b), [self.memos[3].pk])
+
+    def test_inbox_rows_carry_read_state(self):
+        InboxEntry.objects.filter(document=self.memos[0]).update(is_read=True)
+        self.client.force_login(self.head_a)
+        memos = {memo['id']: memo for memo in self.client.get(reverse('memo_feed')).json()['memos']}
+        self.assertTrue(memos[self.memos[0].pk]['is_read'])
+        self.assertFalse(memos[self.memos[1].pk]['is_read'])
+        self.assertEqual(memos[self.memos[0].pk]['url'], reverse('download_document', args=[self.memos[0].pk]))
+
+
+class PendingCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pending = User.objects.create_user('pending@deped.gov.ph', 'Pending', is_active=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_count_is_cached_and_adjusted_by_signals(self):
+        self.assertEqual(get_pending_count(), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_pending_count(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other = User.objects.create_user('other@deped.gov.ph', 'Other', is_active=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pending.is_active = True
+            self.pending.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_pending_count(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_pending_count(), 0)
+
+    def test_deferred_is_active_invalidates(self):
+        self.assertEqual(get_pending_count(), 1)
+        user = User.objects.only('id', 'full_name').get(pk=self.pending.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            user.full_name = 'Renamed'
+            user.save(update_fields=['full_name'])
+        self.assertIsNone(cache.get(PENDING_COUNT_KEY))
+
+    def test_context_processor_only_counts_for_superusers(self):
+        request = RequestFactory().get('/')
+        request.user = self.pending
+        self.assertEqual(global_user_counts(request), {'pending_count': 0})
+        request.user = User(is_superuser=True)
+        self.assertEqual(global_user_counts(request), {'pending_count': 1})
+
+
+class SystemCounterTests(TestCase):
+    def test_missing_counters_are_rebuilt_then_read_in_one_query(self):
+        School.objects.create(name='School A', school_id='SCH-A')
+        User.objects.create_user('head@deped.gov.ph', 'Head')
+        SystemCounter.objects.all().delete()
+
+        self.assertEqual(
+            SystemCounter.get_values(),
+            {SystemCounter.TOTAL_USERS: 1, SystemCounter.TOTAL_SCHOOLS: 1, SystemCounter.TOTAL_MEMOS: 0},
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(SystemCounter.get_values([SystemCounter.TOTAL_USERS]), {SystemCounter.TOTAL_USERS: 1})
+
+    def test_signals_keep_counters_in_step(self):
+        SystemCounter.rebuild()
+        with self.captureOnCommitCallbacks(execute=True):
+            School.objects.create(name='School A', school_id='SCH-A')
+            user = User.objects.create_user('head@deped.gov.ph', 'Head')
+        with self.captureOnCommitCallbacks(execute=True):
+            user.delete()
+        values = SystemCounter.get_values()
+        self.assertEqual(values[SystemCounter.TOTAL_SCHOOLS], 1)
+        self.assertEqual(values[SystemCounter.TOTAL_USERS], 0)
+
+        # Drift mula sa QuerySet.update/bulk ops ay naaayos ng rebuild_counters
+        SystemCounter.objects.filter(name=SystemCounter.TOTAL_SCHOOLS).update(value=99)
+        call_command('rebuild_counters', stdout=StringIO())
+        self.assertEqual(SystemCounter.get_values()[SystemCounter.TOTAL_SCHOOLS], 1)
+
+    def test_dashboard_reads_counters(self):
+        admin = User.objects.create_superuser('admin@deped.gov.ph', 'Admin')
+        SystemCounter.rebuild()
+        self.client.force_login(admin)
+        response = self.client.get(reverse('super_admin_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_users'], 1)
+        self.assertEqual(response.context['total_memos'], 0)
+
+
+def ooxml(folder):
+    """Pinakamaliit na Office Open XML package na may ``folder`` (hal. 'word/')."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('[Content_Types].xml', '<Types/>')
+        archive.writestr(f'{folder}document.xml', '<document/>')
+    return buffer.getvalue()
+
+
+class CategoryTests(TempMediaMixin, TestCase):
+    def test_detect_category_trusts_content_over_extension(self):
+        cases = [
+            (b'%PDF-1.4 ...', 'memo.docx', 'pdf'),
+            (ooxml('word/'), 'memo.bin', 'word'),
+            (ooxml('xl/'), 'memo.docx', 'excel'),
+            (ooxml('ppt/'), 'memo.pptx', 'ppt'),
+            (OLE2_MAGIC + b'\0' * 8, 'memo.xls', 'excel'),
+            (OLE2_MAGIC + b'\0' * 8, 'memo.pdf', 'other'),
+            (b'name,school\n', 'roster.csv', 'excel'),
+            (b'not really a doc', 'memo.docx', 'other'),
+        ]
+        for content, name, expected in cases:
+            with self.subTest(name=name, expected=expected):
+                handle = io.BytesIO(content)
+                self.assertEqual(detect_category(handle, name), expected)
+                self.assertEqual(handle.tell(), 0)
+
+    def test_upload_sets_category_and_stats(self):
+        user = User.objects.create_user('head@deped.gov.ph', 'Head')
+        self.client.force_login(user)
+        for name, content in [('a.pdf', b'%PDF-1.4'), ('b.pdf', b'%PDF-1.4 b'), ('c.docx', ooxml('word/'))]:
+            response = self.client.post(
+                reverse('upload_document'), {'title': name, 'file': SimpleUploadedFile(name, content)},
+                HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+            )
+            self.assertEqual(response.json()['status'], 'success')
+        self.assertEqual(
+            sorted(Document.objects.values_list('category', flat=True)), ['pdf', 'pdf', 'word'],
+        )
+
+        response = self.client.get(reverse('upload_document'))
+        self.assertEqual(response.context['total_uploads'], 3)
+        self.assertEqual((response.context['pdf_count'], response.context['word_count']), (2, 1))
+        self.assertEqual(response.context['excel_count'], 0)
+
+
+@mock.patch('documents.uploads.CHUNK_SIZE', 4)
+class ChunkedUploadTests(TempMediaMixin, TestCase):
+    content = b'%PDF-1.4\n'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('head@deped.gov.ph', 'Head')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def start(self):
+        response = self.client.post(
+            reverse('upload_session_start'), {'title': 'Memo', 'filename': 'memo.pdf', 'size': len(self.content)},
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def put(self, upload_id, index, data, **headers):
+        return self.client.put(
+            reverse('upload_chunk', args=[upload_id, index]), data,
+            content_type='application/octet-stream', headers=headers,
+        )
+
+    def finalize(self, upload_id):
+        return self.client.post(reverse('upload_session_finalize', args=[upload_id]))
+
+    def test_resume_and_finalize(self):
+        upload = self.start()
+        upload_id = upload['upload_id']
+        self.assertEqual((upload['chunk_size'], upload['total_chunks'], upload['received']), (4, 3, []))
+
+        self.assertEqual(self.put(upload_id, 1, self.content[4:8]).status_code, 200)
+        status = self.client.get(reverse('upload_session_status', args=[upload_id])).json()
+        self.assertEqual(status['received'], [1])
+        self.assertEqual(self.finalize(upload_id).status_code, 400)
+
+        self.assertEqual(self.put(upload_id, 0, self.content[:4], x_chunk_checksum='0' * 64).status_code, 400)
+        self.assertEqual(self.put(upload_id, 2, self.content[8:] + b'xx').status_code, 400)
+        # Ulitin ang chunk (idempotent) at ipadala ang mga kulang
+        for index in (1, 0, 2):
+            chunk = self.content[index * 4:index * 4 + 4]
+            checksum = hashlib.sha256(chunk).hexdigest()
+            self.assertEqual(self.put(upload_id, index, chunk, x_chunk_checksum=checksum).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.finalize(upload_id)
+        self.assertEqual(response.status_code, 200)
+        doc = Document.objects.get(pk=response.json()['doc_id'])
+        with doc.file.open('rb') as handle:
+            self.assertEqual(handle.read(), self.content)
+        self.assertEqual((doc.category, doc.sha256), ('pdf', hashlib.sha256(self.content).hexdigest()))
+        self.assertFalse(os.path.exists(UploadSession.objects.get(pk=upload_id).part_path))
+        self.assertFalse(UploadChunk.objects.exists())
+
+        # Pangalawang finalize (hal. retry ng client) ay parehong Document
+        self.assertEqual(self.finalize(upload_id).json()['doc_id'], doc.pk)
+        self.assertEqual(Document.objects.count(), 1)
+        self.assertEqual(self.put(upload_id, 0, self.content[:4]).status_code, 400)
+
+    def test_sessions_are_private(self):
+        upload_id = self.start()['upload_id']
+        other = User.objects.create_user('other@deped.gov.ph', 'Other')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(reverse('upload_session_status', args=[upload_id])).status_code, 404)
+        self.assertEqual(self.put(upload_id, 0, self.content[:4]).status_code, 404)
+
+    def test_expire_removes_idle_sessions_and_orphan_parts(self):
+        idle_id = self.start()['upload_id']
+        self.put(idle_id, 0, self.content[:4])
+        busy_id = self.start()['upload_id']
+        idle, busy = UploadSession.objects.get(pk=idle_id), UploadSession.objects.get(pk=busy_id)
+        orphan = os.path.join(os.path.dirname(idle.part_path), 'orphan.part')
+        with open(orphan, 'wb') as handle:
+            handle.write(b'x')
+        os.utime(orphan, (0, 0))
+
+        old = timezone.now() - timedelta(days=2)
+        UploadSession.objects.filter(pk=idle_id).update(updated_at=old)
+        UploadChunk.objects.filter(session=idle).update(received_at=old)
+        self.assertEqual(expire_upload_sessions(max_age=60 * 60), 1)
+
+        self.assertEqual(list(UploadSession.objects.values_list('pk', flat=True)), [busy.pk])
+        self.assertFalse(os.path.exists(idle.part_path))
+        self.assertFalse(os.path.exists(orphan))
+
+
+class ContentAddressedStorageTests(TempMediaMixin, ScopedUsersMixin, TestCase):
+    content = b'%PDF-1.4 Brigada Eskwela'
+
+    def upload(self, user, title='Memo'):
+        return Document.objects.create(
+            uploaded_by=user, title=title, file=ContentFile(self.content, name='memo.pdf'),
+        )
+
+    def test_identical_uploads_share_one_blob(self):
+        sha256 = hashlib.sha256(self.content).hexdigest()
+        first, second = self.upload(self.head_a), self.upload(self.head_b)
+
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(first.file.name, f'blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}.pdf')
+        self.assertEqual(first.sha256, sha256)
+        blob = StoredBlob.objects.get()
+        self.assertEqual((blob.sha256, blob.ref_count), (sha256, 2))
+        path = first.file.path
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(StoredBlob.objects.get().ref_count, 1)
+        self.assertTrue(os.path.exists(path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(StoredBlob.objects.exists())
+        self.assertFalse(os.path.exists(path))
+
+    def test_reuse_by_hash_requires_a_visible_memo(self):
+        doc = self.upload(self.head_a)
+        distribution.distribute(doc, [self.school_a.pk])
+
+        self.assertIsNotNone(find_reusable_blob(self.head_a, doc.sha256.upper()))
+        self.assertIsNotNone(find_reusable_blob(self.supervisor, doc.sha256))
+        self.assertIsNotNone(find_reusable_blob(self.secretary, doc.sha256))
+        self.assertIsNone(find_reusable_blob(self.head_b, doc.sha256))
+        self.assertIsNone(find_reusable_blob(self.head_a, 'not-a-hash'))
+
+        self.client.force_login(self.head_b)
+        self.assertFalse(self.client.get(reverse('blob_exists', args=[doc.sha256])).json()['exists'])
+        response = self.client.post(reverse('upload_existing_blob'), {'title': 'Kopya', 'sha256': doc.sha256})
+        self.assertEqual(response.status_code, 404)
+
+        self.client.force_login(self.head_a)
+        self.assertTrue(self.client.get(reverse('blob_exists', args=[doc.sha256])).json()['exists'])
+        response = self.client.post(reverse('upload_existing_blob'), {'title': 'Kopya', 'sha256': doc.sha256})
+        copy = Document.objects.get(pk=response.json()['doc_id'])
+        self.assertEqual(copy.file.name, doc.file.name)
+        self.assertEqual(StoredBlob.objects.get().ref_count, 2)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class BulkAccessRequestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin@deped.gov.ph', 'Admin', password='pw')
+        cls.school_a = School.objects.create(name='School A', school_id='SCH-A')
+        cls.school_b = School.objects.create(name='School B', school_id='SCH-B')
+        cls.pending_a = [
+            User.objects.create_user(
+                f'teacher{index}@deped.gov.ph', f'Teacher {index}', is_active=False, school=cls.school_a,
+            )
+            for index in range(2)
+        ]
+        cls.pending_b = User.objects.create_user(
+            'teacher.b@deped.gov.ph', 'Teacher B', is_active=False, school=cls.school_b, personal_email='b@example.com',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def post(self, **data):
+        return self.client.post(reverse('bulk_access_requests'), data)
+
+    def test_approve_selected_users_and_queue_notices(self):
+        self.assertEqual(get_pending_count(), 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post(action='approve', user_ids=[self.pending_a[0].pk, self.pending_b.pk, self.admin.pk])
+        self.assertEqual(response.json()['count'], 2)
+
+        self.assertEqual(set(User.objects.filter(is_active=False)), {self.pending_a[1]})
+        self.assertEqual(
+            sorted(OutboxEmail.objects.values_list('recipients', flat=True)),
+            sorted([['b@example.com'], [self.pending_a[0].email]]),
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(get_pending_count(), 1)
+
+    def test_reject_by_school(self):
+        response = self.post(action='reject', school=self.school_a.pk)
+        self.assertEqual(response.json()['count'], 2)
+        self.assertEqual(list(User.objects.filter(is_active=False)), [self.pending_b])
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.post(action='delete', user_ids=[self.pending_b.pk]).status_code, 400)
+        self.assertEqual(self.post(action='approve', user_ids=['x']).status_code, 400)
+        self.assertEqual(self.post(action='approve').status_code, 400)
+
+        self.client.force_login(User.objects.create_user('head@deped.gov.ph', 'Head'))
+        self.assertEqual(self.post(action='approve', user_ids=[self.pending_b.pk]).status_code, 302)
+        self.assertEqual(User.objects.filter(is_active=False).count(), 3)
+
+
+class FileMetadataTests(TempMediaMixin, TestCase):
+    pdf = b'%PDF-1.4\n1 0 obj << /Type /Pages /Count 2 >>\n2 0 obj << /Type /Page >>\n3 0 obj << /Type/Page >>\n'
+
+    def package(self, files):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            for name, content in files.items():
+                archive.writestr(name, content)
+        return buffer.getvalue()
+
+    def test_page_counts(self):
+        docx = self.package({
+            'word/document.xml': '<w/>',
+            'docProps/app.xml': '<Properties><Pages>4</Pages></Properties>',
+        })
+        pptx = self.package({f'ppt/slides/slide{index}.xml': '<p/>' for index in range(1, 4)})
+        self.assertEqual(page_count(io.BytesIO(self.pdf), 'pdf'), 2)
+        self.assertEqual(page_count(io.BytesIO(docx), 'word'), 4)
+        self.assertEqual(page_count(io.BytesIO(pptx), 'ppt'), 3)
+        self.assertIsNone(page_count(io.BytesIO(b'a,b\n'), 'excel'))
+        self.assertIsNone(page_count(io.BytesIO(b'garbage'), 'word'))
+
+    def test_saved_on_upload_and_shown_in_feed(self):
+        user = User.objects.create_user('head@deped.gov.ph', 'Head')
+        doc = Document.objects.create(uploaded_by=user, title='Memo', file=ContentFile(self.pdf, name='memo.pdf'))
+        doc.refresh_from_db()
+        self.assertEqual(
+            (doc.file_size, doc.mime_type, doc.page_count, doc.sha256),
+            (len(self.pdf), 'application/pdf', 2, hashlib.sha256(self.pdf).hexdigest()),
+        )
+
+        secretary = User.objects.create_user('secretary@deped.gov.ph', 'Secretary', is_deped_secretary=True)
+        self.client.force_login(secretary)
+        memo = self.client.get(reverse('memo_feed')).json()['memos'][0]
+        self.assertEqual((memo['size'], memo['page_count']), (len(self.pdf), 2))
+        self.assertEqual(memo['file_info'], f'PDF File · {len(self.pdf)}\xa0bytes · 2 pages')
+
+    def test_backfill_job_reads_from_disk(self):
+        path = os.path.join(self._media_root, 'old-memo.pdf')
+        with open(path, 'wb') as handle:
+            handle.write(self.pdf)
+        doc_id, metadata, error = path_metadata_job((7, path, 'pdf'))
+        self.assertEqual((doc_id, error), (7, ''))
+        self.assertEqual(metadata['page_count'], 2)
+        self.assertEqual(metadata['sha256'], hashlib.sha256(self.pdf).hexdigest())
+        self.assertEqual(path_metadata_job((8, path + '.missing', 'pdf'))[:2], (8, None))
+
+
+@mock.patch('documents.views.record_view')
+class DownloadTests(TempMediaMixin, ScopedUsersMixin, TestCase):
+    content = b'%PDF-1.4 0123456789'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.doc = Document.objects.create(
+            uploaded_by=cls.secretary, title='Brigada Eskwela', file=ContentFile(cls.content, name='memo.pdf'),
+        )
+        distribution.distribute(cls.doc, [cls.school_a.pk])
+
+    def get(self, user, **headers):
+        self.client.force_login(user)
+        response = self.client.get(reverse('download_document', args=[self.doc.pk]), headers=headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_full_download_and_conditional_get(self, record_view):
+        response, body = self.get(self.head_a)
+        self.assertEqual((response.status_code, body), (200, self.content))
+        self.assertEqual(response['ETag'], f'"{self.doc.sha256}"')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('Brigada Eskwela.pdf', response['Content-Disposition'])
+        record_view.assert_called_once_with(self.doc.pk, self.head_a.pk, self.school_a.pk)
+
+        response, body = self.get(self.head_a, if_none_match=response['ETag'])
+        self.assertEqual((response.status_code, body), (304, b''))
+        self.assertEqual(record_view.call_count, 1)
+
+    def test_ranges(self, record_view):
+        response, body = self.get(self.head_a, range='bytes=0-3')
+        self.assertEqual((response.status_code, body), (206, b'%PDF'))
+        self.assertEqual(response['Content-Range'], f'bytes 0-3/{len(self.content)}')
+
+        # Resume: hindi na binibilang bilang bagong pagbukas
+        response, body = self.get(self.head_a, range='bytes=-4')
+        self.assertEqual((response.status_code, body), (206, b'6789'))
+        self.assertEqual(record_view.call_count, 1)
+
+        response, _ = self.get(self.head_a, range=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+
+        # Ibang ETag sa If-Range: buong file ang ibibigay
+        response, body = self.get(self.head_a, range='bytes=0-3', if_range='"stale"')
+        self.assertEqual((response.status_code, body), (200, self.content))
+
+    def test_access_is_checked(self, record_view):
+        self.assertEqual(self.get(self.head_b)[0].status_code, 403)
+        self.assertEqual(self.get(self.supervisor)[0].status_code, 200)
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('download_document', args=[self.doc.pk])).status_code, 302)
+
+    @override_settings(DOCUMENT_SENDFILE_HEADER='X-Accel-Redirect')
+    def test_sendfile_offload(self, record_view):
+        response, body = self.get(self.head_a)
+        self.assertEqual(body, b'')
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.doc.file.name}')
+
+
+class DistributionTests(TempMediaMixin, ScopedUsersMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.closed = School.objects.create(name='Closed School', school_id='SCH-X', is_active=False)
+        cls.group = SchoolGroup.objects.create(name='District B')
+        cls.group.schools.add(cls.school_b, cls.closed)
+
+    def test_resolve_recipients(self):
+        resolve = distribution.resolve_recipients
+        self.assertEqual(resolve(self.secretary, ['division']), {self.school_a.pk, self.school_b.pk})
+        self.assertEqual(resolve(self.secretary, [f'group:{self.group.pk}']), {self.school_b.pk})
+        self.assertEqual(
+            resolve(self.secretary, [f'school:{self.school_b.pk}', f'school:{self.closed.pk}', 'school:x', 'bogus']),
+            {self.school_b.pk},
+        )
+        self.assertEqual(resolve(self.secretary, []), {self.school_a.pk})
+        # Ang hindi division office ay sa sariling school lang nagpapadala
+        self.assertEqual(resolve(self.head_a, ['division', f'school:{self.school_b.pk}']), {self.school_a.pk})
+
+    def test_upload_fills_the_recipient_inboxes(self):
+        self.client.force_login(self.secretary)
+        response = self.client.post(
+            reverse('upload_document'),
+            {'title': 'Memo', 'file': SimpleUploadedFile('memo.pdf', b'%PDF-1.4'), 'recipients': ['division']},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        doc = Document.objects.get(pk=response.json()['doc_id'])
+        self.assertEqual(
+            set(InboxEntry.objects.filter(document=doc).values_list('school_id', flat=True)),
+            {self.school_a.pk, self.school_b.pk},
+        )
+
+        self.client.force_login(self.head_b)
+        response = self.client.get(reverse('received_documents'))
+        self.assertEqual(response.context['unread_count'], 1)
+        self.assertEqual([memo.pk for memo in response.context['memos']], [doc.pk])
+
+        response = self.client.post(reverse('acknowledge_document', args=[doc.pk]))
+        self.assertEqual(response.json()['status'], 'success')
+        self.assertEqual(distribution.unread_count(self.school_b.pk), 0)
+        self.assertEqual(distribution.unread_count(self.school_a.pk), 1)
+
+    def test_acknowledge_requires_a_recipient_school(self):
+        doc = make_memo(self.secretary, 'Memo', [self.school_a])
+        self.client.force_login(self.head_b)
+        self.assertEqual(self.client.post(reverse('acknowledge_document', args=[doc.pk])).status_code, 403)
+        self.assertIsNone(InboxEntry.objects.get(document=doc).acknowledged_at)
+
+
+class ExportTests(TempMediaMixin, ScopedUsersMixin, TestCase):
+    def download(self, user, url_name, **params):
+        self.client.force_login(user)
+        response = self.client.get(reverse(url_name), params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content)
+
+    def test_cell_values(self):
+        self.assertEqual(cell_value(None), '')
+        self.assertEqual(cell_value(True), 'Yes')
+        self.assertEqual(cell_value(3), 3)
+        self.assertEqual(cell_value('=HYPERLINK("x")'), '\'=HYPERLINK("x")')
+        self.assertEqual(cell_value(date(2024, 6, 1)), '2024-06-01')
+
+    def test_users_csv_uses_table_filters(self):
+        User.objects.filter(pk=self.head_b.pk).update(full_name='=cmd|calc')
+        admin = User.objects.create_superuser('admin@deped.gov.ph', 'Admin')
+        response, body = self.download(admin, 'export_users', **{'columns[3][search][value]': 'school head'})
+        filename = f'users-{timezone.localdate():%Y%m%d}.csv'
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="{filename}"')
+
+        rows = list(csv.reader(StringIO(body.decode('utf-8-sig'))))
+        self.assertEqual(rows[0][:3], ['ID', 'Full Name', 'DepEd Email'])
+        self.assertEqual({row[2] for row in rows[1:]}, {self.head_a.email, self.head_b.email})
+        self.assertIn("'=cmd|calc", {row[1] for row in rows[1:]})
+
+        self.client.force_login(self.head_a)
+        self.assertEqual(self.client.get(reverse('export_users')).status_code, 302)
+
+    def test_memos_xlsx_is_scoped(self):
+        memo_a = make_memo(self.secretary, 'Memo <A> & Co', [self.school_a])
+        make_memo(self.secretary, 'Memo B', [self.school_b])
+        response, body = self.download(self.supervisor, 'export_memos', format='xlsx')
+        self.assertEqual(response['Content-Type'], XLSX_CONTENT_TYPE)
+
+        with zipfile.ZipFile(io.BytesIO(body)) as archive:
+            self.assertIn('name="Memos"', archive.read('xl/workbook.xml').decode())
+            sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row '), 2)
+        self.assertIn(f'<c r="A2"><v>{memo_a.pk}</v></c>', sheet)
+        self.assertIn('Memo &lt;A&gt; &amp; Co', sheet)
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        request_metrics.reset()
+        self.addCleanup(request_metrics.reset)
+
+    def test_histogram_buckets(self):
+        histogram = request_metrics.Histogram((1, 5))
+        for value in (0, 1, 3, 9):
+            histogram.observe(value)
+        self.assertEqual((histogram.counts, histogram.count, histogram.total), ([2, 1], 4, 13))
+
+    def test_requests_are_recorded_per_view(self):
+        self.client.get(reverse('login'))
+        self.client.get(reverse('login'))
+        self.client.get('/no-such-page/')
+        body = self.client.get(reverse('metrics')).content.decode()
+
+        labels = f'view="login",method="GET",status="2xx",pid="{os.getpid()}"'
+        self.assertIn(f'erdms_request_duration_seconds_count{{{labels}}} 2', body)
+        self.assertIn(f'erdms_db_queries_bucket{{{labels},le="+Inf"}} 2', body)
+        self.assertIn('view="<unresolved>",method="GET",status="4xx"', body)
+        self.assertNotIn('view="metrics"', body)
+
+    @override_settings(METRICS_ALLOWED_IPS=[])
+    def test_endpoint_is_restricted(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        self.client.force_login(User.objects.create_superuser('admin@deped.gov.ph', 'Admin'))
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+
+class SessionStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def saved_session(self):
+        store = SessionStore()
+        store['user'] = 1
+        store.save()
+        return store.session_key
+
+    def test_unchanged_session_is_not_written(self):
+        key = self.saved_session()
+        store = SessionStore(key)
+        with self.assertNumQueries(0):
+            self.assertEqual(store['user'], 1)
+            store.save()
+
+        store['user'] = 2
+        with CaptureQueriesContext(connection) as queries:
+            store.save()
+        self.assertTrue(any(query['sql'].startswith('UPDATE') and 'django_session' in query['sql'] for query in queries))
+        self.assertEqual(SessionStore().decode(Session.objects.get(pk=key).session_data), {'user': 2})
+
+    def test_falls_back_to_database_and_refreshes_near_expiry(self):
+        key = self.saved_session()
+        cache.clear()
+        store = SessionStore(key)
+        with self.assertNumQueries(1):
+            self.assertEqual(store['user'], 1)
+
+        # Malapit nang mag-expire ang naka-save: isinusulat ulit kahit walang nagbago
+        soon = timezone.now() + timedelta(seconds=60)
+        Session.objects.filter(pk=key).update(expire_date=soon)
+        cache.clear()
+        store = SessionStore(key)
+        store.load()
+        store.save()
+        self.assertGreater(Session.objects.get(pk=key).expire_date, soon + timedelta(days=1))
+
+    def test_clear_expired_in_batches(self):
+        past = timezone.now() - timedelta(days=1)
+        Session.objects.bulk_create([
+            Session(session_key=f'expired{index}', session_data='', expire_date=past) for index in range(5)
+        ])
+        key = self.saved_session()
+
+        self.assertEqual(SessionStore.clear_expired(batch_size=2), 5)
+        self.assertEqual(list(Session.objects.values_list('pk', flat=True)), [key])
+        out = StringIO()
+        call_command('cleanup_sessions', pause=0, stdout=out)
+        self.assertIn('Deleted 0 expired session(s).', out.getvalue())
+
+
+class OrgUnitTests(TempMediaMixin, ScopedUsersMixin, TestCase):
+    def test_paths_follow_the_tree(self):
+        root = f'{self.division.pk:06d}/'
+        self.assertEqual(self.division.path, root)
+        self.assertEqual(self.district_a.path, f'{root}{self.district_a.pk:06d}/')
+        self.assertEqual(self.school_a.org_path, self.district_a.path)
+        self.assertEqual(self.district_a.depth, 2)
+        self.assertEqual(list(self.district_a.ancestors()), [self.division, self.district_a])
+        self.assertEqual(set(self.division.descendants(include_self=False)), {self.district_a, self.district_b})
+        self.assertEqual(set(self.division.all_schools()), {self.school_a, self.school_b})
+
+    def test_moving_a_unit_rewrites_descendant_paths(self):
+        cluster = OrgUnit.objects.create(name='Cluster', code='CL', parent=self.district_a)
+        self.district_b.parent = cluster
+        self.district_b.save()
+
+        self.district_b.refresh_from_db()
+        self.school_b.refresh_from_db()
+        self.assertEqual(self.district_b.path, f'{cluster.path}{self.district_b.pk:06d}/')
+        self.assertEqual(self.school_b.org_path, self.district_b.path)
+        supervisor = User.objects.get(pk=self.supervisor.pk)
+        self.assertEqual(set(supervisor.scoped_schools()), {self.school_a, self.school_b})
+
+        self.district_a.parent = self.district_b
+        with self.assertRaises(ValidationError):
+            self.district_a.clean()
+
+    def test_scope_by_role(self):
+        self.assertEqual((self.secretary.scope_path, self.head_a.scope_path), ('', None))
+        self.assertEqual(self.supervisor.scope_path, self.district_a.path)
+        self.assertEqual(set(self.secretary.scoped_schools()), {self.school_a, self.school_b})
+        self.assertEqual(list(self.supervisor.scoped_schools()), [self.school_a])
+        self.assertEqual(list(self.head_b.scoped_schools()), [self.school_b])
+        self.assertFalse(User(school=None).scoped_schools().exists())
+
+        memo = make_memo(self.secretary, 'Memo B', [self.school_b])
+        self.assertTrue(memo.is_visible_to(self.secretary))
+        self.assertTrue(memo.is_visible_to(self.head_b))
+        self.assertFalse(memo.is_visible_to(self.supervisor))
+        self.assertFalse(memo.is_visible_to(self.head_a))
+
+        self.client.force_login(self.supervisor)
+        self.assertEqual(self.client.get(reverse('admin_dashboard')).status_code, 200)
+        self.client.force_login(self.head_a)
+        self.assertRedirects(
+            self.client.get(reverse('admin_dashboard')), reverse('dashboard_selector'), fetch_redirect_response=False,
+        )
+
+
+class SchoolListCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_b = School.objects.create(name='School B', school_id='SCH-B')
+        cls.school_a = School.objects.create(name='School A', school_id='SCH-A')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_list_and_options_are_cached_until_a_school_changes(self):
+        self.assertEqual(get_school_list(), [self.school_a, self.school_b])
+        options = school_options(selected=self.school_b.pk, label='full')
+        self.assertIn(f'<option value="{self.school_b.pk}" selected>School B (SCH-B)</option>', options)
+        self.assertEqual(options.count(' selected'), 1)
+        with self.assertNumQueries(0):
+            get_school_list()
+            self.assertNotIn(' selected', school_options())
+
+        version = school_list_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            School.objects.create(name='School <C>', school_id='SCH-C')
+        self.assertGreater(school_list_version(), version)
+        self.assertEqual(len(get_school_list()), 3)
+        self.assertIn('School &lt;C&gt;', school_options())
+
+    def test_evicted_version_does_not_reuse_old_entries(self):
+        get_school_list()
+        cache.delete(SCHOOL_LIST_VERSION_KEY)
+        School.objects.filter(pk=self.school_b.pk).update(name='School Z')
+        self.assertEqual([school.name for school in get_school_list()], ['School A', 'School Z'])
+
+
+class NavCacheTests(TestCase):
+    fragment = Template(
+        "{% load nav_cache %}{% navcache 'side' count=count name=name %}"
+        "{{ rendered }}|{% navslot 'name' %}{% if count %}|badge {% navslot 'count' %}{% endif %}"
+        "{% endnavcache %}"
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.head = User.objects.create_user('head@deped.gov.ph', 'Head', is_school_head=True)
+        cls.other_head = User.objects.create_user('other@deped.gov.ph', 'Other', is_school_head=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def render(self, user, rendered, count=0, name=None):
+        request = RequestFactory().get('/')
+        request.user = user
+        return self.fragment.render(Context({
+            'request': request, 'rendered': rendered, 'count': count, 'name': name or user.full_name,
+        }))
+
+    def test_fragment_is_shared_by_role_and_slots_are_filled(self):
+        self.assertEqual(self.render(self.head, 'first'), 'first|Head')
+        self.assertEqual(self.render(self.other_head, 'second', name='<b>'), 'first|&lt;b&gt;')
+        # Iba ang markup kapag hindi zero ang counter, pero ang value ay slot pa rin
+        self.assertEqual(self.render(self.head, 'third', count=3), 'third|Head|badge 3')
+        self.assertEqual(self.render(self.head, 'fourth', count=7), 'third|Head|badge 7')
+        with override_settings(NAV_CACHE_ENABLED=False):
+            self.assertEqual(self.render(self.head, 'fresh'), 'fresh|Head')
+
+    def test_role_change_invalidates(self):
+        self.render(self.head, 'first')
+        user = User.objects.get(pk=self.head.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            user.last_login = timezone.now()
+            user.save(update_fields=['last_login'])
+            user.full_name = 'Renamed'
+            user.save()
+        self.assertEqual(self.render(self.other_head, 'second'), 'first|Other')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user.is_school_head = False
+            user.save()
+        self.assertEqual(self.render(self.other_head, 'third'), 'third|Other')
+
+    def test_syntax_errors(self):
+        for source in ("{% navcache side %}{% endnavcache %}", "{% navcache 'side' count %}{% endnavcache %}"):
+            with self.assertRaises(TemplateSyntaxError):
+                Template('{% load nav_cache %}' + source)
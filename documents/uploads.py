@@ -0,0 +1,241 @@
+"""
+Resumable (chunked) upload protocol para sa malalaking memo.
+
+1. ``start_upload_session`` - gagawa ng UploadSession (title, filename, size).
+2. PUT ng bawat chunk (raw bytes) - ``write_chunk`` ang nagsusulat nang
+   direkta sa ``.part`` file sa tamang offset habang binabasa ang request
+   stream, kaya walang temp file o buong chunk sa memory.
+3. ``finalize_upload`` - kapag kumpleto na ang lahat ng chunks, ini-move ang
+   ``.part`` file sa content-addressed storage at gagawa ng Document.
+
+Puwedeng ulitin ang kahit anong chunk (idempotent), kaya kapag naputol ang
+connection, ang mga kulang na chunks lang ang ipapadala ulit. Ang mga
+session na iniwan (walang bagong chunk nang ``CHUNKED_UPLOAD_EXPIRE_AFTER``
+segundo) ay binubura ng ``expire_uploads`` command kasama ang ``.part`` file.
+"""
+import hashlib
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q, Sum
+from django.utils import timezone
+
+from .distribution import distribute, resolve_recipients
+from .models import Document, InboxEntry, StoredBlob, UploadChunk, UploadSession
+from .storage import sha256_from_name
+
+READ_BLOCK_SIZE = 64 * 1024
+CHUNK_SIZE = getattr(settings, 'CHUNKED_UPLOAD_CHUNK_SIZE', 2 * 1024 * 1024)
+MAX_UPLOAD_SIZE = getattr(settings, 'CHUNKED_UPLOAD_MAX_SIZE', 200 * 1024 * 1024)
+EXPIRE_AFTER = getattr(settings, 'CHUNKED_UPLOAD_EXPIRE_AFTER', 24 * 60 * 60)
+
+
+class UploadError(Exception):
+    """Hindi tinanggap ang upload request (maling laki, checksum, atbp.)."""
+
+
+def start_upload_session(user, title, filename, total_size):
+    if not title or not filename:
+        raise UploadError("Title and File are required.")
+    try:
+        total_size = int(total_size)
+    except (TypeError, ValueError):
+        raise UploadError("Invalid file size.")
+    if total_size <= 0:
+        raise UploadError("The file is empty.")
+    if total_size > MAX_UPLOAD_SIZE:
+        raise UploadError(f"File is too large (max {MAX_UPLOAD_SIZE // (1024 * 1024)} MB).")
+
+    return UploadSession.objects.create(
+        user=user,
+        title=title[:255],
+        filename=os.path.basename(filename)[:255],
+        total_size=total_size,
+        chunk_size=CHUNK_SIZE,
+    )
+
+
+def write_chunk(session, index, stream, checksum=None):
+    """
+    Isulat ang chunk ``index`` mula sa ``stream`` (hal. ang request mismo).
+    Kapag may ``checksum`` (hex SHA-256) mula sa client, kailangang tumugma.
+    """
+    if session.status != UploadSession.STATUS_ACTIVE:
+        raise UploadError("This upload is already finished.")
+    if index < 0 or index >= session.total_chunks:
+        raise UploadError("Invalid chunk number.")
+
+    expected = session.expected_chunk_size(index)
+    offset = index * session.chunk_size
+    digest = hashlib.sha256()
+    written = 0
+
+    os.makedirs(os.path.dirname(session.part_path), exist_ok=True)
+    fd = os.open(session.part_path, os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        while True:
+            block = stream.read(READ_BLOCK_SIZE)
+            if not block:
+                break
+            if written + len(block) > expected:
+                raise UploadError("Chunk is larger than expected.")
+            os.pwrite(fd, block, offset + written)
+            digest.update(block)
+            written += len(block)
+    finally:
+        os.close(fd)
+
+    if written != expected:
+        raise UploadError(f"Incomplete chunk: received {written} of {expected} bytes.")
+
+    sha256 = digest.hexdigest()
+    if checksum and checksum.lower() != sha256:
+        raise UploadError("Checksum mismatch. Please resend this chunk.")
+
+    UploadChunk.objects.update_or_create(
+        session=session, index=index,
+        defaults={'size': written, 'sha256': sha256},
+    )
+    return sha256
+
+
+def finalize_upload(session, recipients=()):
+    """
+    I-move ang buong file sa storage at gawin ang Document. Ang ``recipients``
+    ay mga value ng form (tingnan ang distribution.parse_recipients).
+    """
+    storage = Document._meta.get_field('file').storage
+    with transaction.atomic():
+        # Naka-lock ang session row: ang kasabay na finalize ay maghihintay at
+        # makikita nang complete na ang session (walang .part file na hahanapin)
+        session = UploadSession.objects.select_for_update().select_related('user').filter(pk=session.pk).first()
+        if session is None:
+            raise UploadError("This upload has expired. Please upload the file again.")
+        if session.status != UploadSession.STATUS_ACTIVE:
+            if session.document_id:
+                return session.document
+            raise UploadError("This upload is already finished.")
+
+        received = session.chunks.aggregate(count=Count('id'), size=Sum('size'))
+        if received['count'] != session.total_chunks or received['size'] != session.total_size:
+            raise UploadError(
+                f"Upload is incomplete ({received['count']} of {session.total_chunks} chunks received)."
+            )
+        if not os.path.exists(session.part_path):
+            raise UploadError("This upload has expired. Please upload the file again.")
+
+        # Parehong filesystem (MEDIA_ROOT), kaya hard link lang ito at walang kopya;
+        # kapag may kaparehong file na sa storage, binubura na lang ang .part file
+        name = storage.adopt(session.part_path, session.filename)
+
+        doc = Document.objects.create(
+            uploaded_by=session.user,
+            title=session.title,
+            file=name,
+            school=session.user.school,
+        )
+        distribute(doc, resolve_recipients(session.user, recipients))
+        session.status = UploadSession.STATUS_COMPLETE
+        session.document = doc
+        session.save(update_fields=['status', 'document', 'updated_at'])
+        session.chunks.all().delete()
+    return doc
+
+
+def expire_upload_sessions(max_age=EXPIRE_AFTER):
+    """
+    Burahin ang active sessions na walang galaw nang ``max_age`` segundo at ang
+    kanilang ``.part`` files, pati ang mga naiwang ``.part`` file na wala nang
+    session. Returns bilang ng nabura na sessions.
+    """
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+    recent_chunk = UploadChunk.objects.filter(session=OuterRef('pk'), received_at__gte=cutoff)
+    stale = (
+        UploadSession.objects.filter(status=UploadSession.STATUS_ACTIVE, updated_at__lt=cutoff)
+        .exclude(Exists(recent_chunk))
+    )
+
+    expired = 0
+    for session in stale.iterator():
+        with transaction.atomic():
+            # Baka na-finalize habang tumatakbo ito; skip_locked para hindi maghintay
+            locked = (
+                UploadSession.objects.select_for_update(skip_locked=True)
+                .filter(pk=session.pk, status=UploadSession.STATUS_ACTIVE).first()
+            )
+            if locked is None:
+                continue
+            part_path = locked.part_path
+            locked.delete()
+        _remove_part_file(part_path)
+        expired += 1
+
+    partial_dir = os.path.join(settings.MEDIA_ROOT, 'uploads', 'partial')
+    if os.path.isdir(partial_dir):
+        active = {
+            str(pk) for pk in UploadSession.objects.filter(status=UploadSession.STATUS_ACTIVE).values_list('id', flat=True)
+        }
+        oldest = time.time() - max_age
+        for entry in os.scandir(partial_dir):
+            stem, ext = os.path.splitext(entry.name)
+            if ext == '.part' and stem not in active and entry.stat().st_mtime < oldest:
+                _remove_part_file(entry.path)
+    return expired
+
+
+def _remove_part_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def find_reusable_blob(user, sha256):
+    """
+    StoredBlob na puwedeng gamitin ulit ng ``user`` para sa upload-by-hash.
+    Kailangang may Document na gumagamit nito na nakikita na ng user (tulad
+    ng ``Document.is_visible_to``); kung wala, parang walang ganitong file,
+    kaya hindi malalaman o makukuha ang file ng ibang school gamit ang hash.
+    """
+    sha256 = (sha256 or '').lower()
+    if not sha256_from_name(sha256):
+        return None
+    memos = Document.objects.filter(sha256=sha256)
+    if not user.can_distribute_memos:
+        memos = memos.filter(
+            Q(uploaded_by=user) | Exists(InboxEntry.objects.filter(user.scope_q(), document=OuterRef('pk')))
+        )
+    if not memos.exists():
+        return None
+    return StoredBlob.objects.filter(sha256=sha256).first()
+
+
+def create_from_existing_blob(user, title, sha256, recipients=()):
+    """
+    Gumawa ng Document mula sa blob na nasa storage na (walang ia-upload).
+    Returns None kapag wala pang ganitong file na nakikita ng user.
+    """
+    if not title:
+        raise UploadError("Title is required.")
+    blob = find_reusable_blob(user, sha256)
+    if blob is None:
+        return None
+
+    storage = Document._meta.get_field('file').storage
+    with transaction.atomic():
+        # Naka-lock para hindi mabura ng kasabay na release() ang file
+        blob = StoredBlob.objects.select_for_update().filter(pk=blob.pk).first()
+        if blob is None or not storage.exists(blob.name):
+            return None
+        blob = StoredBlob.acquire(blob.sha256, blob.name, blob.size)
+        doc = Document.objects.create(
+            uploaded_by=user,
+            title=title[:255],
+            file=blob.name,
+            school=user.school,
+        )
+        distribute(doc, resolve_recipients(user, recipients))
+        return doc
@@ -25,10 +25,13 @@ urlpatterns = [
     # --- USER MANAGEMENT (SUPER ADMIN) ---
     # ==============================
     path('super-admin/users/', views.user_management, name='user_management'),
+    path('super-admin/users/data/', views.user_management_data, name='user_management_data'),
+    path('super-admin/users/export/', views.export_users, name='export_users'),
     path('super-admin/add-user/', views.add_user, name='add_user'),
     path('super-admin/edit-user/<int:user_id>/', views.edit_user, name='edit_user'),
     path('super-admin/delete-user/<int:user_id>/', views.delete_user, name='delete_user'),
     path('super-admin/access-requests/', views.access_requests, name='access_requests'),
+    path('super-admin/access-requests/bulk/', views.bulk_access_requests, name='bulk_access_requests'),
     
     path('super-admin/pending-approvals/', views.pending_approvals, name='pending_approvals'),
     path('super-admin/approve-user/<int:user_id>/<str:action>/', views.approve_user_process, name='approve_user_process'),
@@ -42,10 +45,26 @@ urlpatterns = [
     # --- DOCUMENTS / MEMOS ---
     # ==============================
     path('memos/received/', views.received_documents, name='received_documents'),
+    path('memos/feed/', views.memo_feed, name='memo_feed'),
+    path('memos/search/', views.search_documents, name='search_documents'),
+    path('memos/export/', views.export_memos, name='export_memos'),
+    path('memos/<int:doc_id>/acknowledge/', views.acknowledge_document, name='acknowledge_document'),
+    path('memos/compliance/', views.compliance_report, name='compliance_report'),
+    path('memos/compliance/export/', views.compliance_report_csv, name='compliance_report_csv'),
+    path('metrics/', views.metrics, name='metrics'),
     
     # ITO ANG MGA DAGDAG PARA SA UPLOAD MODAL AT DELETE:
     path('documents/my-uploads/', views.upload_document, name='upload_document'),
     path('documents/delete/<int:doc_id>/', views.delete_document, name='delete_document'),
+    path('documents/<int:doc_id>/download/', views.download_document, name='download_document'),
+
+    # Resumable chunked uploads para sa malalaking files
+    path('documents/uploads/', views.upload_session_start, name='upload_session_start'),
+    path('documents/uploads/<uuid:upload_id>/', views.upload_session_status, name='upload_session_status'),
+    path('documents/uploads/<uuid:upload_id>/chunks/<int:index>/', views.upload_chunk, name='upload_chunk'),
+    path('documents/uploads/<uuid:upload_id>/finalize/', views.upload_session_finalize, name='upload_session_finalize'),
+    path('documents/uploads/existing/', views.upload_existing_blob, name='upload_existing_blob'),
+    path('documents/blobs/<str:sha256>/', views.blob_exists, name='blob_exists'),
     
     # ==============================
     # --- PASSWORD RESET (GMAIL BASED) ---
@@ -78,7 +97,7 @@ urlpatterns = [
          name='password_reset_complete'),
 ]
 
-# Media at Static files handling
+# Static files handling. Walang MEDIA_URL route: ang memo files ay dumadaan
+# lang sa download_document (login at is_visible_to check)
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
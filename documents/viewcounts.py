@@ -0,0 +1,149 @@
+"""
+Naka-buffer na pagbibilang ng views ng memo.
+
+Ang ``record_view`` ay nagdadagdag lang sa isang in-memory buffer (walang
+query, walang row lock sa request). Isang daemon thread ang nagfa-flush
+kada ``VIEW_COUNT_FLUSH_INTERVAL`` segundo: pinagsasama-sama ang mga
+document na pareho ang dagdag para isang ``UPDATE ... SET views_count =
+views_count + N`` lang bawat grupo, isang ``bulk_create`` para sa mga
+bagong DocumentView ("nabasa na ni user X ang memo Y") rows, at ang
+pag-mark ng InboxEntry ng school bilang nabuksan (``mark_read_many``).
+
+Per process ang buffer; ang natitira ay fina-flush din sa pag-exit ng
+process. Kapag nag-crash ang process, ang hindi pa na-flush na views ay
+mawawala, na katanggap-tanggap para sa isang view counter.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, OperationalError, close_old_connections, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = getattr(settings, 'VIEW_COUNT_FLUSH_INTERVAL', 10)
+
+_lock = threading.Lock()
+_counts = Counter()
+_viewers = set()
+_reads = set()
+_flusher = None
+
+
+def record_view(doc_id, user_id=None, school_id=None):
+    """
+    Itala ang isang view; ang database ay ina-update sa susunod na flush.
+    Kapag may ``school_id``, mamarkahan ding nabuksan ng school ang memo.
+    """
+    with _lock:
+        _counts[doc_id] += 1
+        if user_id:
+            _viewers.add((doc_id, user_id))
+        if school_id:
+            _reads.add((doc_id, school_id))
+    _ensure_flusher()
+
+
+def pending_views():
+    """Kopya ng mga hindi pa na-flush na views (para sa tests/diagnostics)."""
+    with _lock:
+        return dict(_counts)
+
+
+def flush():
+    """I-save sa database ang laman ng buffer. Returns ang bilang ng views na na-flush."""
+    with _lock:
+        counts = _counts.copy()
+        viewers = set(_viewers)
+        reads = set(_reads)
+        _counts.clear()
+        _viewers.clear()
+        _reads.clear()
+    if not counts and not viewers and not reads:
+        return 0
+
+    for attempt in range(2):
+        try:
+            _write(counts, viewers, reads)
+            return sum(counts.values())
+        except IntegrityError:
+            # Nabura ang memo/user sa pagitan ng check at insert; sa ulit ay
+            # wala na ito sa filter. Hindi ibinabalik sa buffer para hindi
+            # ma-stuck ang ibang views.
+            if attempt:
+                logger.exception("View count flush failed; dropping %d view(s)", sum(counts.values()))
+        except OperationalError:
+            # Pansamantala (hal. nawala ang connection, lock timeout): ulitin sa susunod
+            logger.exception("View count flush failed; retrying on the next interval")
+            with _lock:
+                _counts.update(counts)
+                _viewers.update(viewers)
+                _reads.update(reads)
+            return 0
+        except DatabaseError:
+            logger.exception("View count flush failed; dropping %d view(s)", sum(counts.values()))
+            return 0
+    return 0
+
+
+def _write(counts, viewers, reads):
+    from .distribution import mark_read_many
+    from .models import Document, DocumentView, User
+
+    # Isang UPDATE bawat magkakaparehong dagdag (karaniwan ay iilan lang)
+    by_increment = defaultdict(list)
+    for doc_id, increment in counts.items():
+        by_increment[increment].append(doc_id)
+
+    with transaction.atomic():
+        for increment, doc_ids in by_increment.items():
+            Document.objects.filter(pk__in=doc_ids).update(views_count=F('views_count') + increment)
+        # Laktawan ang memo/user na nabura habang naka-buffer ang view
+        live_docs = set(Document.objects.filter(pk__in={doc_id for doc_id, _ in viewers}).values_list('pk', flat=True))
+        live_users = set(User.objects.filter(pk__in={user_id for _, user_id in viewers}).values_list('pk', flat=True))
+        DocumentView.objects.bulk_create(
+            [
+                DocumentView(document_id=doc_id, user_id=user_id)
+                for doc_id, user_id in viewers
+                if doc_id in live_docs and user_id in live_users
+            ],
+            ignore_conflicts=True,
+        )
+        if reads:
+            mark_read_many(reads)
+
+
+def _flush_loop():
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        try:
+            flush()
+        except Exception:
+            # Huwag hayaang mamatay ang thread; tuloy sa susunod na interval
+            logger.exception("View count flush failed")
+        finally:
+            # Sariling DB connection ng thread na ito; huwag hayaang maluma
+            close_old_connections()
+
+
+def _ensure_flusher():
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _lock:
+        if _flusher is not None and _flusher.is_alive():
+            return
+        _flusher = threading.Thread(target=_flush_loop, name='view-count-flusher', daemon=True)
+        _flusher.start()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        flush()
+    except Exception:
+        logger.exception("Final view count flush failed")
@@ -1,22 +1,44 @@
+from datetime import timedelta
+
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse
+from django.core.exceptions import PermissionDenied
 from django.contrib.auth import login, logout, authenticate, get_user_model
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.cache import never_cache
 from django.urls import reverse
-
-# Imports para sa Email
-from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.formats import date_format
+from django.template.defaultfilters import filesizeformat, pluralize
+
+# Imports para sa Email (naka-pila sa outbox, tingnan ang mail.py)
 from django.conf import settings
+from .mail import queue_mail, queue_mass_mail
 
 # Imports para sa Password Reset (Built-in Views)
 from django.contrib.auth import views as auth_views
 
 # Imports para sa models at forms
-from .models import User, School, Document
+from .models import User, School, SchoolGroup, Document, InboxEntry, SystemCounter, UploadSession
 from .forms import EmployeeRegistrationForm, CustomPasswordResetForm
+from . import search
+from .pagination import keyset_page
+from .caching import adjust_pending_count, get_pending_count, school_options
+from .downloads import serve_document
+from .viewcounts import record_view
+from .distribution import acknowledge, distribute, resolve_recipients, unread_count
+from . import compliance
+from .exports import export_response
+from . import metrics as request_metrics
+from .uploads import (
+    UploadError, create_from_existing_blob, finalize_upload, find_reusable_blob, start_upload_session,
+    write_chunk,
+)
 
 # Kunin ang official User model
 User = get_user_model()
@@ -37,14 +59,14 @@ def login_view(request):
         p = request.POST.get('password')
         remember_me = request.POST.get('remember')
 
-        # Check muna kung ang email ay DepEd o kung Superuser
-        check_user = User.objects.filter(email__iexact=u).first()
-        is_super = check_user.is_superuser if check_user else False
-
-        if u and not u.lower().endswith('@deped.gov.ph') and not is_super:
-            messages.error(request, "Access Denied. Only official DepEd email addresses (@deped.gov.ph) are allowed.")
-            return render(request, 'login.html')
+        # Check muna kung ang email ay DepEd o kung Superuser; ang superuser lookup
+        # (LOWER(email) index) ay para lang sa hindi @deped.gov.ph na email
+        if u and not u.lower().endswith('@deped.gov.ph'):
+            if not User.objects.by_email(u).filter(is_superuser=True).exists():
+                messages.error(request, "Access Denied. Only official DepEd email addresses (@deped.gov.ph) are allowed.")
+                return render(request, 'login.html')
 
+        # Isang indexed lookup lang (EmailBackend)
         user = authenticate(request, username=u, password=p)
 
         if user is not None:
@@ -79,10 +101,7 @@ def register_view(request):
         # --- EMAIL DOMAIN RESTRICTION ---
         if not email.endswith('@deped.gov.ph'):
             messages.error(request, "Registration Failed: Only official @deped.gov.ph emails are allowed.")
-            return render(request, 'register.html', {
-                'form': form,
-                'schools': School.objects.all().order_by('name'),
-            })
+            return render(request, 'register.html', {'form': form})
 
         if form.is_valid():
             # Ang validation ng @deped at @gmail ay handle na ng Form
@@ -97,10 +116,7 @@ def register_view(request):
     else:
         form = EmployeeRegistrationForm()
 
-    return render(request, 'register.html', {
-        'form': form, 
-        'schools': School.objects.all().order_by('name')
-    })
+    return render(request, 'register.html', {'form': form})
 
 # --- PASSWORD RESET OVERRIDE ---
 
@@ -132,6 +148,9 @@ def dashboard_selector(request):
         return redirect('admin_dashboard')
     elif getattr(user, 'is_school_head', False):
         return redirect('school_head_dashboard')
+    elif user.org_unit_id:
+        # District supervisors atbp.: memos ng lahat ng school sa saklaw nila
+        return redirect('admin_dashboard')
 
     # 4. Regular Employee (Default)
     else:
@@ -144,11 +163,11 @@ def super_admin_dashboard(request):
     if not request.user.is_superuser:
         return redirect('dashboard_selector')
 
+    # Lahat ng totals ay galing sa SystemCounter sa isang query (walang COUNT(*))
     context = {
-        'total_users': User.objects.count(),
-        'total_schools': School.objects.count(),
-        'total_memos': Document.objects.count(),
-        'recent_users': User.objects.all().order_by('-date_joined')[:5],
+        **SystemCounter.get_values(),
+        'pending_requests': get_pending_count(),
+        'recent_users': User.objects.select_related('school').order_by('-date_joined')[:5],
         'title': "System Super Admin"
     }
     return render(request, 'super_admin_dashboard.html', context)
@@ -157,8 +176,172 @@ def super_admin_dashboard(request):
 def user_management(request):
     if not request.user.is_superuser:
         return redirect('dashboard_selector')
-    users = User.objects.all().order_by('-date_joined')
-    return render(request, 'user_management.html', {'users': users})
+    # Walang users na nilo-load dito; ang table ay kinukuha ng JS sa user_management_data
+    return render(request, 'user_management.html', {'page_size': USER_TABLE_PAGE_SIZE})
+
+USER_TABLE_PAGE_SIZE = 50
+# Hanggang dito lang binibilang ang filtered rows (walang index ang istartswith sa full_name)
+USER_TABLE_COUNT_LIMIT = 1000
+
+# DataTables column index -> lookup na ginagamit sa column search
+USER_TABLE_COLUMN_FILTERS = {
+    0: 'full_name__istartswith',
+    1: 'email__istartswith',
+    2: 'school__name__istartswith',
+}
+
+USER_ROLE_FILTERS = {
+    'superadmin': Q(is_deped_admin=True),
+    'deped secretary': Q(is_deped_secretary=True),
+    'school head': Q(is_school_head=True),
+    'employee': Q(is_deped_admin=False, is_deped_secretary=False, is_school_head=False),
+}
+
+def _user_list_filters(params):
+    """Q ng search at column filters ng User List (DataTables parameter names)."""
+    filters = Q()
+    search = params.get('search[value]', '').strip()
+    if search:
+        filters &= Q(full_name__istartswith=search) | Q(email__istartswith=search)
+
+    for index, lookup in USER_TABLE_COLUMN_FILTERS.items():
+        value = params.get(f'columns[{index}][search][value]', '').strip()
+        if value:
+            filters &= Q(**{lookup: value})
+
+    role = params.get('columns[3][search][value]', '').strip().lower()
+    if role in USER_ROLE_FILTERS:
+        filters &= USER_ROLE_FILTERS[role]
+
+    status = params.get('columns[4][search][value]', '').strip().lower()
+    if status in ('active', 'inactive'):
+        filters &= Q(is_active=(status == 'active'))
+    return filters
+
+@login_required
+def user_management_data(request):
+    """
+    Server-side processing endpoint para sa User List table (DataTables format).
+
+    Gumagamit ng keyset pagination sa -date_joined kaya pareho ang bilis kahit
+    100k na ang users. Ipasa ang ``cursor`` mula sa nakaraang response para sa
+    susunod na page.
+    """
+    if not request.user.is_superuser:
+        return JsonResponse({'status': 'error', 'message': 'Unauthorized'}, status=403)
+
+    params = request.GET
+    users = User.objects.select_related('school').only(
+        'id', 'full_name', 'email', 'is_active', 'date_joined',
+        'is_deped_admin', 'is_deped_secretary', 'is_school_head', 'is_employee',
+        'school__name',
+    )
+
+    filters = _user_list_filters(params)
+
+    try:
+        size = min(int(params.get('length', USER_TABLE_PAGE_SIZE)), 500)
+    except ValueError:
+        size = USER_TABLE_PAGE_SIZE
+    if size <= 0:
+        size = USER_TABLE_PAGE_SIZE
+
+    try:
+        draw = int(params.get('draw', 0) or 0)
+    except ValueError:
+        draw = 0
+
+    users = users.filter(filters)
+    cursor = params.get('cursor')
+    rows, next_cursor = keyset_page(users, 'date_joined', cursor=cursor, size=size)
+
+    response = {
+        'draw': draw,
+        'data': [
+            {
+                'id': u.id,
+                'full_name': u.full_name or '',
+                'email': u.email,
+                'school': u.school.name if u.school else 'N/A',
+                'role': u.get_role(),
+                'is_active': u.is_active,
+            }
+            for u in rows
+        ],
+        'next_cursor': next_cursor,
+    }
+    # Sa unang page lang nagbibilang; hindi nagbabago ang totals habang nag-i-scroll
+    if not cursor:
+        response['recordsTotal'] = SystemCounter.get_values([SystemCounter.TOTAL_USERS])[SystemCounter.TOTAL_USERS]
+        if filters:
+            # Naka-LIMIT na count: ang lampas sa limit ay ipinapakita bilang "1000+"
+            filtered = users.order_by()[:USER_TABLE_COUNT_LIMIT + 1].count()
+            response['recordsFiltered'] = min(filtered, USER_TABLE_COUNT_LIMIT)
+            response['recordsFilteredCapped'] = filtered > USER_TABLE_COUNT_LIMIT
+        else:
+            response['recordsFiltered'] = response['recordsTotal']
+    return JsonResponse(response)
+
+EXPORT_CHUNK_SIZE = 2000
+
+@login_required
+def export_users(request):
+    """
+    I-download ang User List (CSV o ``?format=xlsx``) gamit ang parehong filters
+    ng table. Naka-stream ang rows, kaya pareho ang memory sa 1k o 1M users.
+    """
+    if not request.user.is_superuser:
+        return redirect('dashboard_selector')
+
+    users = (
+        User.objects.select_related('school')
+        .filter(_user_list_filters(request.GET))
+        .order_by('-date_joined', '-id')
+    )
+    header = [
+        'ID', 'Full Name', 'DepEd Email', 'Personal Email', 'Role', 'School', 'Position',
+        'Contact No.', 'Active', 'Date Joined', 'Last Login',
+    ]
+    rows = (
+        [
+            u.id, u.full_name, u.email, u.personal_email, u.get_role(),
+            u.school.name if u.school else '', u.position, u.contact_number,
+            u.is_active, u.date_joined, u.last_login,
+        ]
+        for u in users.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    filename = f"users-{timezone.localdate():%Y%m%d}"
+    return export_response(request.GET.get('format'), filename, header, rows, sheet_name='Users')
+
+@login_required
+def export_memos(request):
+    """I-download ang listahan ng memos (CSV o ``?format=xlsx``), pinakabago muna."""
+    if not request.user.has_scope:
+        return redirect('dashboard_selector')
+
+    memos = _scoped_memos(request.user, Document.objects.select_related('uploaded_by', 'school'))
+    memos = memos.order_by('-date_uploaded', '-id')
+    date_from = parse_date(request.GET.get('from', '') or '')
+    date_to = parse_date(request.GET.get('to', '') or '')
+    if date_from:
+        memos = memos.filter(date_uploaded__gte=compliance.day_start(date_from))
+    if date_to:
+        memos = memos.filter(date_uploaded__lt=compliance.day_start(date_to + timedelta(days=1)))
+
+    header = [
+        'ID', 'Title', 'Type', 'Uploaded By', 'Uploader Email', 'School', 'Date Uploaded',
+        'Size (bytes)', 'Pages', 'Views',
+    ]
+    rows = (
+        [
+            memo.id, memo.title, memo.get_category_display(), memo.uploaded_by.display_name,
+            memo.uploaded_by.email, memo.school.name if memo.school else '', memo.date_uploaded,
+            memo.file_size, memo.page_count, memo.views_count,
+        ]
+        for memo in memos.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    filename = f"memos-{timezone.localdate():%Y%m%d}"
+    return export_response(request.GET.get('format'), filename, header, rows, sheet_name='Memos')
 
 @login_required
 def add_user(request):
@@ -200,17 +383,9 @@ Please log in here to access your dashboard:
 Thank you!
             """
             
-            try:
-                send_mail(
-                    subject,
-                    message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [personal_email],
-                    fail_silently=False,
-                )
-                messages.success(request, f"User {user.email} created and activated successfully!")
-            except Exception as e:
-                messages.warning(request, f"User activated, but notification email failed: {str(e)}")
+            # Naka-pila lang ang email; ang send_outbox worker ang magpapadala
+            queue_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [personal_email])
+            messages.success(request, f"User {user.email} created and activated successfully! The notification email will be sent shortly.")
 
             return redirect('user_management')
         else:
@@ -230,26 +405,15 @@ def pending_approvals(request):
     pending_users = User.objects.filter(is_active=False).order_by('-date_joined')
     return render(request, 'pending_approvals.html', {'pending_users': pending_users})
 
-@user_passes_test(is_super_admin)
-def approve_user_process(request, user_id, action):
-    if request.method == 'POST':
-        target_user = get_object_or_404(User, id=user_id)
-        
-        if action == 'approve':
-            target_user.is_active = True
-            target_user.save()
-
-            # Sa Gmail ipapadala ang approval notice
-            recipient = target_user.personal_email or target_user.email
-            
-            try:
-                protocol = 'https' if request.is_secure() else 'http'
-                domain = request.get_host()
-                login_url = reverse('login')
-                system_link = f"{protocol}://{domain}{login_url}"
+def _approval_email(request, target_user):
+    """Subject at message ng approval notice para sa isang user."""
+    protocol = 'https' if request.is_secure() else 'http'
+    domain = request.get_host()
+    login_url = reverse('login')
+    system_link = f"{protocol}://{domain}{login_url}"
 
-                subject = 'Account Approved - DepEd DMS'
-                message = f"""
+    subject = 'Account Approved - DepEd DMS'
+    message = f"""
 Dear {target_user.full_name},
 
 Good day!
@@ -266,16 +430,22 @@ Login here:
 {system_link}
 
 Thank you!
-                """
-                send_mail(
-                    subject,
-                    message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [recipient],
-                    fail_silently=False,
-                )
-            except Exception as e:
-                print(f"Error sending approval email: {e}")
+    """
+    return subject, message
+
+@user_passes_test(is_super_admin)
+def approve_user_process(request, user_id, action):
+    if request.method == 'POST':
+        target_user = get_object_or_404(User, id=user_id)
+        
+        if action == 'approve':
+            target_user.is_active = True
+            target_user.save()
+
+            # Sa Gmail ipapadala ang approval notice (naka-pila sa outbox)
+            recipient = target_user.personal_email or target_user.email
+            subject, message = _approval_email(request, target_user)
+            queue_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [recipient])
 
             return JsonResponse({'status': 'success', 'message': 'User approved and notified via email!'})
         
@@ -289,8 +459,60 @@ Thank you!
 def access_requests(request):
     if not request.user.is_superuser:
         return redirect('dashboard_selector')
-    pending_users = User.objects.filter(is_active=False).order_by('-date_joined')
-    return render(request, 'access_requests.html', {'pending_users': pending_users})
+    pending_users = User.objects.filter(is_active=False).select_related('school').order_by('-date_joined')
+    # Para sa "Select by school" dropdown: mga school lang na may pending requests
+    pending_schools = School.objects.filter(users__is_active=False).distinct().order_by('name')
+    return render(request, 'access_requests.html', {
+        'pending_users': pending_users,
+        'pending_schools': pending_schools,
+    })
+
+@user_passes_test(is_super_admin)
+@require_http_methods(["POST"])
+def bulk_access_requests(request):
+    """
+    Approve o reject ng maraming pending registrations sa isang transaction.
+
+    POST fields: ``action`` (approve/reject) at ``user_ids`` (puwedeng ulitin),
+    o ``school`` para sa lahat ng pending users ng isang school.
+    """
+    action = request.POST.get('action')
+    if action not in ('approve', 'reject'):
+        return JsonResponse({'status': 'error', 'message': 'Invalid action.'}, status=400)
+
+    pending = User.objects.filter(is_active=False)
+    try:
+        user_ids = [int(pk) for pk in request.POST.getlist('user_ids')]
+        school_id = int(request.POST['school']) if request.POST.get('school') else None
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid selection.'}, status=400)
+
+    if user_ids:
+        pending = pending.filter(id__in=user_ids)
+    elif school_id:
+        pending = pending.filter(school_id=school_id)
+    else:
+        return JsonResponse({'status': 'error', 'message': 'No users selected.'}, status=400)
+
+    with transaction.atomic():
+        if action == 'approve':
+            targets = list(
+                pending.select_for_update().only('id', 'full_name', 'email', 'personal_email')
+            )
+            count = User.objects.filter(pk__in=[u.pk for u in targets]).update(is_active=True)
+            # Isang INSERT lang para sa lahat ng approval notices
+            queue_mass_mail([
+                (*_approval_email(request, u), settings.DEFAULT_FROM_EMAIL, [u.personal_email or u.email])
+                for u in targets
+            ])
+            # Hindi dumadaan sa signals ang QuerySet.update()
+            transaction.on_commit(lambda: adjust_pending_count(-count))
+            message = f'{count} user(s) approved and notified via email!'
+        else:
+            count = pending.delete()[1].get(User._meta.label, 0)
+            message = f'{count} registration request(s) rejected.'
+
+    return JsonResponse({'status': 'success', 'message': message, 'count': count})
 
 @login_required
 def delete_user(request, user_id):
@@ -338,10 +560,10 @@ def edit_user(request, user_id):
         messages.success(request, f"Profile of {user_profile.full_name} has been updated!")
         return redirect('user_management')
 
-    all_schools = School.objects.all().order_by('name')
+    # Naka-cache ang options (walang School query); naka-select ang school ng user
     context = {
         'user_profile': user_profile,
-        'schools': all_schools,
+        'school_options': school_options(selected=user_profile.school_id),
     }
     return render(request, 'edit_user.html', context)
 
@@ -353,29 +575,110 @@ def superadmin_dashboard(request):
     if not request.user.is_superuser:
         return redirect('dashboard_selector')
 
+    # Lahat ng totals ay galing sa SystemCounter sa isang query (walang COUNT(*))
     context = {
-        'total_users': User.objects.count(),
-        'total_schools': School.objects.count(),
-        'total_memos': Document.objects.count(),
-        'recent_users': User.objects.all().order_by('-date_joined')[:5],
+        **SystemCounter.get_values(),
+        'pending_requests': get_pending_count(),
+        'recent_users': User.objects.select_related('school').order_by('-date_joined')[:5],
         'title': "System Super Admin"
     }
     return render(request, 'superadmin_dashboard.html', context)
 
 @login_required
 def admin_dashboard(request):
-    if not (getattr(request.user, 'is_deped_secretary', False) or request.user.is_superuser):
+    if not request.user.has_scope:
         return redirect('dashboard_selector')
-    memos = Document.objects.all().order_by('-date_uploaded')
-    return render(request, 'deped_dashboard.html', {'memos': memos, 'title': "DepEd Secretary Dashboard"})
+    memos, next_cursor = _memo_feed_page(request.user)
+    title = "DepEd Secretary Dashboard"
+    if request.user.scope_path:
+        title = f"{request.user.org_unit.name} Dashboard"
+    return render(request, 'deped_dashboard.html', {
+        'memos': memos,
+        'next_cursor': next_cursor,
+        'title': title
+    })
 
 @login_required
 def school_head_dashboard(request):
     if not (getattr(request.user, 'is_school_head', False) or request.user.is_superuser):
         return redirect('dashboard_selector')
-    memos = Document.objects.all().order_by('-date_uploaded')
+    memos, next_cursor = _memo_feed_page(request.user)
     school_name = request.user.school.name if request.user.school else "No School Assigned"
-    return render(request, 'school_head_dashboard.html', {'memos': memos, 'title': f"Portal: {school_name}"})
+    return render(request, 'school_head_dashboard.html', {
+        'memos': memos,
+        'next_cursor': next_cursor,
+        'unread_count': unread_count(request.user.school_id),
+        'title': f"Portal: {school_name}"
+    })
+
+MEMO_FEED_PAGE_SIZE = 25
+
+def _memo_feed_page(user, cursor=None):
+    """
+    Isang page ng memos na makikita ng user, kasama na ang uploader
+    (select_related) para walang dagdag na query bawat row.
+    Division (secretary, admin, superuser): lahat ng memo. District scope
+    (``User.org_unit``): mga memo na ipinadala sa kahit isang school sa
+    ilalim nito. School head/iba pa: ang inbox ng sariling school
+    (InboxEntry), na may ``is_read`` at ``acknowledged_at`` sa bawat memo.
+    Returns ``(memos, next_cursor)``.
+    """
+    if user.has_scope:
+        return keyset_page(
+            _scoped_memos(user, Document.objects.select_related('uploaded_by')), 'date_uploaded',
+            cursor=cursor, size=MEMO_FEED_PAGE_SIZE,
+        )
+    if not user.school_id:
+        return [], None
+    entries, next_cursor = keyset_page(
+        InboxEntry.objects.filter(school_id=user.school_id).select_related('document__uploaded_by'),
+        'date_sent', cursor=cursor, size=MEMO_FEED_PAGE_SIZE,
+    )
+    memos = []
+    for entry in entries:
+        entry.document.is_read = entry.is_read
+        entry.document.acknowledged_at = entry.acknowledged_at
+        memos.append(entry.document)
+    return memos, next_cursor
+
+def _scoped_memos(user, memos):
+    """Limitahan ang ``memos`` sa mga ipinadala sa schools na saklaw ng user (isang EXISTS)."""
+    if user.scope_path == '':
+        return memos
+    return memos.filter(Exists(InboxEntry.objects.filter(user.scope_q(), document=OuterRef('pk'))))
+
+def _memo_file_info(memo):
+    """Hal. "PDF · 1.2 MB · 3 pages" mula sa naka-save na metadata (walang stat sa disk)."""
+    parts = [memo.get_category_display() or 'File']
+    if memo.file_size is not None:
+        parts.append(filesizeformat(memo.file_size))
+    if memo.page_count:
+        parts.append(f"{memo.page_count} page{pluralize(memo.page_count)}")
+    return ' \u00b7 '.join(parts)
+
+@login_required
+def memo_feed(request):
+    """Susunod na page ng memo feed para sa "Load more" button ng dashboards."""
+    memos, next_cursor = _memo_feed_page(request.user, request.GET.get('cursor'))
+    return JsonResponse({
+        'memos': [
+            {
+                'id': memo.id,
+                'title': memo.title,
+                'uploader': memo.uploaded_by.display_name,
+                'date': date_format(timezone.localtime(memo.date_uploaded), 'M d, Y'),
+                'url': reverse('download_document', args=[memo.id]),
+                'file_info': _memo_file_info(memo),
+                'size': memo.file_size,
+                'mime_type': memo.mime_type,
+                'page_count': memo.page_count,
+                'is_read': getattr(memo, 'is_read', None),
+                'acknowledged': bool(getattr(memo, 'acknowledged_at', None)),
+            }
+            for memo in memos
+        ],
+        'next_cursor': next_cursor,
+    })
 
 @login_required
 def employee_profile(request):
@@ -391,11 +694,159 @@ def employee_profile(request):
 
 @login_required
 def received_documents(request):
-    if request.user.is_superuser:
-        memos = Document.objects.all().order_by('-date_uploaded')
+    memos, next_cursor = _memo_feed_page(request.user)
+    return render(request, 'received_documents.html', {
+        'memos': memos,
+        'next_cursor': next_cursor,
+        'unread_count': unread_count(request.user.school_id),
+        'title': "Received Memos",
+    })
+
+@login_required
+@require_http_methods(["POST"])
+def acknowledge_document(request, doc_id):
+    """Pag-acknowledge ng school sa natanggap na memo (tingnan ang compliance report)."""
+    doc = get_object_or_404(Document.objects.only('id', 'date_uploaded'), id=doc_id)
+    entry = acknowledge(doc, request.user)
+    if entry is None:
+        return JsonResponse({'status': 'error', 'message': 'This memo was not sent to your school.'}, status=403)
+    return JsonResponse({
+        'status': 'success',
+        'message': 'Memo acknowledged.',
+        'acknowledged_at': entry.acknowledged_at.isoformat(),
+    })
+
+COMPLIANCE_PAGE_SIZE = 25
+COMPLIANCE_DEFAULT_DAYS = 90
+COMPLIANCE_EXPORT_BATCH = 200
+
+def _compliance_range(request):
+    """
+    Date range ng report mula sa ?from=&to= (default: huling 90 araw), na
+    pinalawak sa buong buwan para pareho ang bilang ng summary at matrix.
+    """
+    date_to = parse_date(request.GET.get('to', '') or '') or timezone.localdate()
+    date_from = parse_date(request.GET.get('from', '') or '') or date_to - timedelta(days=COMPLIANCE_DEFAULT_DAYS)
+    return compliance.month_window(min(date_from, date_to), date_to)
+
+@login_required
+def compliance_report(request):
+    if not request.user.has_scope:
+        return redirect('dashboard_selector')
+
+    scope = request.user.scope_path
+    date_from, date_to = _compliance_range(request)
+    summary = compliance.school_summary(date_from, date_to, scope_path=scope)
+    schools = [row['school'] for row in summary]
+    memos, next_cursor = keyset_page(
+        compliance.report_memos(date_from, date_to, scope_path=scope), 'date_uploaded',
+        cursor=request.GET.get('cursor'), size=COMPLIANCE_PAGE_SIZE,
+    )
+    cells, totals = compliance.matrix(memos, scope_path=scope)
+    rows = [
+        {
+            'memo': memo,
+            'totals': totals[memo.id],
+            'cells': [cells[memo.id].get(school.id, compliance.NOT_SENT) for school in schools],
+        }
+        for memo in memos
+    ]
+    return render(request, 'compliance_report.html', {
+        'summary': summary,
+        'schools': schools,
+        'rows': rows,
+        'next_cursor': next_cursor,
+        'date_from': date_from,
+        'date_to': date_to,
+        'title': "Memo Compliance Report",
+    })
+
+@login_required
+def compliance_report_csv(request):
+    """Buong matrix ng compliance report bilang CSV (o ``?format=xlsx``)."""
+    if not request.user.has_scope:
+        return redirect('dashboard_selector')
+
+    scope = request.user.scope_path
+    date_from, date_to = _compliance_range(request)
+    schools = list(request.user.scoped_schools().filter(is_active=True).only('id', 'name'))
+    memos = compliance.report_memos(date_from, date_to, scope_path=scope)
+    header = ['Memo', 'Date', 'Recipients', 'Opened', 'Acknowledged'] + [school.name for school in schools]
+
+    def rows():
+        # Naka-batch: isang InboxEntry query bawat 200 memos
+        batch = []
+        for memo in memos.iterator(chunk_size=COMPLIANCE_EXPORT_BATCH):
+            batch.append(memo)
+            if len(batch) == COMPLIANCE_EXPORT_BATCH:
+                yield from _compliance_rows(batch, schools, scope)
+                batch = []
+        yield from _compliance_rows(batch, schools, scope)
+
+    filename = f"memo-compliance-{date_from}-to-{date_to}"
+    return export_response(request.GET.get('format'), filename, header, rows(), sheet_name='Compliance')
+
+def _compliance_rows(memos, schools, scope_path=''):
+    if not memos:
+        return
+    cells, totals = compliance.matrix(memos, scope_path=scope_path)
+    for memo in memos:
+        counts = totals[memo.id]
+        yield (
+            [memo.title, timezone.localtime(memo.date_uploaded).date(),
+             counts['received'], counts['opened'], counts['acknowledged']]
+            + [cells[memo.id].get(school.id, compliance.NOT_SENT) for school in schools]
+        )
+
+SEARCH_RESULT_LIMIT = 20
+
+@login_required
+def search_documents(request):
+    """
+    Full-text search sa title at laman ng memos (tingnan ang search.py).
+    Pareho ang scoping ng memo feed: division lahat (puwedeng i-filter sa
+    isang recipient school), district ang mga school sa ilalim nito, iba ay
+    ang inbox ng sariling school lang.
+    """
+    query = request.GET.get('q', '').strip()
+    date_from = parse_date(request.GET.get('from', '') or '')
+    date_to = parse_date(request.GET.get('to', '') or '')
+    try:
+        limit = int(request.GET.get('limit', SEARCH_RESULT_LIMIT))
+    except (TypeError, ValueError):
+        limit = SEARCH_RESULT_LIMIT
+    # Ang LIMIT -1 sa SQLite ay "walang limit"
+    limit = max(1, min(limit, 100))
+
+    scope = request.user.scope_path
+    if scope == '':
+        school_ids = [request.GET['school']] if request.GET.get('school', '').isdigit() else None
+    elif scope:
+        school_ids = list(request.user.scoped_schools().values_list('pk', flat=True))
+        if request.GET.get('school', '').isdigit():
+            school_ids = [pk for pk in school_ids if pk == int(request.GET['school'])]
     else:
-        memos = Document.objects.filter(school=request.user.school).order_by('-date_uploaded')
-    return render(request, 'received_documents.html', {'memos': memos})
+        school_ids = [request.user.school_id] if request.user.school_id else []
+
+    hits = search.search(query, school_ids=school_ids, date_from=date_from, date_to=date_to, limit=limit)
+    docs = Document.objects.select_related('uploaded_by', 'school').in_bulk([doc_id for doc_id, _ in hits])
+
+    results = []
+    for doc_id, snippet in hits:
+        memo = docs.get(doc_id)
+        if memo is None:
+            continue
+        results.append({
+            'id': memo.id,
+            'title': memo.title,
+            'uploader': memo.uploaded_by.display_name,
+            'school': memo.school.name if memo.school else '',
+            'date': date_format(timezone.localtime(memo.date_uploaded), 'M d, Y'),
+            'url': reverse('download_document', args=[memo.id]),
+            'snippet': search.snippet_html(snippet),
+        })
+    return JsonResponse({'status': 'success', 'query': query, 'results': results})
+
 @login_required
 @require_http_methods(["GET", "POST"])
 def upload_document(request):
@@ -403,20 +854,21 @@ def upload_document(request):
     if request.method == 'POST' and request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         try:
             title = request.POST.get('title')
-            category = request.POST.get('category')
             uploaded_file = request.FILES.get('file')
 
             if not title or not uploaded_file:
                 return JsonResponse({'status': 'error', 'message': 'Title and File are required.'}, status=400)
 
             # I-save sa Database
-            doc = Document.objects.create(
-                uploader=request.user,
-                title=title,
-                category=category,
-                file=uploaded_file,
-                school=request.user.school # Awtomatikong i-assign sa school ng user
-            )
+            # Ang category ay auto-detect sa Document.save() mula sa laman ng file
+            with transaction.atomic():
+                doc = Document.objects.create(
+                    uploaded_by=request.user,
+                    title=title,
+                    file=uploaded_file,
+                    school=request.user.school # Awtomatikong i-assign sa school ng user
+                )
+                distribute(doc, resolve_recipients(request.user, request.POST.getlist('recipients')))
 
             return JsonResponse({
                 'status': 'success', 
@@ -428,18 +880,145 @@ def upload_document(request):
 
     # Kapag ni-load lang ang page (GET request)
     # Dito natin kukunin ang stats para sa dashboard
-    user_docs = Document.objects.filter(uploader=request.user).order_by('-date_uploaded')
-    
+    user_docs = Document.objects.filter(uploaded_by=request.user).order_by('-date_uploaded')
+
+    # Isang GROUP BY query lang para sa lahat ng stats (gamit ang doc_uploader_category_idx)
+    category_counts = dict(
+        user_docs.order_by().values_list('category').annotate(total=Count('id'))
+    )
+
     context = {
         'documents': user_docs,
-        'total_uploads': user_docs.count(),
-        'word_count': user_docs.filter(category='word').count(),
-        'excel_count': user_docs.filter(category='excel').count(),
-        'ppt_count': user_docs.filter(category='ppt').count(),
-        'pdf_count': user_docs.filter(category='pdf').count(),
+        'total_uploads': sum(category_counts.values()),
+        'word_count': category_counts.get('word', 0),
+        'excel_count': category_counts.get('excel', 0),
+        'ppt_count': category_counts.get('ppt', 0),
+        'pdf_count': category_counts.get('pdf', 0),
         'title': "My Uploaded Assets"
     }
+    if request.user.can_distribute_memos:
+        # Mga puwedeng padalhan ng memo (tingnan ang distribution.py)
+        context['recipient_schools'] = School.objects.filter(is_active=True).only('id', 'name')
+        context['recipient_groups'] = SchoolGroup.objects.only('id', 'name')
     return render(request, 'upload_document.html', context)
+# --- CHUNKED / RESUMABLE UPLOADS (tingnan ang uploads.py) ---
+
+def _get_upload_session(request, upload_id):
+    return get_object_or_404(UploadSession, id=upload_id, user=request.user)
+
+def _upload_session_payload(session):
+    return {
+        'upload_id': str(session.id),
+        'upload_status': session.status,
+        'chunk_size': session.chunk_size,
+        'total_chunks': session.total_chunks,
+        'received': list(session.chunks.values_list('index', flat=True)),
+    }
+
+@login_required
+@require_http_methods(["POST"])
+def upload_session_start(request):
+    try:
+        session = start_upload_session(
+            request.user,
+            request.POST.get('title'),
+            request.POST.get('filename'),
+            request.POST.get('size'),
+        )
+    except UploadError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    return JsonResponse({'status': 'success', **_upload_session_payload(session)}, status=201)
+
+@login_required
+@require_http_methods(["GET"])
+def upload_session_status(request, upload_id):
+    """Para sa resume: ibinabalik kung aling chunks na ang natanggap."""
+    session = _get_upload_session(request, upload_id)
+    return JsonResponse({'status': 'success', **_upload_session_payload(session)})
+
+@login_required
+@require_http_methods(["PUT"])
+def upload_chunk(request, upload_id, index):
+    session = _get_upload_session(request, upload_id)
+    try:
+        # Binabasa ang request stream nang paunti-unti; hindi ginagamit ang request.body
+        sha256 = write_chunk(session, index, request, request.headers.get('X-Chunk-Checksum'))
+    except UploadError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    return JsonResponse({'status': 'success', 'index': index, 'sha256': sha256})
+
+@login_required
+@require_http_methods(["POST"])
+def upload_session_finalize(request, upload_id):
+    session = _get_upload_session(request, upload_id)
+    try:
+        doc = finalize_upload(session, request.POST.getlist('recipients'))
+    except UploadError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    return JsonResponse({
+        'status': 'success',
+        'message': 'Document uploaded successfully!',
+        'doc_id': doc.id
+    })
+
+@login_required
+@require_http_methods(["GET"])
+def blob_exists(request, sha256):
+    """Pre-upload check: may memo na bang nakikita ng user na may ganitong SHA-256?"""
+    exists = find_reusable_blob(request.user, sha256) is not None
+    return JsonResponse({'status': 'success', 'exists': exists})
+
+@login_required
+@require_http_methods(["POST"])
+def upload_existing_blob(request):
+    """Gumawa ng Document mula sa file na nasa server na; hindi na ipapadala ang bytes."""
+    try:
+        doc = create_from_existing_blob(
+            request.user,
+            request.POST.get('title'),
+            request.POST.get('sha256'),
+            request.POST.getlist('recipients'),
+        )
+    except UploadError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    if doc is None:
+        return JsonResponse({'status': 'missing', 'message': 'File is not on the server yet.'}, status=404)
+    return JsonResponse({
+        'status': 'success',
+        'message': 'Document uploaded successfully!',
+        'doc_id': doc.id
+    })
+
+@login_required
+@require_http_methods(["GET", "HEAD"])
+def download_document(request, doc_id):
+    """
+    Protected na download ng memo file (kapalit ng direktang ``memo.file.url``).
+    Ang ``?download=1`` ay para i-save bilang attachment sa halip na buksan sa browser.
+    """
+    doc = get_object_or_404(
+        Document.objects.only(
+            'id', 'title', 'file', 'school_id', 'uploaded_by_id', 'sha256',
+            'file_size', 'mime_type', 'date_uploaded',
+        ),
+        id=doc_id,
+    )
+    user = request.user
+    if not doc.is_visible_to(user):
+        raise PermissionDenied
+    if not doc.file:
+        raise Http404("File not found.")
+    try:
+        response = serve_document(request, doc, as_attachment=request.GET.get('download') == '1')
+    except FileNotFoundError:
+        raise Http404("File not found.")
+    # Bilangin ang pagbukas (buong file o unang Range), hindi ang 304 o bawat
+    # resume; naka-buffer pati ang pag-mark ng InboxEntry (tingnan ang viewcounts.py)
+    opened = response.status_code in (200, 206) and request.META.get('HTTP_RANGE', 'bytes=0-').startswith('bytes=0-')
+    if request.method == 'GET' and opened:
+        record_view(doc.id, user.id, user.school_id)
+    return response
+
 @login_required
 @require_http_methods(["POST"])
 def delete_document(request, doc_id):
@@ -447,10 +1026,18 @@ def delete_document(request, doc_id):
         doc = get_object_or_404(Document, id=doc_id)
         
         # Security check: Admin lang o ang uploader ang pwedeng mag-delete
-        if doc.uploader == request.user or request.user.is_superuser:
+        if doc.uploaded_by_id == request.user.id or request.user.is_superuser:
             doc.delete()
             return JsonResponse({'status': 'success', 'message': 'File deleted successfully.'})
         else:
             return JsonResponse({'status': 'error', 'message': 'Unauthorized action.'}, status=403)
             
-    return JsonResponse({'status': 'error', 'message': 'Invalid request.'}, status=400)
\ No newline at end of file
+    return JsonResponse({'status': 'error', 'message': 'Invalid request.'}, status=400)
+
+@never_cache
+def metrics(request):
+    """Prometheus scrape endpoint (tingnan ang metrics.py)."""
+    allowed_ips = getattr(settings, 'METRICS_ALLOWED_IPS', [])
+    if request.META.get('REMOTE_ADDR') not in allowed_ips and not request.user.is_superuser:
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    return HttpResponse(request_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')